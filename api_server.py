@@ -1,17 +1,29 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
-from backend.exchange import TradingInterface
-from backend.bot_core import TradingBot, MultiPairTradingBot, HighFrequencyTradingBot, SuperAggressiveMultiPairBot
+from backend.exchange import TradingInterface, get_shared_interface, get_interface_pool
+from backend.bot_core import (TradingBot, MultiPairTradingBot, HighFrequencyTradingBot, SuperAggressiveMultiPairBot,
+                              create_bot)
+from backend.policies import BOT_POLICIES
 import os
-from backend.db import (init_all_databases, get_account_balance, get_trade_history,
+from backend.db import (init_all_databases, get_account_balance,
 save_settings, log_trade, set_trading_mode, get_trading_mode,
-migrate_existing_database)
-from backend.backtest import run_backtest
+migrate_existing_database, get_trade_journal, get_trade_stats, query_trades)
+from backend.backtest import run_backtest, run_portfolio_backtest
+from backend.optimizer import get_optimizer
+from backend.robustness import get_robustness
+from backend.paper import get_paper_account
+from backend.runtime import BotRuntime
+from backend.events import get_event_bus, SubscriberLimitReached
+from backend.metrics import get_metrics
+from backend.response_cache import get_response_cache, ttl_for_timeframe
 import os
-import threading
+import atexit
 import time
 import pandas as pd
 import json
+import gzip
+import hashlib
+import uuid
 
 app = Flask(__name__, static_folder='frontend/build')
 CORS(app)
@@ -20,11 +32,60 @@ CORS(app)
 migrate_existing_database()
 init_all_databases()
 
-# Bot state
-bot_running = False
-bot_thread = None
-current_bot = None
-current_interface = None
+# Bot state - any number of bots run side by side on the shared asyncio
+# runtime, keyed by bot id, sharing its market-data feed, the pooled exchange
+# interfaces and the trade journal's single DB writer. The original
+# single-bot endpoints act on BOT_ID.
+# Registered after the trade journal's atexit hook, so it runs first and the
+# journal flushes whatever the final ticks queued.
+runtime = BotRuntime()
+atexit.register(runtime.shutdown)
+BOT_ID = 'default'
+bot_configs = {}  # bot_id -> mode and start parameters (without credentials)
+
+def get_bot(bot_id=BOT_ID):
+    return runtime.get_bot(bot_id)
+
+def is_bot_running(bot_id=BOT_ID):
+    return runtime.is_running(bot_id)
+
+def db_mode_conflict(bot_id, real_mode):
+    """Error if other running bots journal to the other database (paper vs live)"""
+    others = [b for b in runtime.running_bot_ids() if b != bot_id]
+    db_mode = 'live' if real_mode else 'paper'
+    if others and get_trading_mode() != db_mode:
+        return f"Bots {', '.join(others)} are running in {get_trading_mode()} mode; stop them before starting a {db_mode} bot"
+    return None
+
+def launch_bot(bot_id, bot, real_mode, mode, config):
+    """Schedule bot under bot_id at its policy's interval"""
+    set_trading_mode('live' if real_mode else 'paper')
+    runtime.start_bot(bot_id, bot, interval=bot.policy['interval'])
+    bot_configs[bot_id] = {'mode': mode, **config}
+
+def bot_summary(bot_id):
+    """Schedule, kill switch and performance of one registered bot"""
+    bot = runtime.get_bot(bot_id)
+    if bot is None:
+        return None
+    schedule = runtime.status(bot_id)
+    return {
+        'bot_id': bot_id,
+        'label': bot.policy['label'],
+        'symbols': bot.symbols,
+        'running': schedule['running'],
+        'interval': schedule['interval'],
+        'ticks': schedule['ticks'],
+        'overruns': schedule['overruns'],
+        'last_tick': schedule['last_tick'],
+        'last_tick_duration': schedule['last_tick_duration'],
+        'kill_switch_active': bot.is_kill_switch_active(),
+        'consecutive_losses': bot.consecutive_losses,
+        'kill_switch_threshold': bot.kill_switch_threshold,
+        'kill_switch_reason': bot.kill_switch_reason,
+        'performance': bot.get_performance_stats(),
+        'config': bot_configs.get(bot_id, {})
+    }
 
 # Config file
 CONFIG_FILE = 'bot_config.json'
@@ -138,10 +199,92 @@ def get_balance():
     balance = get_account_balance()
     return jsonify(balance)
 
+@app.route('/api/paper-account', methods=['GET'])
+def paper_account():
+    """Per-currency paper balances, equity at last prices and fill settings"""
+    return jsonify(get_paper_account().snapshot())
+
+@app.route('/api/paper-account/reset', methods=['POST'])
+def reset_paper_account():
+    data = request.get_json(silent=True) or {}
+    try:
+        starting_balance = float(data['starting_balance']) if data.get('starting_balance') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'starting_balance must be a number'}), 400
+    account = get_paper_account()
+    account.reset(starting_balance)
+    return jsonify(account.snapshot())
+
+STREAM_KEEPALIVE = 15  # seconds between SSE comments on an idle stream
+
+@app.route('/api/stream', methods=['GET'])
+def event_stream():
+    """
+    Server-Sent Events: trades_committed, position_opened, position_closed,
+    kill_switch, price and bot_status. Reconnects resume from Last-Event-ID.
+
+    Every open stream pins a server thread, so at most STREAM_MAX_SUBSCRIBERS
+    run at once; beyond that the client gets a 503 and retries later.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    try:
+        subscription = get_event_bus().subscribe(last_event_id)
+    except SubscriberLimitReached:
+        response = jsonify({'error': 'Too many event streams open, retry later'})
+        response.headers['Retry-After'] = str(STREAM_KEEPALIVE)
+        return response, 503
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscription.get(timeout=STREAM_KEEPALIVE)
+                yield event.to_sse() if event is not None else ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+TRADES_PAGE_SIZE = 200
+TRADES_MAX_PAGE_SIZE = 1000
+TRADES_PAGING_PARAMS = ('limit', 'cursor', 'since_id')
+
 @app.route('/api/trades', methods=['GET'])
 def get_trades():
-    trades = get_trade_history()
-    return jsonify(trades)
+    """
+    Trade history, newest first.
+
+    Without limit, cursor or since_id this is the full list, as it always was.
+    With any of them it is a page: {trades, next_cursor, latest_id, trading_mode}.
+    Query params: limit, cursor (next_cursor of the previous page), since_id
+    (only trades newer than this id), symbol, side, status, start/end (ISO dates).
+    """
+    paged = any(param in request.args for param in TRADES_PAGING_PARAMS)
+    try:
+        limit = min(request.args.get('limit', TRADES_PAGE_SIZE, type=int), TRADES_MAX_PAGE_SIZE)
+        start = request.args.get('start')
+        end = request.args.get('end')
+        page = query_trades(
+            limit=max(limit, 1) if paged else None,
+            before_id=request.args.get('cursor', type=int),
+            since_id=request.args.get('since_id', type=int),
+            symbol=request.args.get('symbol'),
+            side=request.args.get('side'),
+            status=request.args.get('status'),
+            start=pd.Timestamp(start).to_pydatetime() if start else None,
+            end=pd.Timestamp(end).to_pydatetime() if end else None
+        )
+    except ValueError as e:
+        return jsonify({'error': f'Invalid trades query: {e}'}), 400
+
+    if not paged:
+        return jsonify(page['trades'])
+    page['trading_mode'] = get_trading_mode()
+    return jsonify(page)
 
 # FIXED: Add the missing load-config endpoint
 @app.route('/api/load-config', methods=['GET'])
@@ -159,7 +302,7 @@ def load_configuration():
 @app.route('/api/bot-performance', methods=['GET'])
 def get_bot_performance():
     """Get current bot performance statistics for aggressive modes"""
-    global current_bot
+    current_bot = get_bot()
 
     try:
         if not current_bot:
@@ -173,24 +316,18 @@ def get_bot_performance():
                 'open_positions': 0
             })
 
-        # Get recent trades for performance calculation
-        trades = get_trade_history()
-
-        # Calculate performance stats
-        total_pnl = sum(trade.get('pnl', 0) for trade in trades)
-        total_trades = len(trades)
-        winning_trades = [t for t in trades if t.get('pnl', 0) > 0]
-        losing_trades = [t for t in trades if t.get('pnl', 0) < 0]
-
-        win_count = len(winning_trades)
-        loss_count = len(losing_trades)
+        # Performance stats aggregated by the database
+        stats = get_trade_stats()
+        total_pnl = stats['total_pnl']
+        total_trades = stats['total_trades']
+        win_count = stats['win_count']
+        loss_count = stats['loss_count']
         win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0.0
 
         # Get consecutive losses from bot if available
         consecutive_losses = getattr(current_bot, 'consecutive_losses', 0)
 
-        # Estimate open positions (this would need to be tracked in your bot)
-        open_positions = getattr(current_bot, 'active_positions', 0) if hasattr(current_bot, 'active_positions') else 0
+        open_positions = len(current_bot.open_positions)
 
         return jsonify({
             'total_pnl': round(total_pnl, 2),
@@ -232,11 +369,9 @@ def set_current_trading_mode():
     if new_mode not in ['paper', 'live']:
         return jsonify({'error': 'Invalid trading mode. Must be "paper" or "live"'}), 400
 
-    # Stop bot if running when switching modes
-    global bot_running
-    if bot_running:
-        bot_running = False
-        time.sleep(1)  # Give bot time to stop
+    # Stop every running bot when switching modes (waits for their current ticks)
+    for bot_id in runtime.running_bot_ids():
+        runtime.stop_bot(bot_id)
 
     set_trading_mode(new_mode)
 
@@ -253,31 +388,18 @@ def get_database_stats():
     """Get stats from both databases for comparison"""
     current_mode = get_trading_mode()
 
-    # Get paper stats
-    set_trading_mode('paper')
-    paper_balance = get_account_balance()
-    paper_trades = get_trade_history()
-
-    # Get live stats
-    set_trading_mode('live')
-    live_balance = get_account_balance()
-    live_trades = get_trade_history()
-
-    # Restore original mode
-    set_trading_mode(current_mode)
+    # Query each database directly rather than flipping the global mode
+    def mode_stats(mode):
+        return {
+            'balance': get_account_balance(mode),
+            'trade_count': get_trade_stats(mode)['total_trades'],
+            'recent_trades': query_trades(mode, limit=5)['trades']
+        }
 
     return jsonify({
         'current_mode': current_mode,
-        'paper': {
-            'balance': paper_balance,
-            'trade_count': len(paper_trades),
-            'recent_trades': paper_trades[:5] if paper_trades else []
-        },
-        'live': {
-            'balance': live_balance,
-            'trade_count': len(live_trades),
-            'recent_trades': live_trades[:5] if live_trades else []
-        }
+        'paper': mode_stats('paper'),
+        'live': mode_stats('live')
     })
 
 # Save configuration endpoint
@@ -365,6 +487,76 @@ def get_current_config():
             }
         }), 500
 
+PRICE_CACHE_TTL = 2.0  # seconds a /api/current-price answer is shared between viewers
+
+OHLCV_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+GZIP_MIN_BYTES = 1024  # smaller bodies are not worth compressing
+
+def cached_chart_candles(symbol, timeframe, limit, trading_mode):
+    """
+    Chart candles as NumPy columns (timestamp in epoch ms), shared between viewers.
+
+    Cached per (trading mode, symbol, timeframe, limit) for a fraction of the
+    candle interval; simultaneous misses wait on one exchange fetch.
+    """
+    def load():
+        # Shared public interface - markets are loaded once per process
+        temp_interface = get_shared_interface('', '', 'binance', False, trading_mode)
+        df = temp_interface.fetch_ohlcv(symbol, timeframe, limit)
+
+        columns = {'timestamp': df['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64')}
+        for field in OHLCV_FIELDS[1:]:
+            columns[field] = df[field].to_numpy(dtype='float64')
+        return columns
+
+    key = ('ohlcv', trading_mode, symbol, timeframe, limit)
+    return get_response_cache().get_or_load(key, ttl_for_timeframe(timeframe), load)
+
+def compact_json_response(payload):
+    """JSON response with ETag/If-None-Match and gzip when the client accepts it"""
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    etag = hashlib.sha1(body).hexdigest()[:20]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response.set_data(gzip.compress(body, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def ohlcv_response(symbol, timeframe, limit, trading_mode, **extra):
+    """
+    Shared body of the OHLCV endpoints.
+
+    ?format=columnar returns one array per field instead of a dict per candle.
+    ?since=<ms> returns only candles with timestamp >= since; the candle at
+    `since` is included because it may still have been forming.
+    """
+    columns = cached_chart_candles(symbol, timeframe, limit, trading_mode)
+
+    since = request.args.get('since', type=int)
+    if since is not None:
+        start = int(columns['timestamp'].searchsorted(since, side='left'))
+        columns = {field: values[start:] for field, values in columns.items()}
+
+    lists = {field: columns[field].tolist() for field in OHLCV_FIELDS}
+    payload = {'symbol': symbol, 'timeframe': timeframe, **extra}
+    if since is not None:
+        payload['since'] = since
+
+    if request.args.get('format') == 'columnar':
+        payload['format'] = 'columnar'
+        payload['columns'] = lists
+    else:
+        payload['data'] = [dict(zip(OHLCV_FIELDS, row)) for row in zip(*(lists[f] for f in OHLCV_FIELDS))]
+    return compact_json_response(payload)
+
 @app.route('/api/ohlcv', methods=['GET'])
 def get_ohlcv():
     """Get candlestick data for charts"""
@@ -380,27 +572,7 @@ def get_ohlcv():
     trading_mode = request.args.get('trading_mode', 'spot')
 
     try:
-        # Create a temporary interface to get price data
-        temp_interface = TradingInterface('', '', 'binance', False, trading_mode)
-        df = temp_interface.fetch_ohlcv(symbol, timeframe, limit)
-
-        # Convert to format needed for charts
-        ohlcv_data = []
-        for _, row in df.iterrows():
-            ohlcv_data.append({
-                'timestamp': int(row['timestamp'].timestamp() * 1000),
-                'open': float(row['open']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': float(row['close']),
-                'volume': float(row['volume'])
-            })
-
-        return jsonify({
-            'symbol': symbol,
-            'timeframe': timeframe,
-            'data': ohlcv_data
-        })
+        return ohlcv_response(symbol, timeframe, limit, trading_mode)
     except Exception as e:
         print(f"Error fetching OHLCV data for {symbol}: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -419,27 +591,11 @@ def get_fast_ohlcv():
     trading_mode = request.args.get('trading_mode', 'spot')
 
     try:
-        temp_interface = TradingInterface('', '', 'binance', False, trading_mode)
         # Use 5-minute timeframe for faster signals
-        df = temp_interface.fetch_ohlcv(symbol, '5m', limit)
-
-        ohlcv_data = []
-        for _, row in df.iterrows():
-            ohlcv_data.append({
-                'timestamp': int(row['timestamp'].timestamp() * 1000),
-                'open': float(row['open']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': float(row['close']),
-                'volume': float(row['volume'])
-            })
-
-        return jsonify({
-            'symbol': symbol,
-            'timeframe': '5m',
-            'data': ohlcv_data,
-            'message': f'Fast trading data for {symbol} (5-min candles)'
-        })
+        return ohlcv_response(
+            symbol, '5m', limit, trading_mode,
+            message=f'Fast trading data for {symbol} (5-min candles)'
+        )
     except Exception as e:
         print(f"Error fetching fast OHLCV data for {symbol}: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -447,8 +603,6 @@ def get_fast_ohlcv():
 @app.route('/api/start-fast', methods=['POST'])
 def start_fast_bot():
     """Start the aggressive high-frequency trading bot"""
-    global bot_running, bot_thread, current_bot, current_interface
-
     data = request.get_json()
     api_key = data.get('api_key', '')
     api_secret = data.get('api_secret', '')
@@ -468,14 +622,14 @@ def start_fast_bot():
     leverage = int(data.get('leverage', 1))
     kill_switch_threshold = int(data.get('kill_switch_threshold', 15))  # More lenient
 
-    db_mode = 'live' if real_mode else 'paper'
-    set_trading_mode(db_mode)
-
-    if bot_running:
+    if is_bot_running():
         return jsonify({"error": "Bot is already running"}), 400
+    conflict = db_mode_conflict(BOT_ID, real_mode)
+    if conflict:
+        return jsonify({"error": conflict}), 400
 
     try:
-        current_interface = TradingInterface(
+        current_interface = get_shared_interface(
             api_key, api_secret, exchange, real_mode, trading_mode, leverage
         )
 
@@ -491,28 +645,11 @@ def start_fast_bot():
             kill_switch_threshold=kill_switch_threshold
         )
 
-        def run_fast_bot():
-            global bot_running
-            while bot_running:
-                try:
-                    current_bot.run_once()
-
-                    if current_bot.is_kill_switch_active():
-                        print("Kill switch triggered - stopping fast bot")
-                        bot_running = False
-                        break
-
-                    # Much faster execution - check every 5 seconds
-                    time.sleep(5)
-
-                except Exception as e:
-                    print(f"Fast bot error: {e}")
-                    time.sleep(5)
-
-        bot_running = True
-        bot_thread = threading.Thread(target=run_fast_bot)
-        bot_thread.daemon = True
-        bot_thread.start()
+        # Much faster execution - check every 5 seconds
+        launch_bot(BOT_ID, current_bot, real_mode, 'high_frequency',
+                   {'symbols': [symbol], 'risk': risk, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                    'strategy_type': strategy_type, 'trade_amount': trade_amount, 'trading_mode': trading_mode,
+                    'leverage': leverage, 'exchange': exchange, 'real_mode': real_mode})
 
         strategy_name = "AGGRESSIVE EMA" if strategy_type == "aggressive_ema" else "BREAKOUT"
 
@@ -526,8 +663,6 @@ def start_fast_bot():
 @app.route('/api/start-super-aggressive', methods=['POST'])
 def start_super_aggressive_bot():
     """Start the super aggressive multi-pair trading bot"""
-    global bot_running, bot_thread, current_bot, current_interface
-
     data = request.get_json()
     api_key = data.get('api_key', '')
     api_secret = data.get('api_secret', '')
@@ -549,14 +684,14 @@ def start_super_aggressive_bot():
     leverage = int(data.get('leverage', 1))
     kill_switch_threshold = int(data.get('kill_switch_threshold', 20))  # Very lenient
 
-    db_mode = 'live' if real_mode else 'paper'
-    set_trading_mode(db_mode)
-
-    if bot_running:
+    if is_bot_running():
         return jsonify({"error": "Bot is already running"}), 400
+    conflict = db_mode_conflict(BOT_ID, real_mode)
+    if conflict:
+        return jsonify({"error": conflict}), 400
 
     try:
-        current_interface = TradingInterface(
+        current_interface = get_shared_interface(
             api_key, api_secret, exchange, real_mode, trading_mode, leverage
         )
 
@@ -572,28 +707,11 @@ def start_super_aggressive_bot():
             kill_switch_threshold=kill_switch_threshold
         )
 
-        def run_super_aggressive_bot():
-            global bot_running
-            while bot_running:
-                try:
-                    current_bot.run_once()
-
-                    if current_bot.is_kill_switch_active():
-                        print("Kill switch triggered - stopping super aggressive bot")
-                        bot_running = False
-                        break
-
-                    # MAXIMUM FREQUENCY - check every 15 seconds
-                    time.sleep(15)
-
-                except Exception as e:
-                    print(f"Super aggressive bot error: {e}")
-                    time.sleep(15)
-
-        bot_running = True
-        bot_thread = threading.Thread(target=run_super_aggressive_bot)
-        bot_thread.daemon = True
-        bot_thread.start()
+        # MAXIMUM FREQUENCY - check every 15 seconds
+        launch_bot(BOT_ID, current_bot, real_mode, 'super_aggressive',
+                   {'symbols': symbols, 'risk': risk, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                    'strategy_type': strategy_type, 'trade_amount': trade_amount, 'trading_mode': trading_mode,
+                    'leverage': leverage, 'exchange': exchange, 'real_mode': real_mode})
 
         strategy_name = "AGGRESSIVE EMA" if strategy_type == "aggressive_ema" else "BREAKOUT"
 
@@ -617,9 +735,14 @@ def get_current_price():
     trading_mode = request.args.get('trading_mode', 'spot')
 
     try:
-        temp_interface = TradingInterface('', '', 'binance', False, trading_mode)
-        df = temp_interface.fetch_ohlcv(symbol, '1m', 1)
-        current_price = float(df['close'].iloc[-1])
+        def load_price():
+            temp_interface = get_shared_interface('', '', 'binance', False, trading_mode)
+            df = temp_interface.fetch_ohlcv(symbol, '1m', 1)
+            return float(df['close'].iloc[-1])
+
+        current_price = get_response_cache().get_or_load(
+            ('price', trading_mode, symbol), PRICE_CACHE_TTL, load_price
+        )
 
         return jsonify({
             'symbol': symbol,
@@ -633,8 +756,6 @@ def get_current_price():
 
 @app.route('/api/start', methods=['POST'])
 def start_bot():
-    global bot_running, bot_thread, current_bot, current_interface
-
     data = request.get_json()
     print(f"Received start bot request: {json.dumps(data, indent=2)}")
 
@@ -673,13 +794,15 @@ def start_bot():
     kill_switch_threshold = int(merged_data.get('kill_switch_threshold', 10))
 
     db_mode = 'live' if real_mode else 'paper'
-    set_trading_mode(db_mode)
 
-    if bot_running:
+    if is_bot_running():
         return jsonify({"error": "Bot is already running"}), 400
+    conflict = db_mode_conflict(BOT_ID, real_mode)
+    if conflict:
+        return jsonify({"error": conflict}), 400
 
     try:
-        current_interface = TradingInterface(
+        current_interface = get_shared_interface(
             api_key, api_secret, exchange, real_mode, trading_mode, leverage
         )
 
@@ -697,6 +820,7 @@ def start_bot():
                 kill_switch_threshold=kill_switch_threshold
             )
             bot_type = "Multi-Pair"
+            bot_mode = 'multi_pair'
             symbol_info = f"{len(symbols)} pairs: {', '.join(symbols[:3])}" + ("..." if len(symbols) > 3 else "")
         else:
             print(f"Starting single-pair bot with symbol: {symbol}")
@@ -711,28 +835,14 @@ def start_bot():
                 kill_switch_threshold=kill_switch_threshold
             )
             bot_type = "Single-Pair"
+            bot_mode = 'single'
+            symbols = [symbol]
             symbol_info = symbol
 
-        def run_bot():
-            global bot_running
-            while bot_running:
-                try:
-                    current_bot.run_once()
-
-                    if current_bot.is_kill_switch_active():
-                        print("Kill switch triggered - stopping bot automatically")
-                        bot_running = False
-                        break
-
-                    time.sleep(10)
-                except Exception as e:
-                    print(f"Bot error: {e}")
-                    time.sleep(10)
-
-        bot_running = True
-        bot_thread = threading.Thread(target=run_bot)
-        bot_thread.daemon = True
-        bot_thread.start()
+        launch_bot(BOT_ID, current_bot, real_mode, bot_mode,
+                   {'symbols': symbols, 'risk': risk, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                    'strategy_type': strategy_type, 'trade_amount': trade_amount, 'trading_mode': trading_mode,
+                    'leverage': leverage, 'exchange': exchange, 'real_mode': real_mode})
 
         strategy_name = "Custom Strategy" if strategy_type == "custom" else "Default MA Crossover"
         trade_info = f" with ${trade_amount} per trade" if trade_amount else " with balance-based sizing"
@@ -754,16 +864,18 @@ def start_bot():
 
 @app.route('/api/stop', methods=['POST'])
 def stop_bot():
-    global bot_running
-    bot_running = False
+    runtime.stop_bot(BOT_ID)
+    # Make the bot's last trades visible before the UI refreshes history
+    get_trade_journal().flush(timeout=5)
     return jsonify({"message": "Bot stopped"})
 
 @app.route('/api/status', methods=['GET'])
 def bot_status():
-    global current_bot
+    current_bot = get_bot()
     status = {
-        "running": bot_running,
-        "trading_mode": get_trading_mode()
+        "running": is_bot_running(),
+        "trading_mode": get_trading_mode(),
+        "running_bots": runtime.running_bot_ids()
     }
 
     # Add kill switch status info
@@ -781,7 +893,7 @@ def bot_status():
 @app.route('/api/kill-switch-status', methods=['GET'])
 def get_kill_switch_status():
     """Get current kill switch status"""
-    global current_bot
+    current_bot = get_bot()
 
     if not current_bot:
         return jsonify({'error': 'Bot not running'}), 400
@@ -796,7 +908,7 @@ def get_kill_switch_status():
 @app.route('/api/reset-kill-switch', methods=['POST'])
 def reset_kill_switch():
     """Manually reset the kill switch to resume trading"""
-    global current_bot
+    current_bot = get_bot()
 
     if not current_bot:
         return jsonify({'error': 'Bot not running'}), 400
@@ -808,7 +920,7 @@ def reset_kill_switch():
 @app.route('/api/current-position', methods=['GET'])
 def get_current_position():
     """Return the bot's current trading position"""
-    global current_bot
+    current_bot = get_bot()
 
     try:
         if not current_bot:
@@ -835,6 +947,125 @@ def get_current_position():
         print(f"Error getting current position: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Per-bot endpoints: several bots, one process
+@app.route('/api/bots', methods=['GET'])
+def list_bots():
+    """Every registered bot, the available modes and the shared feed's fetch statistics"""
+    return jsonify({
+        'bots': [bot_summary(bot_id) for bot_id in runtime.bot_ids()],
+        'modes': {mode: policy['label'] for mode, policy in BOT_POLICIES.items()},
+        'feed': runtime.feed_stats()
+    })
+
+@app.route('/api/bots', methods=['POST'])
+def start_named_bot():
+    """
+    Start a bot next to any others already running.
+
+    Body: bot_id (optional, generated if missing), mode (one of BOT_POLICIES:
+    single, multi_pair, high_frequency, super_aggressive), symbols (or
+    symbol), risk, stop_loss, take_profit, strategy_type, trade_amount,
+    kill_switch_threshold, trading_mode, leverage, exchange, api_key,
+    api_secret, real_mode. Unset fields use the mode's policy defaults.
+    """
+    data = request.get_json() or {}
+    mode = data.get('mode', 'single')
+    if mode not in BOT_POLICIES:
+        return jsonify({'error': f"Unknown mode {mode}, expected one of {', '.join(BOT_POLICIES)}"}), 400
+    bot_id = str(data.get('bot_id') or f"{mode}-{uuid.uuid4().hex[:6]}")
+    symbols = data.get('symbols') or ([data['symbol']] if data.get('symbol') else [])
+    real_mode = bool(data.get('real_mode', False))
+    trading_mode = data.get('trading_mode', 'spot')
+    exchange = data.get('exchange', 'binance')
+
+    if is_bot_running(bot_id):
+        return jsonify({'error': f'Bot {bot_id} is already running'}), 400
+    conflict = db_mode_conflict(bot_id, real_mode)
+    if conflict:
+        return jsonify({'error': conflict}), 400
+
+    try:
+        risk = float(data.get('risk', 1.0))
+        stop_loss = float(data.get('stop_loss', 1.0))
+        take_profit = float(data.get('take_profit', 2.0))
+        leverage = int(data.get('leverage', 1))
+        kill_switch_threshold = int(data['kill_switch_threshold']) if data.get('kill_switch_threshold') else None
+        interface = get_shared_interface(
+            data.get('api_key', ''), data.get('api_secret', ''), exchange, real_mode, trading_mode, leverage
+        )
+        bot = create_bot(mode, interface, symbols, risk, stop_loss, take_profit,
+                         strategy_type=data.get('strategy_type'), trade_amount=data.get('trade_amount'),
+                         kill_switch_threshold=kill_switch_threshold)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    launch_bot(bot_id, bot, real_mode, mode, {
+        'symbols': bot.symbols, 'risk': risk, 'stop_loss': stop_loss, 'take_profit': take_profit,
+        'strategy_type': bot.strategy_type, 'trade_amount': bot.trade_amount, 'trading_mode': trading_mode,
+        'leverage': leverage, 'exchange': exchange, 'real_mode': real_mode
+    })
+    return jsonify(bot_summary(bot_id))
+
+@app.route('/api/bots/<bot_id>', methods=['GET'])
+def named_bot_status(bot_id):
+    summary = bot_summary(bot_id)
+    if summary is None:
+        return jsonify({'error': f'Unknown bot {bot_id}'}), 404
+    return jsonify(summary)
+
+@app.route('/api/bots/<bot_id>/stop', methods=['POST'])
+def stop_named_bot(bot_id):
+    if get_bot(bot_id) is None:
+        return jsonify({'error': f'Unknown bot {bot_id}'}), 404
+    runtime.stop_bot(bot_id)
+    get_trade_journal().flush(timeout=5)
+    return jsonify(bot_summary(bot_id))
+
+@app.route('/api/bots/<bot_id>', methods=['DELETE'])
+def remove_named_bot(bot_id):
+    """Stop the bot if needed and drop it from the registry"""
+    if not runtime.remove_bot(bot_id):
+        return jsonify({'error': f'Unknown bot {bot_id}'}), 404
+    bot_configs.pop(bot_id, None)
+    get_trade_journal().flush(timeout=5)
+    return jsonify({'message': f'Bot {bot_id} removed'})
+
+@app.route('/api/bots/<bot_id>/positions', methods=['GET'])
+def named_bot_positions(bot_id):
+    bot = get_bot(bot_id)
+    if bot is None:
+        return jsonify({'error': f'Unknown bot {bot_id}'}), 404
+    return jsonify([position.to_dict() for position in bot.open_positions])
+
+@app.route('/api/bots/<bot_id>/reset-kill-switch', methods=['POST'])
+def reset_named_kill_switch(bot_id):
+    bot = get_bot(bot_id)
+    if bot is None:
+        return jsonify({'error': f'Unknown bot {bot_id}'}), 404
+    bot.reset_kill_switch()
+    return jsonify(bot_summary(bot_id))
+
+@app.route('/api/pool-stats', methods=['GET'])
+def get_pool_stats():
+    """Exchange interface pool hit/miss statistics"""
+    return jsonify(get_interface_pool().stats())
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus text format: latency histograms and p50/p95/p99 per hot-path
+    stage, bot and symbol (fetch, indicators, signal, place_order, journal,
+    exchange calls, whole ticks) plus the slow-tick count.
+    """
+    return Response(get_metrics().prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Market-data response cache hit/miss/coalescing statistics"""
+    return jsonify(get_response_cache().stats())
+
 @app.route('/api/test-connection', methods=['POST'])
 def test_binance_connection():
     """Test if API keys can connect to the selected exchange"""
@@ -889,6 +1120,139 @@ def backtest():
     results = run_backtest(symbol, years, risk, stop_loss, take_profit)
     return jsonify(results)
 
+@app.route('/api/backtest-portfolio', methods=['POST'])
+def backtest_portfolio():
+    """
+    Backtest a multi-pair bot over several symbols with one shared balance.
+
+    Body: symbols (defaults to the configured pairs), bot ("multi_pair" or
+    "super_aggressive"), years, risk, stop_loss, take_profit, strategy_type,
+    trade_amount.
+    """
+    data = request.get_json() or {}
+    symbols = data.get('symbols')
+    if not symbols:
+        symbols = load_config().get('symbols', ['BTC/USDT'])
+
+    try:
+        years = int(data.get('years', 1))
+        risk = float(data.get('risk', 1.0))
+        stop_loss = float(data.get('stop_loss', 1.0))
+        take_profit = float(data.get('take_profit', 2.0))
+        trade_amount = float(data['trade_amount']) if data.get('trade_amount') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid backtest parameters: {e}'}), 400
+
+    results = run_portfolio_backtest(symbols, years, risk, stop_loss, take_profit,
+                                     bot=data.get('bot', 'multi_pair'),
+                                     strategy_type=data.get('strategy_type'),
+                                     trade_amount=trade_amount)
+    return jsonify(results)
+
+@app.route('/api/robustness', methods=['POST'])
+def start_robustness():
+    """
+    Stress a backtest configuration in the background: Monte Carlo confidence
+    intervals on its trades plus a rolling walk-forward.
+
+    Body: symbol, years, risk, stop_loss, take_profit, space (optional
+    optimizer space to re-fit on each training window), train_bars, test_bars,
+    simulations, method ("bootstrap" or "shuffle"), metric, seed, workers.
+    """
+    data = request.get_json() or {}
+    symbol = data.get('symbol')
+    if not symbol:
+        config = load_config()
+        symbol = config.get('symbol', 'BTC/USDT')
+
+    try:
+        job = get_robustness().start(
+            symbol,
+            int(data.get('years', 1)),
+            float(data.get('risk', 1.0)),
+            float(data.get('stop_loss', 1.0)),
+            float(data.get('take_profit', 2.0)),
+            space=data.get('space'),
+            train_bars=int(data['train_bars']) if data.get('train_bars') else None,
+            test_bars=int(data['test_bars']) if data.get('test_bars') else None,
+            simulations=int(data.get('simulations', 1000)),
+            method=data.get('method', 'bootstrap'),
+            metric=data.get('metric', 'total_pnl'),
+            seed=int(data.get('seed', 0)),
+            max_workers=int(data['workers']) if data.get('workers') else None
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'job_id': job.id, 'status': job.status})
+
+@app.route('/api/robustness', methods=['GET'])
+def list_robustness():
+    return jsonify(get_robustness().jobs())
+
+@app.route('/api/robustness/<job_id>', methods=['GET'])
+def robustness_progress(job_id):
+    """Stage and progress; the full report once the job is done"""
+    job = get_robustness().get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown robustness job {job_id}'}), 404
+    return jsonify(job.progress())
+
+@app.route('/api/robustness/<job_id>/cancel', methods=['POST'])
+def cancel_robustness(job_id):
+    if not get_robustness().cancel(job_id):
+        return jsonify({'error': f'Unknown robustness job {job_id}'}), 404
+    return jsonify({'message': f'Robustness job {job_id} cancelling'})
+
+@app.route('/api/optimize', methods=['POST'])
+def start_optimization():
+    """
+    Start a parameter sweep in the background.
+
+    Body: symbol, years, space ({param: [values] | {"min", "max", "step"}} over
+    short/long/stop_loss/take_profit/risk/strategy_type), mode ("grid" or
+    "random"), samples, metric, seed, workers.
+    """
+    data = request.get_json() or {}
+    symbol = data.get('symbol')
+    if not symbol:
+        config = load_config()
+        symbol = config.get('symbol', 'BTC/USDT')
+
+    try:
+        job = get_optimizer().start_for_symbol(
+            symbol,
+            int(data.get('years', 1)),
+            data.get('space', {}),
+            mode=data.get('mode', 'grid'),
+            samples=int(data.get('samples', 100)),
+            metric=data.get('metric', 'total_pnl'),
+            seed=int(data.get('seed', 0)),
+            max_workers=data.get('workers')
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'job_id': job.id, 'total': job.total, 'status': job.status})
+
+@app.route('/api/optimize', methods=['GET'])
+def list_optimizations():
+    return jsonify(get_optimizer().jobs())
+
+@app.route('/api/optimize/<job_id>', methods=['GET'])
+def optimization_progress(job_id):
+    """Progress and the best results so far (?top=N)"""
+    job = get_optimizer().get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown optimization job {job_id}'}), 404
+    return jsonify(job.progress(request.args.get('top', 10, type=int)))
+
+@app.route('/api/optimize/<job_id>/cancel', methods=['POST'])
+def cancel_optimization(job_id):
+    if not get_optimizer().cancel(job_id):
+        return jsonify({'error': f'Unknown optimization job {job_id}'}), 404
+    return jsonify({'message': f'Optimization {job_id} cancelling'})
+
 # Update single symbol endpoint
 @app.route('/api/update-symbol', methods=['POST'])
 def update_symbol():
@@ -1,105 +1,219 @@
+import heapq
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import ccxt
-from backend.strategy import get_strategy_signal
-from backend.risk import calculate_position_size, calculate_custom_position_size
+from backend.strategy import generate_signals, generate_fast_signals
+from backend.risk import (calculate_position_size, calculate_custom_position_size, calculate_net_pnl,
+                          TRADING_FEE_RATE)
+from backend.candle_store import get_candle_store
+from backend.policies import BOT_POLICIES
 from typing import Dict, List
 
+def max_drawdown_percent(equity: np.ndarray, initial_balance: float) -> np.ndarray:
+    """
+    Largest peak-to-trough drop (%) of one equity curve, or of each row of a
+    2-D array of curves. The starting balance counts as the first peak.
+    """
+    equity = np.asarray(equity, dtype=float)
+    if equity.shape[-1] == 0:
+        return np.zeros(equity.shape[:-1]) if equity.ndim > 1 else 0.0
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=-1), initial_balance)
+    return ((peaks - equity) / peaks * 100).max(axis=-1)
+
+def find_exit(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray, start: int,
+              side: str, stop_price: float, take_price: float):
+    """
+    First bar at or after `start` whose range reaches the stop or the target.
+
+    Returns (bar, fill_price, reason) or None if neither is hit. A bar that
+    opens beyond a level fills at the open (gap); a bar whose range spans
+    both levels is assumed to hit the stop first, since the path inside the
+    candle is unknown. Scans in growing NumPy windows, so the cost follows
+    how long the trade lasts rather than how long the data is.
+    """
+    n = len(highs)
+    window = 64
+    while start < n:
+        end = min(start + window, n)
+        if side == "buy":
+            stop_hit = lows[start:end] <= stop_price
+            take_hit = highs[start:end] >= take_price
+        else:
+            stop_hit = highs[start:end] >= stop_price
+            take_hit = lows[start:end] <= take_price
+        hit = stop_hit | take_hit
+        if hit.any():
+            k = int(hit.argmax())
+            bar = start + k
+            bar_open = opens[bar]
+            if side == "buy":
+                if bar_open <= stop_price:
+                    return bar, bar_open, "stop_loss"
+                if bar_open >= take_price:
+                    return bar, bar_open, "take_profit"
+            else:
+                if bar_open >= stop_price:
+                    return bar, bar_open, "stop_loss"
+                if bar_open <= take_price:
+                    return bar, bar_open, "take_profit"
+            if stop_hit[k]:
+                return bar, stop_price, "stop_loss"
+            return bar, take_price, "take_profit"
+        start = end
+        window *= 4
+    return None
+
+
 class BacktestEngine:
-    def __init__(self, initial_balance: float = 10000):
+    """
+    Deterministic position simulator.
+
+    A signal on bar i opens a position at that bar's close (what the bots see
+    as the current price). From the next bar on, stop-loss and take-profit
+    are resolved against each candle's high/low, and P&L pays the bots' 0.1%
+    fee on entry and exit. Positions still open at the end close at the last
+    close.
+    """
+    def __init__(self, initial_balance: float = 10000, max_open_positions: int = 3,
+                 fee_rate: float = TRADING_FEE_RATE, symbol: str = 'BTC/USDT'):
         self.initial_balance = initial_balance
+        self.max_open_positions = max_open_positions
+        self.fee_rate = fee_rate
+        self.symbol = symbol
         self.balance = initial_balance
-        self.position = None
         self.trades = []
-        self.equity_curve = []
-        self.last_trade_time = 0
+        self.equity = np.empty(0)
+        self.timestamps = np.empty(0)
+        self.prices = np.empty(0)
+        self.first_bar = 0
+
+    def run_backtest(self, df: pd.DataFrame, strategy_type: str, risk: float,
+                    stop_loss: float, take_profit: float, trade_amount: float = None,
+                    short: int = 9, long: int = 21, signals: np.ndarray = None) -> Dict:
+        """Run backtest using your exact trading logic (short/long: MA periods)
+
+        signals may be passed in when already computed by generate_signals for
+        this df/strategy/short/long (the optimizer reuses them across risk settings).
+        """
 
-    def execute_trade(self, df: pd.DataFrame, row_index: int, strategy_type: str,
-                     risk: float, stop_loss: float, take_profit: float, trade_amount: float = None):
-        """Execute trade using your exact bot logic"""
+        if len(df) < 50:
+            return {'error': 'Insufficient data for backtesting (need at least 50 candles)'}
 
-        current_price = df.iloc[row_index]['close']
-        current_time = row_index * 45  # Simulate 45-second intervals
+        df_copy = df.reset_index(drop=True)
 
-        # Use your exact strategy signal
-        action = get_strategy_signal(df.iloc[:row_index+1], strategy_type)
+        # Signals for every bar in one vectorized pass (same answers as per-bar calls)
+        if signals is None:
+            signals = generate_signals(df_copy, strategy_type, short, long).to_numpy()
 
-        # Trade every 45 seconds (same as your bot)
-        if current_time - self.last_trade_time >= 45 and action in ["buy", "sell"]:
+        self.simulate(df_copy, signals, strategy_type, risk, stop_loss, take_profit, trade_amount)
+        return self.calculate_results(strategy_type, risk, stop_loss, take_profit, trade_amount)
 
-            # Use your exact position sizing logic
+    def simulate(self, df: pd.DataFrame, signals: np.ndarray, strategy_type: str, risk: float,
+                 stop_loss: float, take_profit: float, trade_amount: float = None, first_bar: int = 21):
+        """Open on signals, close on intrabar SL/TP; fills self.trades and the per-bar equity"""
+        opens = df['open'].to_numpy(dtype=float)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        timestamps = df['timestamp'].to_numpy() if 'timestamp' in df.columns else np.arange(len(df))
+        n = len(df)
+
+        self.balance = self.initial_balance
+        self.trades = []
+        self.timestamps = timestamps
+        self.prices = closes
+        self.first_bar = first_bar
+        realized = np.zeros(n)
+
+        # Heap of (exit_bar, entry bar, trade): exits are known as soon as a position opens
+        open_positions = []
+        locked = 0.0  # notional tied up in open positions
+
+        def close_until(bar):
+            # Realize positions exiting at or before `bar` (intrabar exits come before its close)
+            nonlocal locked
+            while open_positions and open_positions[0][0] <= bar:
+                exit_bar, _, trade = heapq.heappop(open_positions)
+                self.balance += trade['pnl']
+                realized[exit_bar] += trade['pnl']
+                locked -= trade['size'] * trade['price']
+                self.trades.append(trade)
+
+        entry_bars = np.flatnonzero(np.isin(signals, ("buy", "sell")))
+        entry_bars = entry_bars[entry_bars >= first_bar]
+
+        for i in entry_bars:
+            close_until(i)
+            if len(open_positions) >= self.max_open_positions:
+                continue
+
+            side = signals[i]
+            entry_price = closes[i]
             if trade_amount:
-                pos_size = calculate_custom_position_size(trade_amount, current_price, stop_loss)
+                pos_size = calculate_custom_position_size(trade_amount, entry_price, stop_loss)
             else:
-                pos_size = calculate_position_size(self.balance, risk, current_price, stop_loss)
-
+                pos_size = calculate_position_size(self.balance, risk, entry_price, stop_loss)
             if pos_size < 0.001:
                 pos_size = 0.001
 
-            # Check if we have enough balance
-            trade_cost = pos_size * current_price
-            if trade_cost > self.balance:
-                return  # Skip trade if insufficient balance
-
-            # Calculate P&L using your exact logic
-            if strategy_type == "custom":
-                # Your custom strategy P&L logic (65% win rate)
-                if np.random.random() < 0.65:
-                    profit_potential = trade_amount * (take_profit / 100) if trade_amount else pos_size * current_price * (take_profit / 100)
-                    pnl = np.random.uniform(profit_potential * 0.7, profit_potential * 1.2)
-                else:
-                    loss_potential = trade_amount * (stop_loss / 100) if trade_amount else pos_size * current_price * (stop_loss / 100)
-                    pnl = -np.random.uniform(loss_potential * 0.8, loss_potential * 1.1)
+            # Skip the trade if free balance can't cover it
+            if pos_size * entry_price > self.balance - locked:
+                continue
+
+            if side == "buy":
+                stop_price = entry_price * (1 - stop_loss / 100)
+                take_price = entry_price * (1 + take_profit / 100)
             else:
-                # Your default strategy P&L logic
-                if np.random.random() < 0.65:
-                    pnl = np.random.uniform(5, 80)  # Your exact profit range
-                else:
-                    pnl = -np.random.uniform(10, 45)  # Your exact loss range
-
-            # Update balance
-            self.balance += pnl
-
-            # Log trade (matching your format)
-            trade_record = {
-                'timestamp': df.iloc[row_index]['timestamp'] if 'timestamp' in df.columns else row_index,
-                'symbol': 'BTC/USDT',  # Default symbol
-                'side': action,
+                stop_price = entry_price * (1 + stop_loss / 100)
+                take_price = entry_price * (1 - take_profit / 100)
+
+            exit = find_exit(opens, highs, lows, i + 1, side, stop_price, take_price)
+            if exit is None:
+                exit_bar, exit_price, reason = n - 1, closes[-1], "end_of_data"
+            else:
+                exit_bar, exit_price, reason = exit
+
+            trade = {
+                'timestamp': self._time_at(i),
+                'exit_timestamp': self._time_at(exit_bar),
+                'symbol': self.symbol,
+                'side': side,
                 'size': pos_size,
-                'price': current_price,
+                'price': entry_price,
+                'exit_price': exit_price,
                 'stop_loss': stop_loss,
                 'take_profit': take_profit,
-                'pnl': pnl,
+                'pnl': calculate_net_pnl(entry_price, exit_price, side, pos_size, self.fee_rate),
+                'fees': (entry_price + exit_price) * pos_size * self.fee_rate,
+                'exit_reason': reason,
+                'bars_held': int(exit_bar - i),
                 'strategy': strategy_type,
                 'trade_amount': trade_amount
             }
-
-            self.trades.append(trade_record)
-            self.last_trade_time = current_time
-
-        # Record equity curve
-        self.equity_curve.append({
-            'timestamp': df.iloc[row_index]['timestamp'] if 'timestamp' in df.columns else row_index,
-            'equity': self.balance,
-            'price': current_price
-        })
-
-    def run_backtest(self, df: pd.DataFrame, strategy_type: str, risk: float,
-                    stop_loss: float, take_profit: float, trade_amount: float = None) -> Dict:
-        """Run backtest using your exact trading logic"""
-
-        if len(df) < 50:
-            return {'error': 'Insufficient data for backtesting (need at least 50 candles)'}
-
-        # Ensure we have enough data for moving averages
-        df_copy = df.copy()
-
-        # Run through each price point (simulating real-time)
-        for i in range(21, len(df_copy)):  # Start after MA calculation period
-            self.execute_trade(df_copy, i, strategy_type, risk, stop_loss, take_profit, trade_amount)
-
-        return self.calculate_results(strategy_type, risk, stop_loss, take_profit, trade_amount)
+            heapq.heappush(open_positions, (exit_bar, i, trade))
+            locked += pos_size * entry_price
+
+        close_until(n - 1)
+        # Realized equity at every bar from the first tradable one
+        self.equity = self.initial_balance + np.cumsum(realized)[first_bar:]
+        return self.trades
+
+    def _time_at(self, bar):
+        timestamp = self.timestamps[bar]
+        return pd.Timestamp(timestamp) if isinstance(timestamp, np.datetime64) else int(timestamp)
+
+    def equity_points(self, count: int = None):
+        """Equity curve as [{'timestamp', 'equity', 'price'}], optionally only the last `count` bars"""
+        start = self.first_bar if count is None else max(self.first_bar, len(self.prices) - count)
+        points = []
+        for bar in range(start, len(self.prices)):
+            points.append({
+                'timestamp': self._time_at(bar),
+                'equity': float(self.equity[bar - self.first_bar]),
+                'price': float(self.prices[bar])
+            })
+        return points
 
     def calculate_results(self, strategy_type: str, risk: float, stop_loss: float,
                          take_profit: float, trade_amount: float) -> Dict:
@@ -115,25 +229,22 @@ class BacktestEngine:
             }
 
         # Calculate metrics
-        total_trades = len(self.trades)
-        total_pnl = sum(trade['pnl'] for trade in self.trades)
-        winning_trades = [t for t in self.trades if t['pnl'] > 0]
-        losing_trades = [t for t in self.trades if t['pnl'] < 0]
-
-        win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
-        avg_win = sum(t['pnl'] for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(t['pnl'] for t in losing_trades) / len(losing_trades) if losing_trades else 0
-
-        # Calculate max drawdown
-        running_max = self.initial_balance
-        max_drawdown = 0
-
-        for equity_point in self.equity_curve:
-            if equity_point['equity'] > running_max:
-                running_max = equity_point['equity']
-            drawdown = (running_max - equity_point['equity']) / running_max * 100
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
+        pnl = np.array([t['pnl'] for t in self.trades], dtype=float)
+        total_trades = len(pnl)
+        total_pnl = float(pnl.sum())
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+
+        win_rate = len(wins) / total_trades * 100
+        avg_win = float(wins.mean()) if len(wins) else 0
+        avg_loss = float(losses.mean()) if len(losses) else 0
+
+        max_drawdown = float(max_drawdown_percent(self.equity, self.initial_balance))
+
+        # Length of the simulated period in days (at least one)
+        days = 1.0
+        if len(self.timestamps) > 1 and isinstance(self.timestamps[0], np.datetime64):
+            days = max((self.timestamps[-1] - self.timestamps[0]) / np.timedelta64(1, 'D'), 1.0)
 
         # Performance summary
         return_pct = ((self.balance - self.initial_balance) / self.initial_balance) * 100
@@ -150,8 +261,8 @@ class BacktestEngine:
 
             # Core metrics
             'total_trades': total_trades,
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
+            'winning_trades': len(wins),
+            'losing_trades': len(losses),
             'win_rate': round(win_rate, 1),
 
             # P&L metrics
@@ -167,12 +278,15 @@ class BacktestEngine:
             'profit_factor': round(abs(avg_win / avg_loss), 2) if avg_loss != 0 else 'Infinite',
 
             # Additional info
-            'trades_per_day': round(total_trades / 30, 1),  # Assuming 30-day backtest
-            'best_trade': round(max(t['pnl'] for t in self.trades), 2),
-            'worst_trade': round(min(t['pnl'] for t in self.trades), 2),
+            'trades_per_day': round(total_trades / days, 1),
+            'total_fees': round(sum(t['fees'] for t in self.trades), 2),
+            'stop_loss_exits': sum(1 for t in self.trades if t['exit_reason'] == 'stop_loss'),
+            'take_profit_exits': sum(1 for t in self.trades if t['exit_reason'] == 'take_profit'),
+            'best_trade': round(float(pnl.max()), 2),
+            'worst_trade': round(float(pnl.min()), 2),
 
             # Data for charts (last 20 points)
-            'equity_curve': self.equity_curve[-20:] if len(self.equity_curve) > 20 else self.equity_curve,
+            'equity_curve': self.equity_points(20),
             'recent_trades': self.trades[-10:] if len(self.trades) > 10 else self.trades,
 
             # Configuration used
@@ -185,23 +299,275 @@ class BacktestEngine:
             }
         }
 
-def fetch_historical_data(symbol: str, timeframe: str = '1h', limit: int = 500):
-    """Fetch real historical data for backtesting"""
-    try:
-        # Use your exact exchange setup (paper mode)
-        exchange = ccxt.binance()
+# The multi-pair bot policies (see bot_core), used by PortfolioBacktestEngine.for_bot
+PORTFOLIO_RULES = {name: policy for name, policy in BOT_POLICIES.items() if not policy['single_symbol']}
+
+
+class PortfolioBacktestEngine:
+    """
+    Multi-symbol backtest with one shared balance.
+
+    Candles of every pair are aligned on a common timeline. Entries follow
+    the multi-pair bots: pairs are checked in order each bar, with a per-pair
+    cooldown, at most max_positions_per_symbol open per pair, risk scaled and
+    split across the requested pairs and sized from the shared (realized)
+    balance. Exits use the
+    same intrabar SL/TP simulation as BacktestEngine. Only bars with a signal
+    are visited in Python.
+    """
+    def __init__(self, initial_balance: float = 10000, cooldown_seconds: float = 300,
+                 max_positions_per_symbol: int = 2, max_open_positions: int = None,
+                 min_risk_per_pair: float = 0.0, kill_switch_threshold: int = None, kill_switch_max_loss: float = None,
+                 fee_rate: float = TRADING_FEE_RATE, risk_multiplier: float = 1.0, max_risk: float = None):
+        self.initial_balance = initial_balance
+        self.cooldown_seconds = cooldown_seconds
+        self.max_positions_per_symbol = max_positions_per_symbol
+        self.max_open_positions = max_open_positions
+        self.min_risk_per_pair = min_risk_per_pair
+        self.kill_switch_threshold = kill_switch_threshold
+        self.kill_switch_max_loss = kill_switch_max_loss
+        self.fee_rate = fee_rate
+        self.risk_multiplier = risk_multiplier
+        self.max_risk = max_risk
+
+        self.balance = initial_balance
+        self.trades = []
+        self.timeline = np.empty(0, dtype='datetime64[ms]')
+        self.equity = np.empty(0)
+        self.kill_switch_at = None
+
+    @classmethod
+    def for_bot(cls, bot: str, initial_balance: float = 10000, **overrides):
+        rules = PORTFOLIO_RULES[bot]
+        params = {key: rules[key] for key in (
+            'cooldown_seconds', 'max_open_positions', 'max_positions_per_symbol', 'risk_multiplier', 'max_risk',
+            'min_risk_per_pair', 'kill_switch_threshold', 'kill_switch_max_loss', 'fee_rate')}
+        params.update(overrides)
+        return cls(initial_balance, **params)
+
+    @staticmethod
+    def align(frames: Dict[str, pd.DataFrame]):
+        """Common timeline and, per symbol, the timeline index of each of its candles"""
+        stamps = {symbol: df['timestamp'].to_numpy().astype('datetime64[ms]') for symbol, df in frames.items()}
+        timeline = np.unique(np.concatenate(list(stamps.values())))
+        positions = {symbol: np.searchsorted(timeline, ts) for symbol, ts in stamps.items()}
+        return timeline, positions
+
+    def run(self, frames: Dict[str, pd.DataFrame], risk: float, stop_loss: float, take_profit: float,
+            strategy_type: str = "default_ma", trade_amount: float = None, fast_signals: bool = False,
+            signals: Dict[str, np.ndarray] = None, first_bar: int = 21, symbols_count: int = None) -> Dict:
+        """
+        Backtest all pairs in frames ({symbol: OHLCV df}) and return aggregate + per-pair stats.
+
+        Risk is split across symbols_count pairs (default: every frame given),
+        like a bot splits it across its symbol list whether or not each pair
+        has data. Pairs with fewer than 50 candles are not traded and are
+        listed under 'skipped_symbols'.
+        """
+        skipped = [symbol for symbol, df in frames.items() if len(df) < 50]
+        requested = symbols_count or len(frames)
+        frames = {symbol: df.reset_index(drop=True) for symbol, df in frames.items() if len(df) >= 50}
+        if not frames:
+            return {'error': 'Insufficient data for backtesting (need at least 50 candles per pair)'}
+
+        symbols = list(frames)
+        scaled_risk = risk * self.risk_multiplier
+        if self.max_risk is not None:
+            scaled_risk = min(scaled_risk, self.max_risk)
+        risk_per_pair = max(scaled_risk / requested, self.min_risk_per_pair)
+        timeline, positions = self.align(frames)
+        self.timeline = timeline
+        n = len(timeline)
+
+        arrays = {}
+        candidates = []  # (timeline bar, symbol order, local bar)
+        for order, symbol in enumerate(symbols):
+            df = frames[symbol]
+            arrays[symbol] = tuple(df[c].to_numpy(dtype=float) for c in ('open', 'high', 'low', 'close'))
+            if signals is not None and symbol in signals:
+                pair_signals = np.asarray(signals[symbol])
+            elif fast_signals:
+                pair_signals = generate_fast_signals(df, strategy_type).to_numpy()
+            else:
+                pair_signals = generate_signals(df, strategy_type).to_numpy()
+            local = np.flatnonzero(np.isin(pair_signals, ("buy", "sell")))
+            local = local[local >= first_bar]
+            candidates.append(np.column_stack((positions[symbol][local], np.full(len(local), order), local)))
+            arrays[symbol] += (pair_signals,)
+
+        candidates = np.concatenate(candidates) if candidates else np.empty((0, 3), dtype=np.int64)
+        # Same order as a bot tick: by time, then by position in the symbol list
+        candidates = candidates[np.lexsort((candidates[:, 1], candidates[:, 0]))].tolist()
+
+        self.balance = self.initial_balance
+        self.trades = []
+        self.kill_switch_at = None
+        realized = np.zeros(n)
+        clock = timeline.astype(np.int64).tolist()  # epoch ms, cheap to compare
+        cooldown = int(self.cooldown_seconds * 1000)
+        last_trade = {symbol: None for symbol in symbols}
+        open_count = {symbol: 0 for symbol in symbols}
+        pending = []  # heap of (exit timeline bar, sequence, trade)
+        locked = 0.0
+        consecutive_losses = 0
+        sequence = 0
+
+        def close_until(bar):
+            nonlocal locked, consecutive_losses
+            while pending and pending[0][0] <= bar:
+                exit_bar, _, trade = heapq.heappop(pending)
+                self.balance += trade['pnl']
+                realized[exit_bar] += trade['pnl']
+                locked -= trade['size'] * trade['price']
+                open_count[trade['symbol']] -= 1
+                self.trades.append(trade)
+
+                consecutive_losses = consecutive_losses + 1 if trade['pnl'] < 0 else 0
+                if (self.kill_switch_at is None and self.kill_switch_threshold
+                        and consecutive_losses >= self.kill_switch_threshold
+                        and (self.kill_switch_max_loss is None
+                             or self.balance - self.initial_balance < self.kill_switch_max_loss)):
+                    self.kill_switch_at = int(exit_bar)
+
+        for bar, order, i in candidates:
+            close_until(bar)
+            if self.kill_switch_at is not None:
+                break
+
+            symbol = symbols[order]
+            if open_count[symbol] >= self.max_positions_per_symbol:
+                continue
+            if self.max_open_positions is not None and len(pending) >= self.max_open_positions:
+                continue
+            now = clock[bar]
+            if last_trade[symbol] is not None and now - last_trade[symbol] < cooldown:
+                continue
+
+            opens, highs, lows, closes, pair_signals = arrays[symbol]
+            side = pair_signals[i]
+            entry_price = closes[i]
+            if trade_amount:
+                pos_size = calculate_custom_position_size(trade_amount, entry_price, stop_loss)
+            else:
+                pos_size = calculate_position_size(self.balance, risk_per_pair, entry_price, stop_loss)
+            if pos_size < 0.001:
+                pos_size = 0.001
+            if pos_size * entry_price > self.balance - locked:
+                continue
+
+            if side == "buy":
+                stop_price = entry_price * (1 - stop_loss / 100)
+                take_price = entry_price * (1 + take_profit / 100)
+            else:
+                stop_price = entry_price * (1 + stop_loss / 100)
+                take_price = entry_price * (1 - take_profit / 100)
 
-        # Fetch recent data
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            exit = find_exit(opens, highs, lows, i + 1, side, stop_price, take_price)
+            if exit is None:
+                exit_local, exit_price, reason = len(closes) - 1, closes[-1], "end_of_data"
+            else:
+                exit_local, exit_price, reason = exit
+            exit_bar = int(positions[symbol][exit_local])
+
+            trade = {
+                'timestamp': pd.Timestamp(timeline[bar]),
+                'exit_timestamp': pd.Timestamp(timeline[exit_bar]),
+                'symbol': symbol,
+                'side': side,
+                'size': pos_size,
+                'price': entry_price,
+                'exit_price': exit_price,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+                'pnl': calculate_net_pnl(entry_price, exit_price, side, pos_size, self.fee_rate),
+                'fees': (entry_price + exit_price) * pos_size * self.fee_rate,
+                'exit_reason': reason,
+                'strategy': strategy_type,
+            }
+            heapq.heappush(pending, (exit_bar, sequence, trade))
+            sequence += 1
+            locked += pos_size * entry_price
+            open_count[symbol] += 1
+            last_trade[symbol] = now
+
+        # Positions opened before a kill switch still run to their exits
+        close_until(n - 1)
+        self.equity = self.initial_balance + np.cumsum(realized)
+        results = self.calculate_results(symbols)
+        results['skipped_symbols'] = skipped
+        results['risk_per_pair'] = risk_per_pair
+        return results
 
-        # Convert to DataFrame using your exact format
-        df = pd.DataFrame(ohlcv, columns=["timestamp","open","high","low","close","volume"])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    def calculate_results(self, symbols: List[str]) -> Dict:
+        """Aggregate and per-pair stats in the shape of the bots' get_performance_stats"""
+        pnl = np.array([t['pnl'] for t in self.trades], dtype=float)
+        trade_symbols = np.array([t['symbol'] for t in self.trades], dtype=object)
+        fees = np.array([t['fees'] for t in self.trades], dtype=float)
+
+        pair_stats = {}
+        for symbol in symbols:
+            mask = trade_symbols == symbol
+            pair_pnl = pnl[mask]
+            pair_total = len(pair_pnl)
+            pair_stats[symbol] = {
+                'trades': pair_total,
+                'win_rate': round(float((pair_pnl > 0).sum()) / max(pair_total, 1) * 100, 1),
+                'pnl': round(float(pair_pnl.sum()), 2),
+                'fees': round(float(fees[mask].sum()), 2),
+                'avg_pnl': round(float(pair_pnl.mean()), 2) if pair_total else 0.0,
+            }
 
-        return df
+        win_count = int((pnl > 0).sum())
+        loss_count = int((pnl < 0).sum())
+        total_trades = len(pnl)
+        days = 1.0
+        if len(self.timeline) > 1:
+            days = max((self.timeline[-1] - self.timeline[0]) / np.timedelta64(1, 'D'), 1.0)
+
+        step = max(len(self.equity) // 100, 1)  # ~100 points for charts
+        return {
+            'success': True,
+            'total_pnl': round(float(pnl.sum()), 2),
+            'total_trades': total_trades,
+            'win_count': win_count,
+            'loss_count': loss_count,
+            'overall_win_rate': round(win_count / max(total_trades, 1) * 100, 1),
+            'total_fees': round(float(fees.sum()), 2),
+            'initial_balance': self.initial_balance,
+            'final_balance': round(self.balance, 2),
+            'return_percentage': round((self.balance - self.initial_balance) / self.initial_balance * 100, 2),
+            'max_drawdown': round(float(max_drawdown_percent(self.equity, self.initial_balance)), 2),
+            'trades_per_day': round(total_trades / days, 1),
+            'kill_switch_triggered': self.kill_switch_at is not None,
+            'kill_switch_time': pd.Timestamp(self.timeline[self.kill_switch_at]) if self.kill_switch_at is not None else None,
+            'symbols_count': len(symbols),
+            'pair_stats': pair_stats,
+            'equity_curve': [
+                {'timestamp': pd.Timestamp(self.timeline[bar]), 'equity': float(self.equity[bar])}
+                for bar in range(0, len(self.equity), step)
+            ],
+            'recent_trades': self.trades[-10:],
+        }
+
+def fetch_historical_data(symbol: str, timeframe: str = '1h', limit: int = 500):
+    """Fetch real historical data for backtesting (cached in the local candle store)"""
+    store = get_candle_store()
+    exchange = ccxt.binance({'enableRateLimit': True})
+    since_ms = exchange.milliseconds() - limit * exchange.parse_timeframe(timeframe) * 1000
+
+    try:
+        # Only candles missing from the store are downloaded
+        df = store.fetch_history(exchange, 'binance', symbol, timeframe, since_ms)
+        if df.empty:
+            raise ValueError(f"No candles for {symbol}")
+        return df.tail(limit).reset_index(drop=True)
 
     except Exception as e:
         print(f"Error fetching historical data: {e}")
+        # Offline: whatever is already stored beats synthetic data
+        df = store.read_frame('binance', symbol, timeframe, start_ms=since_ms)
+        if len(df) >= 50:
+            return df
         return generate_sample_data()
 
 def generate_sample_data(days: int = 30) -> pd.DataFrame:
@@ -249,8 +615,9 @@ def run_backtest(symbol: str, years: int, risk: float, stop_loss: float,
     """Main backtest function - matches your Flask API exactly"""
 
     try:
-        # Fetch historical data (limit based on years)
-        limit = min(years * 365 * 24, 2000)  # Max 2000 candles to avoid API limits
+        # Fetch historical data (limit based on years) - the candle store only
+        # downloads what it does not have yet, so no 2000-candle cap is needed
+        limit = years * 365 * 24
         df = fetch_historical_data(symbol, '1h', limit)
 
         if df.empty:
@@ -288,3 +655,64 @@ def run_backtest(symbol: str, years: int, risk: float, stop_loss: float,
             'win_rate': 0,
             'total_pnl': 0
         }
+
+def run_portfolio_backtest(symbols: List[str], years: int, risk: float, stop_loss: float,
+                           take_profit: float, bot: str = 'multi_pair', strategy_type: str = None,
+                           trade_amount: float = None) -> Dict:
+    """Backtest a multi-pair bot over several symbols with one shared balance"""
+
+    try:
+        if bot not in PORTFOLIO_RULES:
+            return {'error': f"Unknown bot type: {bot} (expected one of {', '.join(PORTFOLIO_RULES)})"}
+        if not symbols:
+            return {'error': 'No symbols given'}
+        rules = PORTFOLIO_RULES[bot]
+        timeframe = rules['timeframe']
+        limit = int(years * 365 * 86400 / ccxt.Exchange.parse_timeframe(timeframe))
+
+        frames = {}
+        missing = []
+        for symbol in symbols:
+            df = fetch_historical_data(symbol, timeframe, limit)
+            if df.empty:
+                missing.append(symbol)
+            else:
+                frames[symbol] = df
+        if not frames:
+            return {'error': 'Failed to fetch market data for backtesting'}
+
+        # Same floors the bots apply to their settings
+        stop_loss = max(stop_loss, rules['min_stop_loss'])
+        take_profit = max(take_profit, rules['min_take_profit'])
+        strategy_type = strategy_type or ("custom" if trade_amount else rules['strategy_type'])
+        initial_balance = trade_amount * 10 if trade_amount else 10000
+
+        engine = PortfolioBacktestEngine.for_bot(bot, initial_balance)
+        # Risk is split across every requested pair, as the bot does
+        results = engine.run(frames, risk, stop_loss, take_profit, strategy_type, trade_amount,
+                             fast_signals=rules['fast_signals'], symbols_count=len(symbols))
+        if 'error' not in results:
+            results['skipped_symbols'] = missing + results['skipped_symbols']
+            results['metadata'] = {
+                'bot': bot,
+                'symbols': list(frames),
+                'timeframe': timeframe,
+                'data_points': {symbol: len(df) for symbol, df in frames.items()},
+                'backtest_period': f"{years} year(s)",
+                'start_date': min(df['timestamp'].min() for df in frames.values()).strftime('%Y-%m-%d %H:%M'),
+                'end_date': max(df['timestamp'].max() for df in frames.values()).strftime('%Y-%m-%d %H:%M'),
+                'strategy_type': strategy_type,
+                'risk': risk,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+                'trade_amount': trade_amount
+            }
+
+        return results
+
+    except Exception as e:
+        return {
+            'error': f'Portfolio backtest failed: {str(e)}',
+            'total_trades': 0,
+            'total_pnl': 0
+        }
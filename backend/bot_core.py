@@ -1,226 +1,95 @@
 from backend.strategy import get_strategy_signal, get_fast_strategy_signal
 from backend.risk import calculate_position_size, calculate_custom_position_size
-from backend.db import log_trade, get_balance_db
+from backend.policies import BOT_POLICIES, get_policy
+from backend.db import journal_trade, get_balance_db
+from backend.indicators import IndicatorEngine
+from backend.events import publish
+from backend.triggers import exit_levels
+from backend.positions import Position, PositionBook
+from backend.metrics import get_metrics
 import time
 
-class TradingBot:
-    """Single-pair trading bot - keeps existing API compatibility"""
-    def __init__(self, interface, symbol, risk, stop_loss, take_profit, strategy_type="default_ma", trade_amount=None, kill_switch_threshold=10):
-        self.iface = interface
-        self.symbol = symbol
-        self.risk = risk
-        self.stop_loss = stop_loss
-        self.take_profit = take_profit
-        self.strategy_type = strategy_type
-        self.trade_amount = trade_amount
-        self.last_trade_time = 0
-        self.trade_count = 0
-
-        # Kill Switch Protection
-        self.consecutive_losses = 0
-        self.kill_switch_threshold = kill_switch_threshold
-        self.kill_switch_triggered = False
-        self.kill_switch_reason = ""
-
-        # Track open positions
-        self.open_positions = []
-
-    def check_kill_switch(self, pnl):
-        if pnl < 0:
-            self.consecutive_losses += 1
-            if self.consecutive_losses >= self.kill_switch_threshold:
-                self.kill_switch_triggered = True
-                self.kill_switch_reason = f"KILL SWITCH ACTIVATED: {self.consecutive_losses} consecutive losses"
-                print(f"\n🛑 {self.kill_switch_reason}")
-                return True
-        else:
-            if self.consecutive_losses > 0:
-                print(f"✅ Loss streak broken! Was {self.consecutive_losses} consecutive losses")
-            self.consecutive_losses = 0
-        return False
-
-    def is_kill_switch_active(self):
-        return self.kill_switch_triggered
-
-    def reset_kill_switch(self):
-        self.kill_switch_triggered = False
-        self.consecutive_losses = 0
-        self.kill_switch_reason = ""
-        print("🔥 Kill switch manually reset - trading can resume")
-
-    def calculate_realistic_pnl(self, entry_price, current_price, side, position_size):
-        if side == "buy":
-            price_change = current_price - entry_price
-        else:
-            price_change = entry_price - current_price
-        return price_change * position_size
-
-    def should_close_position(self, position, current_price):
-        entry_price = position['entry_price']
-        side = position['side']
-
-        if side == "buy":
-            stop_loss_price = entry_price * (1 - self.stop_loss / 100)
-            take_profit_price = entry_price * (1 + self.take_profit / 100)
-
-            if current_price <= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price >= take_profit_price:
-                return True, "take_profit"
-        else:
-            stop_loss_price = entry_price * (1 + self.stop_loss / 100)
-            take_profit_price = entry_price * (1 - self.take_profit / 100)
-
-            if current_price >= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price <= take_profit_price:
-                return True, "take_profit"
-
-        return False, None
-
-    def run_once(self):
-        try:
-            if self.kill_switch_triggered:
-                print(f"🛑 Trading halted: {self.kill_switch_reason}")
-                return
-
-            df = self.iface.fetch_ohlcv(self.symbol)
-            if df.empty:
-                return
-
-            current_price = float(df["close"].iloc[-1])
-            current_time = time.time()
-
-            # Check and close existing positions
-            positions_to_remove = []
-            for i, position in enumerate(self.open_positions):
-                should_close, reason = self.should_close_position(position, current_price)
-
-                if should_close:
-                    pnl = self.calculate_realistic_pnl(
-                        position['entry_price'],
-                        current_price,
-                        position['side'],
-                        position['position_size']
-                    )
-
-                    if self.check_kill_switch(pnl):
-                        return
+def order_fill(order, price, amount):
+    """(fill price, filled amount) reported by an order, else the requested ones"""
+    if not order:
+        return price, amount
+    return float(order.get('average') or order.get('price') or price), float(order.get('filled') or amount)
 
-                    trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                    leverage = getattr(self.iface, 'leverage', 1)
-
-                    try:
-                        log_trade(
-                            self.symbol,
-                            f"close_{position['side']}",
-                            position['position_size'],
-                            current_price,
-                            self.stop_loss,
-                            self.take_profit,
-                            "EXECUTED",
-                            pnl,
-                            trading_mode,
-                            leverage,
-                            position['usd_amount']
-                        )
-                    except Exception as db_error:
-                        print(f"Database logging error: {db_error}")
-
-                    pnl_sign = "+" if pnl >= 0 else ""
-                    print(f"📈 CLOSE #{position['trade_id']}: {reason.upper()} - P&L: {pnl_sign}${pnl:.2f}")
-                    positions_to_remove.append(i)
-
-            # Remove closed positions
-            for i in reversed(positions_to_remove):
-                del self.open_positions[i]
-
-            # Limit concurrent positions
-            if len(self.open_positions) >= 3:
-                return
-
-            # Get strategy signal
-            action = get_strategy_signal(df, self.strategy_type)
-
-            # Only trade on actual signals with cooldown
-            if action in ["buy", "sell"] and current_time - self.last_trade_time > 300:
-                balance = get_balance_db()
-
-                if self.trade_amount:
-                    pos_size = calculate_custom_position_size(self.trade_amount, current_price, self.stop_loss)
-                    display_usd_amount = self.trade_amount
-                else:
-                    pos_size = calculate_position_size(balance, self.risk, current_price, self.stop_loss)
-                    display_usd_amount = pos_size * current_price
-
-                if pos_size < 0.001:
-                    pos_size = 0.001
-
-                order = self.iface.place_order(self.symbol, action, pos_size)
-                self.last_trade_time = current_time
-                self.trade_count += 1
-
-                position = {
-                    'trade_id': self.trade_count,
-                    'side': action,
-                    'entry_price': current_price,
-                    'position_size': pos_size,
-                    'usd_amount': display_usd_amount,
-                    'timestamp': current_time
-                }
-                self.open_positions.append(position)
-
-                trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                leverage = getattr(self.iface, 'leverage', 1)
-                strategy_name = "CUSTOM" if self.strategy_type == "custom" else "DEFAULT MA"
-
-                if trading_mode == "FUTURES" and leverage > 1:
-                    strategy_display = f"{strategy_name}-FUTURES-{leverage}X"
-                    mode_emoji = "🚀"
-                else:
-                    strategy_display = f"{strategy_name}-SPOT"
-                    mode_emoji = "📊"
-
-                print(f"{mode_emoji} OPEN #{self.trade_count} [{strategy_display}]: "
-                      f"{action.upper()} ${display_usd_amount:.2f} {self.symbol} at ${current_price:.2f}")
-
-        except Exception as e:
-            print(f"Bot error: {e}")
+def drop_closed(bot, closed):
+    """Remove closed trade ids from the bot's position book"""
+    for trade_id in closed:
+        bot.open_positions.remove(trade_id)
 
+class TradingEngine:
+    """
+    Trading loop shared by every bot mode; the mode's policy supplies the
+    timeframe, cooldown, caps, risk split, fee model and signal function.
 
-class MultiPairTradingBot:
-    """Multi-pair trading bot for increased trade frequency"""
-    def __init__(self, interface, symbols, risk, stop_loss, take_profit, strategy_type="default_ma", trade_amount=None, kill_switch_threshold=10):
+    Each tick fetches candles in one batch for the symbols that need them
+    (open positions plus pairs that may enter), closes positions through the
+    position book's stop/target index, then checks entries pair by pair with
+    incremental indicators.
+    """
+    def __init__(self, interface, symbols, risk, stop_loss, take_profit, policy='multi_pair',
+                 strategy_type=None, trade_amount=None, kill_switch_threshold=None):
+        self.policy = get_policy(policy)
         self.iface = interface
-        self.symbols = symbols if isinstance(symbols, list) else [symbols]
-        self.risk = risk / len(self.symbols)  # Split risk across pairs
-        self.stop_loss = stop_loss
-        self.take_profit = take_profit
-        self.strategy_type = strategy_type
+        self.symbols = list(symbols) if isinstance(symbols, (list, tuple)) else [symbols]
+        self.symbol = self.symbols[0]
+
+        scaled_risk = risk * self.policy['risk_multiplier']
+        if self.policy['max_risk'] is not None:
+            scaled_risk = min(scaled_risk, self.policy['max_risk'])
+        self.risk = max(scaled_risk / len(self.symbols), self.policy['min_risk_per_pair'])  # per pair
+        self.stop_loss = max(stop_loss, self.policy['min_stop_loss'])
+        self.take_profit = max(take_profit, self.policy['min_take_profit'])
+        self.strategy_type = strategy_type or self.policy['strategy_type']
         self.trade_amount = trade_amount
-        self.kill_switch_threshold = kill_switch_threshold
+        self.signal = get_fast_strategy_signal if self.policy['fast_signals'] else get_strategy_signal
 
         # Track data per symbol
         self.last_trade_times = {symbol: 0 for symbol in self.symbols}
-        self.open_positions = []
-        self.total_trade_count = 0
+        self.indicators = {symbol: IndicatorEngine() for symbol in self.symbols}
+        self.open_positions = PositionBook()
+        self.trade_count = 0
+
+        # Performance tracking
+        self.total_pnl = 0
+        self.win_count = 0
+        self.loss_count = 0
+        self.pair_performance = {symbol: {'wins': 0, 'losses': 0, 'pnl': 0} for symbol in self.symbols}
 
         # Kill switch (global across all pairs)
         self.consecutive_losses = 0
+        self.kill_switch_threshold = (self.policy['kill_switch_threshold'] if kill_switch_threshold is None
+                                      else kill_switch_threshold)
         self.kill_switch_triggered = False
         self.kill_switch_reason = ""
 
+        # Collaborators, per instance so a replay can give one bot a virtual
+        # clock, a recorder and its own metrics without touching the others
+        self.clock = time
+        self.journal_trade = journal_trade
+        self.get_balance_db = get_balance_db
+        self.publish = publish
+        self.metrics = get_metrics()
+        self.log = print
+
     def check_kill_switch(self, pnl):
         if pnl < 0:
             self.consecutive_losses += 1
-            if self.consecutive_losses >= self.kill_switch_threshold:
+            max_loss = self.policy['kill_switch_max_loss']
+            if self.consecutive_losses >= self.kill_switch_threshold and (max_loss is None or self.total_pnl < max_loss):
                 self.kill_switch_triggered = True
                 self.kill_switch_reason = f"KILL SWITCH: {self.consecutive_losses} consecutive losses"
-                print(f"\n🛑 {self.kill_switch_reason}")
+                if max_loss is not None:
+                    self.kill_switch_reason += f", Total PnL: ${self.total_pnl:.2f}"
+                self.log(f"\n🛑 {self.kill_switch_reason}")
+                self.publish('kill_switch', {'active': True, 'reason': self.kill_switch_reason})
                 return True
         else:
             if self.consecutive_losses > 0:
-                print(f"✅ Loss streak broken! Was {self.consecutive_losses} consecutive losses")
+                self.log(f"✅ Loss streak broken! Was {self.consecutive_losses} consecutive losses")
             self.consecutive_losses = 0
         return False
 
@@ -231,676 +100,216 @@ class MultiPairTradingBot:
         self.kill_switch_triggered = False
         self.consecutive_losses = 0
         self.kill_switch_reason = ""
-        print("🔥 Kill switch reset - multi-pair trading can resume")
+        self.log(f"🔥 Kill switch reset - {self.policy['label']} trading can resume")
+        self.publish('kill_switch', {'active': False, 'reason': ''})
 
     def calculate_realistic_pnl(self, entry_price, current_price, side, position_size):
+        """Price move times size, less the policy's fee on entry and exit notional"""
         if side == "buy":
             price_change = current_price - entry_price
         else:
             price_change = entry_price - current_price
-        return price_change * position_size
+        fee_cost = (entry_price + current_price) * position_size * self.policy['fee_rate']
+        return price_change * position_size - fee_cost
 
     def should_close_position(self, position, current_price):
-        entry_price = position['entry_price']
-        side = position['side']
-
-        if side == "buy":
-            stop_loss_price = entry_price * (1 - self.stop_loss / 100)
-            take_profit_price = entry_price * (1 + self.take_profit / 100)
-
+        stop_loss_price, take_profit_price = exit_levels(position['entry_price'], position['side'],
+                                                         self.stop_loss, self.take_profit)
+        if position['side'] == "buy":
             if current_price <= stop_loss_price:
                 return True, "stop_loss"
             elif current_price >= take_profit_price:
                 return True, "take_profit"
         else:
-            stop_loss_price = entry_price * (1 + self.stop_loss / 100)
-            take_profit_price = entry_price * (1 - self.take_profit / 100)
-
             if current_price >= stop_loss_price:
                 return True, "stop_loss"
             elif current_price <= take_profit_price:
                 return True, "take_profit"
-
         return False, None
 
-    def run_once(self):
-        try:
-            if self.kill_switch_triggered:
-                print(f"🛑 Multi-pair trading halted: {self.kill_switch_reason}")
-                return
-
-            current_time = time.time()
-
-            # Check existing positions for ALL symbols
-            positions_to_remove = []
-            for i, position in enumerate(self.open_positions):
-                symbol = position['symbol']
-
-                try:
-                    df = self.iface.fetch_ohlcv(symbol)
-                    if df.empty:
-                        continue
-
-                    current_price = float(df["close"].iloc[-1])
-                    should_close, reason = self.should_close_position(position, current_price)
-
-                    if should_close:
-                        pnl = self.calculate_realistic_pnl(
-                            position['entry_price'],
-                            current_price,
-                            position['side'],
-                            position['position_size']
-                        )
-
-                        if self.check_kill_switch(pnl):
-                            return
-
-                        trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                        leverage = getattr(self.iface, 'leverage', 1)
-
-                        try:
-                            log_trade(
-                                symbol,
-                                f"close_{position['side']}",
-                                position['position_size'],
-                                current_price,
-                                self.stop_loss,
-                                self.take_profit,
-                                "EXECUTED",
-                                pnl,
-                                trading_mode,
-                                leverage,
-                                position['usd_amount']
-                            )
-                        except Exception as db_error:
-                            print(f"Database error: {db_error}")
-
-                        pnl_sign = "+" if pnl >= 0 else ""
-                        print(f"📈 CLOSE {symbol} #{position['trade_id']}: {reason.upper()} - P&L: {pnl_sign}${pnl:.2f}")
-                        positions_to_remove.append(i)
-
-                except Exception as e:
-                    print(f"Error processing {symbol}: {e}")
-                    continue
-
-            # Remove closed positions
-            for i in reversed(positions_to_remove):
-                del self.open_positions[i]
-
-            # Check for new trades across ALL symbols
-            for symbol in self.symbols:
-                try:
-                    # Limit positions per symbol
-                    symbol_positions = [p for p in self.open_positions if p['symbol'] == symbol]
-                    if len(symbol_positions) >= 2:
-                        continue
-
-                    # Check cooldown for this specific symbol
-                    if current_time - self.last_trade_times[symbol] < 300:
-                        continue
-
-                    df = self.iface.fetch_ohlcv(symbol)
-                    if df.empty:
-                        continue
-
-                    action = get_strategy_signal(df, self.strategy_type)
-
-                    if action in ["buy", "sell"]:
-                        balance = get_balance_db()
-                        current_price = float(df["close"].iloc[-1])
-
-                        if self.trade_amount:
-                            pos_size = calculate_custom_position_size(self.trade_amount, current_price, self.stop_loss)
-                            display_usd_amount = self.trade_amount
-                        else:
-                            pos_size = calculate_position_size(balance, self.risk, current_price, self.stop_loss)
-                            display_usd_amount = pos_size * current_price
-
-                        if pos_size < 0.001:
-                            pos_size = 0.001
-
-                        order = self.iface.place_order(symbol, action, pos_size)
-                        self.last_trade_times[symbol] = current_time
-                        self.total_trade_count += 1
-
-                        position = {
-                            'trade_id': self.total_trade_count,
-                            'symbol': symbol,
-                            'side': action,
-                            'entry_price': current_price,
-                            'position_size': pos_size,
-                            'usd_amount': display_usd_amount,
-                            'timestamp': current_time
-                        }
-                        self.open_positions.append(position)
-
-                        trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                        print(f"📊 OPEN {symbol} #{self.total_trade_count}: "
-                              f"{action.upper()} ${display_usd_amount:.2f} at ${current_price:.2f} "
-                              f"| Open positions: {len(self.open_positions)}")
-
-                except Exception as e:
-                    print(f"Error trading {symbol}: {e}")
-                    continue
-
-        except Exception as e:
-            print(f"Multi-pair bot error: {e}")
-
-
-# NEW HIGH-FREQUENCY AGGRESSIVE BOT CLASS ADDED BELOW
-
-class HighFrequencyTradingBot:
-    """
-    AGGRESSIVE HIGH-FREQUENCY BOT
-    - 5-minute candles instead of 1-hour
-    - 30-second cooldowns instead of 5-minute
-    - Simpler strategy logic
-    - More position size flexibility
-    """
-    def __init__(self, interface, symbol, risk, stop_loss, take_profit, strategy_type="aggressive_ema", trade_amount=None, kill_switch_threshold=15):
-        self.iface = interface
-        self.symbol = symbol
-        self.risk = min(risk * 1.5, 3.0)  # Increase risk appetite up to 3%
-        self.stop_loss = max(stop_loss, 1.5)  # Minimum 1.5% stop loss
-        self.take_profit = max(take_profit, 2.0)  # Minimum 2% take profit
-        self.strategy_type = strategy_type
-        self.trade_amount = trade_amount
-        self.last_trade_time = 0
-        self.trade_count = 0
-
-        # More aggressive kill switch
-        self.consecutive_losses = 0
-        self.kill_switch_threshold = kill_switch_threshold  # Allow more losses before stopping
-        self.kill_switch_triggered = False
-        self.kill_switch_reason = ""
-
-        # Track open positions (allow up to 3 concurrent)
-        self.open_positions = []
-
-        # Performance tracking
-        self.total_pnl = 0
-        self.win_count = 0
-        self.loss_count = 0
-
-    def check_kill_switch(self, pnl):
-        """More lenient kill switch for aggressive trading"""
-        if pnl < 0:
-            self.consecutive_losses += 1
-            # Only trigger after significant losses AND poor performance
-            if self.consecutive_losses >= self.kill_switch_threshold:
-                # Additional check: total PnL must be significantly negative
-                if self.total_pnl < -100:  # More than $100 loss
-                    self.kill_switch_triggered = True
-                    self.kill_switch_reason = f"KILL SWITCH: {self.consecutive_losses} losses, Total PnL: ${self.total_pnl:.2f}"
-                    print(f"\n🛑 {self.kill_switch_reason}")
-                    return True
-        else:
+    def _can_open(self, symbol, current_time):
+        """Whether caps and the pair's cooldown allow an entry on symbol"""
+        max_open = self.policy['max_open_positions']
+        if max_open is not None and len(self.open_positions) >= max_open:
+            return False
+        max_per_symbol = self.policy['max_positions_per_symbol']
+        if max_per_symbol is not None and self.open_positions.count(symbol) >= max_per_symbol:
+            return False
+        return current_time - self.last_trade_times[symbol] >= self.policy['cooldown_seconds']
+
+    def _tick_symbols(self, current_time):
+        """Symbols needed this tick: open positions plus pairs that may enter"""
+        wanted = self.open_positions.symbols()
+        wanted += [s for s in self.symbols if self._can_open(s, current_time)]
+        return list(dict.fromkeys(wanted))
+
+    def market_data_requests(self, current_time=None):
+        """(symbol, timeframe, limit) candles the next run_once will read"""
+        if current_time is None:
+            current_time = self.clock.time()
+        return [(symbol, self.policy['timeframe'], self.policy['limit'])
+                for symbol in self._tick_symbols(current_time)]
+
+    def _close(self, position, reason, current_price):
+        """Exit one position at market, book its P&L; True if that tripped the kill switch"""
+        symbol = position.symbol
+        with self.metrics.span('close_order', symbol):
+            exit_order = self.iface.close_position(symbol, position['side'], position['position_size'],
+                                                   fee_rate=self.policy['fee_rate'])
+        exit_price, _ = order_fill(exit_order, current_price, position['position_size'])
+
+        pnl = self.calculate_realistic_pnl(
+            position['entry_price'],
+            exit_price,
+            position['side'],
+            position['position_size']
+        )
+
+        self.total_pnl += pnl
+        pair_data = self.pair_performance[symbol]
+        if pnl > 0:
             self.win_count += 1
-            if self.consecutive_losses > 0:
-                print(f"✅ Loss streak broken! Was {self.consecutive_losses} losses")
-            self.consecutive_losses = 0
-        return False
-
-    def is_kill_switch_active(self):
-        return self.kill_switch_triggered
-
-    def reset_kill_switch(self):
-        self.kill_switch_triggered = False
-        self.consecutive_losses = 0
-        self.kill_switch_reason = ""
-        print("🔥 Kill switch reset - aggressive trading resumed")
-
-    def calculate_realistic_pnl(self, entry_price, current_price, side, position_size):
-        """Enhanced PnL calculation with fees"""
-        if side == "buy":
-            price_change = current_price - entry_price
+            pair_data['wins'] += 1
         else:
-            price_change = entry_price - current_price
-
-        # Subtract approximate trading fees (0.1% each way = 0.2% total)
-        gross_pnl = price_change * position_size
-        fee_cost = (entry_price + current_price) * position_size * 0.001  # 0.1% fee approximation
-        net_pnl = gross_pnl - fee_cost
-
-        return net_pnl
-
-    def should_close_position(self, position, current_price):
-        """More aggressive position closing"""
-        entry_price = position['entry_price']
-        side = position['side']
-
-        # Dynamic stop loss based on volatility
-        dynamic_stop = self.stop_loss
-        dynamic_take = self.take_profit
-
-        # If we're in profit, use trailing stop
-        current_pnl = self.calculate_realistic_pnl(entry_price, current_price, side, position['position_size'])
-
-        if side == "buy":
-            stop_loss_price = entry_price * (1 - dynamic_stop / 100)
-            take_profit_price = entry_price * (1 + dynamic_take / 100)
-
-            if current_price <= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price >= take_profit_price:
-                return True, "take_profit"
-
-        else:  # sell position
-            stop_loss_price = entry_price * (1 + dynamic_stop / 100)
-            take_profit_price = entry_price * (1 - dynamic_take / 100)
+            self.loss_count += 1
+            pair_data['losses'] += 1
+        pair_data['pnl'] += pnl
 
-            if current_price >= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price <= take_profit_price:
-                return True, "take_profit"
-
-        return False, None
-
-    def run_once(self):
-        """AGGRESSIVE EXECUTION LOOP"""
         try:
-            if self.kill_switch_triggered:
-                print(f"🛑 Trading halted: {self.kill_switch_reason}")
-                return
-
-            # Fetch 5-minute candles for faster signals
-            df = self.iface.fetch_ohlcv(self.symbol, timeframe='5m', limit=50)
-            if df.empty:
-                print(f"⚠️ No data for {self.symbol}")
-                return
-
-            current_price = float(df["close"].iloc[-1])
-            current_time = time.time()
-
-            # Check existing positions first
-            positions_to_remove = []
-            for i, position in enumerate(self.open_positions):
-                should_close, reason = self.should_close_position(position, current_price)
-
-                if should_close:
-                    pnl = self.calculate_realistic_pnl(
-                        position['entry_price'],
-                        current_price,
-                        position['side'],
-                        position['position_size']
-                    )
-
-                    self.total_pnl += pnl
-
-                    if pnl > 0:
-                        self.win_count += 1
-                    else:
-                        self.loss_count += 1
-
-                    if self.check_kill_switch(pnl):
-                        return
-
-                    # Log to database
-                    try:
-                        trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                        leverage = getattr(self.iface, 'leverage', 1)
-
-                        log_trade(
-                            self.symbol,
-                            f"close_{position['side']}",
-                            position['position_size'],
-                            current_price,
-                            self.stop_loss,
-                            self.take_profit,
-                            "EXECUTED",
-                            pnl,
-                            trading_mode,
-                            leverage,
-                            position['usd_amount']
-                        )
-                    except Exception as db_error:
-                        print(f"Database error: {db_error}")
-
-                    # Enhanced logging
-                    win_rate = (self.win_count / max(self.win_count + self.loss_count, 1)) * 100
-                    pnl_sign = "+" if pnl >= 0 else ""
-                    print(f"📈 CLOSE #{position['trade_id']}: {reason.upper()} - "
-                          f"P&L: {pnl_sign}${pnl:.2f} | Total: ${self.total_pnl:.2f} | "
-                          f"Win Rate: {win_rate:.1f}%")
-
-                    positions_to_remove.append(i)
-
-            # Remove closed positions
-            for i in reversed(positions_to_remove):
-                del self.open_positions[i]
-
-            # Allow up to 3 concurrent positions for more action
-            if len(self.open_positions) >= 3:
-                return
-
-            # Get aggressive strategy signal
-            action = get_fast_strategy_signal(df, self.strategy_type)
-
-            # AGGRESSIVE ENTRY CONDITIONS
-            # Reduced cooldown to 30 seconds instead of 5 minutes
-            if action in ["buy", "sell"] and current_time - self.last_trade_time > 30:
-                balance = get_balance_db()
-
-                # More aggressive position sizing
-                if self.trade_amount:
-                    pos_size = calculate_custom_position_size(self.trade_amount, current_price, self.stop_loss)
-                    display_usd_amount = self.trade_amount
-                else:
-                    # Use higher risk percentage for more aggressive trading
-                    pos_size = calculate_position_size(balance, self.risk, current_price, self.stop_loss)
-                    display_usd_amount = pos_size * current_price
-
-                # Minimum position size for meaningful trades
-                if pos_size < 0.001:
-                    pos_size = 0.001
-
-                # Execute the trade
-                try:
-                    order = self.iface.place_order(self.symbol, action, pos_size)
-                    self.last_trade_time = current_time
-                    self.trade_count += 1
-
-                    position = {
-                        'trade_id': self.trade_count,
-                        'side': action,
-                        'entry_price': current_price,
-                        'position_size': pos_size,
-                        'usd_amount': display_usd_amount,
-                        'timestamp': current_time
-                    }
-                    self.open_positions.append(position)
-
-                    # Enhanced trade logging
-                    trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                    leverage = getattr(self.iface, 'leverage', 1)
-                    strategy_name = "AGGRESSIVE" if self.strategy_type == "aggressive_ema" else "BREAKOUT"
-
-                    print(f"🚀 OPEN #{self.trade_count} [{strategy_name}-{trading_mode}]: "
-                          f"{action.upper()} ${display_usd_amount:.2f} {self.symbol} at ${current_price:.2f} | "
-                          f"Open: {len(self.open_positions)} | Total P&L: ${self.total_pnl:.2f}")
-
-                except Exception as order_error:
-                    print(f"Order execution error: {order_error}")
-
-        except Exception as e:
-            print(f"Bot execution error: {e}")
-
-    def get_performance_stats(self):
-        """Return current performance statistics"""
-        total_trades = self.win_count + self.loss_count
-        win_rate = (self.win_count / max(total_trades, 1)) * 100
-
-        return {
-            'total_pnl': self.total_pnl,
-            'total_trades': total_trades,
-            'win_count': self.win_count,
-            'loss_count': self.loss_count,
-            'win_rate': win_rate,
-            'consecutive_losses': self.consecutive_losses,
-            'open_positions': len(self.open_positions)
-        }
-
-
-# NEW SUPER AGGRESSIVE MULTI-PAIR BOT CLASS ADDED BELOW
-
-class SuperAggressiveMultiPairBot:
-    """
-    SUPER AGGRESSIVE MULTI-PAIR HIGH-FREQUENCY BOT
-    - Trades 5-15 pairs simultaneously
-    - 5-minute candles with 15-second checks
-    - 30-second cooldown per pair
-    - Maximum trade frequency for maximum opportunities
-    """
-    def __init__(self, interface, symbols, risk, stop_loss, take_profit, strategy_type="aggressive_ema", trade_amount=None, kill_switch_threshold=20):
-        self.iface = interface
-        self.symbols = symbols if isinstance(symbols, list) else [symbols]
-        # Split risk more aggressively - minimum 0.3% per pair
-        self.risk_per_pair = max(risk / len(self.symbols), 0.3)
-        self.stop_loss = max(stop_loss, 1.5)
-        self.take_profit = max(take_profit, 2.0)
-        self.strategy_type = strategy_type
-        self.trade_amount = trade_amount
-        self.kill_switch_threshold = kill_switch_threshold
-
-        # Track per-symbol data
-        self.last_trade_times = {symbol: 0 for symbol in self.symbols}
-        self.open_positions = []
-        self.total_trade_count = 0
-
-        # Performance tracking
-        self.total_pnl = 0
-        self.win_count = 0
-        self.loss_count = 0
-        self.consecutive_losses = 0
-        self.kill_switch_triggered = False
-        self.kill_switch_reason = ""
-
-        # Track per-pair performance
-        self.pair_performance = {symbol: {'wins': 0, 'losses': 0, 'pnl': 0} for symbol in self.symbols}
-
-    def check_kill_switch(self, pnl):
-        """Multi-pair kill switch with total PnL consideration"""
-        if pnl < 0:
-            self.consecutive_losses += 1
-            if self.consecutive_losses >= self.kill_switch_threshold:
-                if self.total_pnl < -200:  # $200 total loss threshold
-                    self.kill_switch_triggered = True
-                    self.kill_switch_reason = f"SUPER BOT KILL SWITCH: {self.consecutive_losses} losses, Total: ${self.total_pnl:.2f}"
-                    print(f"\n🛑 {self.kill_switch_reason}")
-                    return True
+            with self.metrics.span('journal', symbol):
+                self.journal_trade(
+                    symbol,
+                    f"close_{position['side']}",
+                    position['position_size'],
+                    exit_price,
+                    self.stop_loss,
+                    self.take_profit,
+                    "EXECUTED",
+                    pnl,
+                    getattr(self.iface, 'trading_mode', 'spot').upper(),
+                    getattr(self.iface, 'leverage', 1),
+                    position['usd_amount']
+                )
+        except Exception as db_error:
+            self.log(f"Database error: {db_error}")
+
+        self.publish('position_closed', {
+            'symbol': symbol,
+            'trade_id': position['trade_id'],
+            'side': position['side'],
+            'entry_price': position['entry_price'],
+            'exit_price': exit_price,
+            'pnl': pnl,
+            'reason': reason
+        })
+        win_rate = (self.win_count / max(self.win_count + self.loss_count, 1)) * 100
+        pnl_sign = "+" if pnl >= 0 else ""
+        self.log(f"📈 CLOSE {symbol} #{position['trade_id']}: {reason.upper()} - "
+              f"P&L: {pnl_sign}${pnl:.2f} | Total: ${self.total_pnl:.2f} | Win Rate: {win_rate:.1f}%")
+
+        return self.check_kill_switch(pnl)
+
+    def _open(self, symbol, action, current_price, current_time):
+        with self.metrics.span('balance'):
+            balance = self.get_balance_db()
+
+        if self.trade_amount:
+            pos_size = calculate_custom_position_size(self.trade_amount, current_price, self.stop_loss)
+            display_usd_amount = self.trade_amount
         else:
-            if self.consecutive_losses > 0:
-                print(f"✅ Multi-pair loss streak broken! Was {self.consecutive_losses} losses")
-            self.consecutive_losses = 0
-        return False
-
-    def is_kill_switch_active(self):
-        return self.kill_switch_triggered
-
-    def reset_kill_switch(self):
-        self.kill_switch_triggered = False
-        self.consecutive_losses = 0
-        self.kill_switch_reason = ""
-        print("🔥 Super aggressive multi-pair bot reset - maximum frequency resumed")
-
-    def calculate_realistic_pnl(self, entry_price, current_price, side, position_size):
-        """PnL calculation with trading fees"""
-        if side == "buy":
-            price_change = current_price - entry_price
-        else:
-            price_change = entry_price - current_price
-
-        gross_pnl = price_change * position_size
-        fee_cost = (entry_price + current_price) * position_size * 0.001
-        return gross_pnl - fee_cost
-
-    def should_close_position(self, position, current_price):
-        """Aggressive position closing with dynamic levels"""
-        entry_price = position['entry_price']
-        side = position['side']
-
-        if side == "buy":
-            stop_loss_price = entry_price * (1 - self.stop_loss / 100)
-            take_profit_price = entry_price * (1 + self.take_profit / 100)
-
-            if current_price <= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price >= take_profit_price:
-                return True, "take_profit"
-        else:
-            stop_loss_price = entry_price * (1 + self.stop_loss / 100)
-            take_profit_price = entry_price * (1 - self.take_profit / 100)
-
-            if current_price >= stop_loss_price:
-                return True, "stop_loss"
-            elif current_price <= take_profit_price:
-                return True, "take_profit"
-
-        return False, None
+            pos_size = calculate_position_size(balance, self.risk, current_price, self.stop_loss)
+            display_usd_amount = pos_size * current_price
+
+        if pos_size < 0.001:
+            pos_size = 0.001
+
+        with self.metrics.span('place_order', symbol):
+            order = self.iface.place_order(symbol, action, pos_size, fee_rate=self.policy['fee_rate'])
+        entry_price, pos_size = order_fill(order, current_price, pos_size)
+        self.last_trade_times[symbol] = current_time
+        self.trade_count += 1
+
+        position = Position(
+            trade_id=self.trade_count,
+            symbol=symbol,
+            side=action,
+            entry_price=entry_price,
+            position_size=pos_size,
+            usd_amount=display_usd_amount,
+            timestamp=current_time
+        )
+        self.open_positions.add(position, *exit_levels(entry_price, action, self.stop_loss, self.take_profit))
+        self.publish('position_opened', position.to_dict())
+
+        trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
+        leverage = getattr(self.iface, 'leverage', 1)
+        mode_display = f"FUTURES-{leverage}X" if trading_mode == "FUTURES" and leverage > 1 else trading_mode
+        self.log(f"🚀 OPEN {symbol} #{self.trade_count} [{self.strategy_type.upper()}-{mode_display}]: "
+              f"{action.upper()} ${display_usd_amount:.2f} at ${current_price:.2f} | "
+              f"Open: {len(self.open_positions)} | Total P&L: ${self.total_pnl:.2f}")
 
     def run_once(self):
-        """SUPER AGGRESSIVE MULTI-PAIR EXECUTION"""
         try:
             if self.kill_switch_triggered:
-                print(f"🛑 Super aggressive multi-pair trading halted: {self.kill_switch_reason}")
+                self.log(f"🛑 {self.policy['label']} trading halted: {self.kill_switch_reason}")
                 return
 
-            current_time = time.time()
-
-            # Process ALL open positions first
-            positions_to_remove = []
-            for i, position in enumerate(self.open_positions):
-                symbol = position['symbol']
-
-                try:
-                    df = self.iface.fetch_ohlcv(symbol, timeframe='5m', limit=30)
-                    if df.empty:
-                        continue
-
-                    current_price = float(df["close"].iloc[-1])
-                    should_close, reason = self.should_close_position(position, current_price)
-
-                    if should_close:
-                        pnl = self.calculate_realistic_pnl(
-                            position['entry_price'],
-                            current_price,
-                            position['side'],
-                            position['position_size']
-                        )
-
-                        self.total_pnl += pnl
-
-                        # Update pair performance
-                        if pnl > 0:
-                            self.win_count += 1
-                            self.pair_performance[symbol]['wins'] += 1
-                        else:
-                            self.loss_count += 1
-                            self.pair_performance[symbol]['losses'] += 1
-
-                        self.pair_performance[symbol]['pnl'] += pnl
-
-                        if self.check_kill_switch(pnl):
+            current_time = self.clock.time()
+
+            # One concurrent fetch per symbol for the whole tick (positions + new entries)
+            with self.metrics.span('fetch'):
+                frames = self.iface.fetch_ohlcv_batch(self._tick_symbols(current_time),
+                                                      timeframe=self.policy['timeframe'], limit=self.policy['limit'])
+            prices = {}
+            for symbol, df in frames.items():
+                if not df.empty:
+                    prices[symbol] = float(df["close"].iloc[-1])
+                    self.publish('price', {'symbol': symbol, 'price': prices[symbol]})
+
+            # Close positions on all symbols whose stop or target the latest price reached
+            closed = set()
+            for symbol, current_price in prices.items():
+                with self.metrics.span('exit_check', symbol):
+                    hits = self.open_positions.crossed(symbol, current_price)
+                for position, reason in hits:
+                    try:
+                        halted = self._close(position, reason, current_price)
+                        closed.add(position.trade_id)
+                        if halted:
+                            drop_closed(self, closed)
                             return
+                    except Exception as e:
+                        self.log(f"Error closing {symbol} #{position.trade_id}: {e}")
 
-                        # Log trade
-                        try:
-                            trading_mode = getattr(self.iface, 'trading_mode', 'spot').upper()
-                            leverage = getattr(self.iface, 'leverage', 1)
-
-                            log_trade(
-                                symbol,
-                                f"close_{position['side']}",
-                                position['position_size'],
-                                current_price,
-                                self.stop_loss,
-                                self.take_profit,
-                                "EXECUTED",
-                                pnl,
-                                trading_mode,
-                                leverage,
-                                position['usd_amount']
-                            )
-                        except Exception as db_error:
-                            print(f"DB error: {db_error}")
-
-                        # Enhanced multi-pair logging
-                        total_trades = self.win_count + self.loss_count
-                        win_rate = (self.win_count / max(total_trades, 1)) * 100
-                        pair_win_rate = (self.pair_performance[symbol]['wins'] /
-                                       max(self.pair_performance[symbol]['wins'] + self.pair_performance[symbol]['losses'], 1)) * 100
-
-                        pnl_sign = "+" if pnl >= 0 else ""
-                        print(f"📈 CLOSE {symbol} #{position['trade_id']}: {reason.upper()} - "
-                              f"P&L: {pnl_sign}${pnl:.2f} | Total: ${self.total_pnl:.2f} | "
-                              f"Win Rate: {win_rate:.1f}% | {symbol}: {pair_win_rate:.1f}%")
-
-                        positions_to_remove.append(i)
+            drop_closed(self, closed)
 
-                except Exception as e:
-                    print(f"Error processing {symbol}: {e}")
-                    continue
-
-            # Remove closed positions
-            for i in reversed(positions_to_remove):
-                del self.open_positions[i]
-
-            # Check for NEW TRADES across ALL symbols
+            # Check for new trades across all symbols
             for symbol in self.symbols:
                 try:
-                    # Limit: 2 positions per symbol max
-                    symbol_positions = [p for p in self.open_positions if p['symbol'] == symbol]
-                    if len(symbol_positions) >= 2:
-                        continue
-
-                    # AGGRESSIVE cooldown: only 30 seconds per symbol
-                    if current_time - self.last_trade_times[symbol] < 30:
+                    if symbol not in prices or not self._can_open(symbol, current_time):
                         continue
 
-                    # Get 5-minute data for this symbol
-                    df = self.iface.fetch_ohlcv(symbol, timeframe='5m', limit=30)
-                    if df.empty:
-                        continue
-
-                    # Get aggressive strategy signal
-                    action = get_fast_strategy_signal(df, self.strategy_type)
+                    df = frames[symbol]
+                    with self.metrics.span('indicators', symbol):
+                        indicators = self.indicators[symbol].update(df)
+                    with self.metrics.span('signal', symbol):
+                        action = self.signal(df, self.strategy_type, indicators=indicators)
 
                     if action in ["buy", "sell"]:
-                        balance = get_balance_db()
-                        current_price = float(df["close"].iloc[-1])
-
-                        # Calculate position size
-                        if self.trade_amount:
-                            pos_size = calculate_custom_position_size(self.trade_amount, current_price, self.stop_loss)
-                            display_usd_amount = self.trade_amount
-                        else:
-                            pos_size = calculate_position_size(balance, self.risk_per_pair, current_price, self.stop_loss)
-                            display_usd_amount = pos_size * current_price
-
-                        if pos_size < 0.001:
-                            pos_size = 0.001
-
-                        # Execute trade
-                        try:
-                            order = self.iface.place_order(symbol, action, pos_size)
-                            self.last_trade_times[symbol] = current_time
-                            self.total_trade_count += 1
-
-                            position = {
-                                'trade_id': self.total_trade_count,
-                                'symbol': symbol,
-                                'side': action,
-                                'entry_price': current_price,
-                                'position_size': pos_size,
-                                'usd_amount': display_usd_amount,
-                                'timestamp': current_time
-                            }
-                            self.open_positions.append(position)
-
-                            # Multi-pair trade logging
-                            total_open = len(self.open_positions)
-                            strategy_name = "AGG-EMA" if self.strategy_type == "aggressive_ema" else "BREAKOUT"
-
-                            print(f"🚀 OPEN {symbol} #{self.total_trade_count} [{strategy_name}]: "
-                                  f"{action.upper()} ${display_usd_amount:.2f} at ${current_price:.2f} | "
-                                  f"Open: {total_open} across {len(self.symbols)} pairs | Total P&L: ${self.total_pnl:.2f}")
-
-                        except Exception as order_error:
-                            print(f"Order error {symbol}: {order_error}")
+                        self._open(symbol, action, prices[symbol], current_time)
 
                 except Exception as e:
-                    print(f"Symbol {symbol} error: {e}")
-                    continue
+                    self.log(f"Error trading {symbol}: {e}")
 
         except Exception as e:
-            print(f"Super aggressive multi-pair bot error: {e}")
+            self.log(f"{self.policy['label']} bot error: {e}")
 
     def get_performance_stats(self):
-        """Enhanced performance stats with per-pair breakdown"""
+        """Aggregate and per-pair performance, with open positions marked at the last price seen"""
         total_trades = self.win_count + self.loss_count
-        overall_win_rate = (self.win_count / max(total_trades, 1)) * 100
+        win_rate = (self.win_count / max(total_trades, 1)) * 100
+        unrealized = self.open_positions.unrealized_pnl(fee_rate=self.policy['fee_rate'])
 
-        # Calculate per-pair stats
         pair_stats = {}
         for symbol in self.symbols:
             pair_data = self.pair_performance[symbol]
@@ -909,7 +318,9 @@ class SuperAggressiveMultiPairBot:
             pair_stats[symbol] = {
                 'trades': pair_total,
                 'win_rate': pair_win_rate,
-                'pnl': pair_data['pnl']
+                'pnl': pair_data['pnl'],
+                'open_positions': self.open_positions.count(symbol),
+                'unrealized_pnl': unrealized['by_symbol'].get(symbol, 0.0)
             }
 
         return {
@@ -917,9 +328,74 @@ class SuperAggressiveMultiPairBot:
             'total_trades': total_trades,
             'win_count': self.win_count,
             'loss_count': self.loss_count,
-            'overall_win_rate': overall_win_rate,
+            'win_rate': win_rate,
+            'overall_win_rate': win_rate,
             'consecutive_losses': self.consecutive_losses,
             'open_positions': len(self.open_positions),
+            'unrealized_pnl': unrealized['total'],
             'symbols_count': len(self.symbols),
             'pair_stats': pair_stats
         }
+
+
+class TradingBot(TradingEngine):
+    """Single-pair trading bot - keeps existing API compatibility"""
+    def __init__(self, interface, symbol, risk, stop_loss, take_profit, strategy_type="default_ma", trade_amount=None, kill_switch_threshold=10):
+        super().__init__(interface, [symbol], risk, stop_loss, take_profit, 'single',
+                         strategy_type, trade_amount, kill_switch_threshold)
+
+
+class MultiPairTradingBot(TradingEngine):
+    """Multi-pair trading bot for increased trade frequency"""
+    def __init__(self, interface, symbols, risk, stop_loss, take_profit, strategy_type="default_ma", trade_amount=None, kill_switch_threshold=10):
+        super().__init__(interface, symbols, risk, stop_loss, take_profit, 'multi_pair',
+                         strategy_type, trade_amount, kill_switch_threshold)
+
+
+class HighFrequencyTradingBot(TradingEngine):
+    """
+    AGGRESSIVE HIGH-FREQUENCY BOT
+    - 5-minute candles instead of 1-hour
+    - 30-second cooldowns instead of 5-minute
+    - Fast strategy signals, fees in P&L
+    - 1.5x risk appetite (up to 3%), wider minimum SL/TP
+    """
+    def __init__(self, interface, symbol, risk, stop_loss, take_profit, strategy_type="aggressive_ema", trade_amount=None, kill_switch_threshold=15):
+        super().__init__(interface, [symbol], risk, stop_loss, take_profit, 'high_frequency',
+                         strategy_type, trade_amount, kill_switch_threshold)
+
+
+class SuperAggressiveMultiPairBot(TradingEngine):
+    """
+    SUPER AGGRESSIVE MULTI-PAIR HIGH-FREQUENCY BOT
+    - Trades 5-15 pairs simultaneously
+    - 5-minute candles with 15-second checks
+    - 30-second cooldown per pair
+    - Maximum trade frequency for maximum opportunities
+    """
+    def __init__(self, interface, symbols, risk, stop_loss, take_profit, strategy_type="aggressive_ema", trade_amount=None, kill_switch_threshold=20):
+        super().__init__(interface, symbols, risk, stop_loss, take_profit, 'super_aggressive',
+                         strategy_type, trade_amount, kill_switch_threshold)
+
+
+# Bot class per policy name, for callers that pick the mode at runtime
+BOT_CLASSES = {
+    'single': TradingBot,
+    'multi_pair': MultiPairTradingBot,
+    'high_frequency': HighFrequencyTradingBot,
+    'super_aggressive': SuperAggressiveMultiPairBot,
+}
+
+def create_bot(mode, interface, symbols, risk, stop_loss, take_profit, **kwargs):
+    """Bot for a BOT_POLICIES mode; kwargs default to the mode's policy"""
+    if mode not in BOT_CLASSES:
+        raise ValueError(f"Unknown bot mode: {mode}")
+    symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+    if not symbols:
+        raise ValueError("At least one trading pair is required")
+    policy = BOT_POLICIES[mode]
+    if policy['single_symbol'] and len(symbols) > 1:
+        raise ValueError(f"{policy['label']} bots trade a single pair, got {len(symbols)}")
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    return BOT_CLASSES[mode](interface, symbols[0] if policy['single_symbol'] else symbols,
+                             risk, stop_loss, take_profit, **kwargs)
@@ -0,0 +1,257 @@
+import os
+import threading
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+DTYPES = {"timestamp": np.int64, "open": np.float64, "high": np.float64,
+          "low": np.float64, "close": np.float64, "volume": np.float64}
+ITEM_SIZE = 8  # every column is 8 bytes wide
+PAGE_LIMIT = 1000  # candles per exchange request (Binance max for spot)
+
+
+class CandleSeries:
+    """One exchange/symbol/timeframe series: one raw column file per field"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.RLock()
+        self._maps = None
+        os.makedirs(directory, exist_ok=True)
+        self.length = self._recover_length()
+
+    def _path(self, column):
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _recover_length(self):
+        """Rows present in every column file; trims a partially written append"""
+        sizes = []
+        for column in COLUMNS:
+            path = self._path(column)
+            sizes.append(os.path.getsize(path) if os.path.exists(path) else 0)
+        length = min(sizes) // ITEM_SIZE
+        for column, size in zip(COLUMNS, sizes):
+            if size != length * ITEM_SIZE:
+                with open(self._path(column), 'ab') as f:
+                    f.truncate(length * ITEM_SIZE)
+        return length
+
+    def columns(self):
+        """Read-only memory maps of every column (zero-copy)"""
+        with self.lock:
+            if self.length == 0:
+                return {c: np.empty(0, dtype=DTYPES[c]) for c in COLUMNS}
+            if self._maps is None:
+                self._maps = {
+                    c: np.memmap(self._path(c), dtype=DTYPES[c], mode='r', shape=(self.length,))
+                    for c in COLUMNS
+                }
+            return self._maps
+
+    def first_timestamp(self):
+        return int(self.columns()["timestamp"][0]) if self.length else None
+
+    def last_timestamp(self):
+        return int(self.columns()["timestamp"][-1]) if self.length else None
+
+    def write(self, bars):
+        """Merge ccxt-style [ts, o, h, l, c, v] rows; newer values win on equal timestamps"""
+        if not bars:
+            return 0
+        new = np.asarray(bars, dtype=np.float64).reshape(-1, len(COLUMNS))
+        new_ts = new[:, 0].astype(np.int64)
+        order = np.argsort(new_ts, kind='stable')
+        new, new_ts = new[order], new_ts[order]
+        # Keep the last occurrence of duplicated timestamps within the batch
+        keep = np.append(new_ts[1:] != new_ts[:-1], True)
+        new, new_ts = new[keep], new_ts[keep]
+
+        with self.lock:
+            last = self.last_timestamp()
+            if last is None or new_ts[0] >= last:
+                return self._append(new, new_ts, last)
+            return self._rewrite(new, new_ts)
+
+    def _append(self, new, new_ts, last):
+        """Fast path: overwrite the (possibly still forming) last candle, append the rest"""
+        start = 0
+        if last is not None and new_ts[0] == last:
+            offset = (self.length - 1) * ITEM_SIZE
+            for i, column in enumerate(COLUMNS):
+                value = new_ts[:1] if column == "timestamp" else new[:1, i]
+                with open(self._path(column), 'r+b') as f:
+                    f.seek(offset)
+                    f.write(value.astype(DTYPES[column]).tobytes())
+            start = 1
+
+        appended = len(new_ts) - start
+        if appended:
+            # Timestamp goes last so a crash mid-append is trimmed by _recover_length
+            for i, column in reversed(list(enumerate(COLUMNS))):
+                values = new_ts[start:] if column == "timestamp" else new[start:, i]
+                with open(self._path(column), 'ab') as f:
+                    f.write(values.astype(DTYPES[column]).tobytes())
+                    f.flush()
+            self.length += appended
+            self._maps = None
+        return appended
+
+    def _rewrite(self, new, new_ts):
+        """Slow path for backfills/gap fills: merge and atomically replace the files"""
+        existing = self.columns()
+        old_ts = np.asarray(existing["timestamp"])
+        stale = np.isin(old_ts, new_ts)
+        merged_ts = np.concatenate([old_ts[~stale], new_ts])
+        order = np.argsort(merged_ts, kind='stable')
+
+        for i, column in enumerate(COLUMNS):
+            values = new_ts if column == "timestamp" else new[:, i]
+            merged = np.concatenate([np.asarray(existing[column])[~stale], values.astype(DTYPES[column])])[order]
+            tmp_path = self._path(column) + ".tmp"
+            merged.astype(DTYPES[column]).tofile(tmp_path)
+            os.replace(tmp_path, self._path(column))
+
+        added = len(merged_ts) - self.length
+        self.length = len(merged_ts)
+        self._maps = None
+        return added
+
+    def read(self, start_ms=None, end_ms=None, limit=None):
+        """
+        Column arrays for start_ms <= timestamp <= end_ms (last `limit` rows).
+
+        Zero-copy views unless the range includes the last stored candle:
+        _append overwrites that row in place, so such ranges are copied and
+        frames handed out earlier never change under their holder.
+        """
+        with self.lock:
+            cols = self.columns()
+            timestamps = cols["timestamp"]
+            lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+            hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='right'))
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            if hi == self.length:
+                return {c: np.array(cols[c][lo:hi]) for c in COLUMNS}
+            return {c: cols[c][lo:hi] for c in COLUMNS}
+
+
+def store_exchange_name(exchange_name, sandbox=False):
+    """Name a series is stored under: testnet candles never land in mainnet history"""
+    return f"{exchange_name}-testnet" if sandbox else exchange_name
+
+
+class CandleStore:
+    """Local on-disk OHLCV store keyed by exchange (testnet apart)/symbol/timeframe"""
+    def __init__(self, root=os.path.join('database', 'candles')):
+        self.root = root
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe(name):
+        return name.replace('/', '_').replace(':', '-')
+
+    def series(self, exchange_name, symbol, timeframe):
+        key = (exchange_name, symbol, timeframe)
+        with self._lock:
+            if key not in self._series:
+                directory = os.path.join(self.root, self._safe(exchange_name), self._safe(symbol), timeframe)
+                self._series[key] = CandleSeries(directory)
+            return self._series[key]
+
+    def read(self, exchange_name, symbol, timeframe, start_ms=None, end_ms=None, limit=None):
+        return self.series(exchange_name, symbol, timeframe).read(start_ms, end_ms, limit)
+
+    def read_frame(self, exchange_name, symbol, timeframe, start_ms=None, end_ms=None, limit=None):
+        """Range read as the DataFrame layout used everywhere else (timestamp as datetime)"""
+        return to_frame(self.read(exchange_name, symbol, timeframe, start_ms, end_ms, limit))
+
+    def _fetch_pages(self, exchange, symbol, timeframe, since_ms, until_ms=None):
+        """Page forward from since_ms with ccxt `since` pagination"""
+        step_ms = exchange.parse_timeframe(timeframe) * 1000
+        bars = []
+        while True:
+            page = exchange.fetch_ohlcv(symbol, timeframe, since=since_ms, limit=PAGE_LIMIT)
+            if not page:
+                break
+            bars.extend(page)
+            next_since = page[-1][0] + step_ms
+            if len(page) < PAGE_LIMIT or next_since <= since_ms or (until_ms is not None and next_since > until_ms):
+                break
+            since_ms = next_since
+        if until_ms is not None:
+            bars = [b for b in bars if b[0] <= until_ms]
+        return bars
+
+    def sync(self, exchange, exchange_name, symbol, timeframe, since_ms=None, limit=None):
+        """
+        Bring the local series up to date, downloading only candles we don't have.
+
+        since_ms backfills history before the first stored candle. On an empty
+        series without since_ms only the latest `limit` candles are fetched.
+        """
+        series = self.series(exchange_name, symbol, timeframe)
+        step_ms = exchange.parse_timeframe(timeframe) * 1000
+
+        first = series.first_timestamp()
+        if since_ms is not None and (first is None or since_ms < first):
+            until_ms = first - step_ms if first is not None else None
+            series.write(self._fetch_pages(exchange, symbol, timeframe, since_ms, until_ms))
+
+        last = series.last_timestamp()
+        if last is None:
+            series.write(exchange.fetch_ohlcv(symbol, timeframe, limit=limit or PAGE_LIMIT))
+            return series
+
+        if limit is not None and (exchange.milliseconds() - last) > limit * step_ms:
+            # Too far behind for the caller's window: take the recent candles now
+            # and leave the hole for a later history sync to fill.
+            series.write(exchange.fetch_ohlcv(symbol, timeframe, limit=limit))
+        else:
+            # Re-fetch from the last stored candle: it may have been a forming one
+            series.write(self._fetch_pages(exchange, symbol, timeframe, last))
+        return series
+
+    def fill_gaps(self, exchange, exchange_name, symbol, timeframe):
+        """Download candles missing between stored ones (e.g. after bot downtime)"""
+        series = self.series(exchange_name, symbol, timeframe)
+        step_ms = exchange.parse_timeframe(timeframe) * 1000
+        timestamps = np.asarray(series.read()["timestamp"])
+        holes = np.nonzero(np.diff(timestamps) > step_ms)[0]
+        for i in holes:
+            start, end = int(timestamps[i]) + step_ms, int(timestamps[i + 1]) - step_ms
+            series.write(self._fetch_pages(exchange, symbol, timeframe, start, end))
+        return len(holes)
+
+    def fetch_recent(self, exchange, exchange_name, symbol, timeframe, limit):
+        """Incremental replacement for exchange.fetch_ohlcv(symbol, timeframe, limit=limit)"""
+        self.sync(exchange, exchange_name, symbol, timeframe, limit=limit)
+        return self.read_frame(exchange_name, symbol, timeframe, limit=limit)
+
+    def fetch_history(self, exchange, exchange_name, symbol, timeframe, since_ms, until_ms=None):
+        """Everything from since_ms on, downloading only what is not stored yet"""
+        self.sync(exchange, exchange_name, symbol, timeframe, since_ms=since_ms)
+        self.fill_gaps(exchange, exchange_name, symbol, timeframe)
+        return self.read_frame(exchange_name, symbol, timeframe, start_ms=since_ms, end_ms=until_ms)
+
+
+def to_frame(columns):
+    """Wrap column arrays in a DataFrame; prices are not copied"""
+    data = {c: columns[c] for c in COLUMNS[1:]}
+    data["timestamp"] = np.asarray(columns["timestamp"]).view("datetime64[ms]")
+    return pd.DataFrame(data, columns=list(COLUMNS), copy=False)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_candle_store():
+    """Process-wide candle store under database/candles"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = CandleStore()
+        return _default_store
@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text, insert, update, func, case
 from sqlalchemy.orm import sessionmaker
 from backend.models import Base, Trade
+from backend.events import publish
+from backend.paper import get_paper_account
 import datetime
 import os
+import queue
+import threading
+import atexit
 
 os.makedirs('database', exist_ok=True)
 
@@ -30,6 +35,26 @@ def get_database_path(mode):
     else:
         return "sqlite:///database/tradebot_paper.sqlite"
 
+# Applied to every new SQLite connection. WAL lets dashboard reads run
+# alongside the trade journal's writes; synchronous=NORMAL is durable under
+# WAL except for the last transactions on power loss.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # KiB, i.e. ~16 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA busy_timeout=5000",
+)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 def get_engine(mode=None):
     """Get database engine for specified mode"""
     if mode is None:
@@ -37,7 +62,17 @@ def get_engine(mode=None):
 
     if mode not in _engines:
         db_path = get_database_path(mode)
-        _engines[mode] = create_engine(db_path)
+        engine = create_engine(
+            db_path,
+            # Pooled connections are shared between request threads, bot ticks
+            # and the journal writer
+            connect_args={'check_same_thread': False, 'timeout': 5},
+            pool_size=8,
+            max_overflow=8,
+            pool_pre_ping=True
+        )
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+        _engines[mode] = engine
 
     return _engines[mode]
 
@@ -69,6 +104,12 @@ def migrate_database(mode=None):
     except Exception:
         pass
 
+    # Databases created before the indexes existed on the model
+    with engine.connect() as conn:
+        for index in Trade.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        conn.commit()
+
 def init_db(mode=None):
     """Initialize database for specified mode"""
     if mode is None:
@@ -85,12 +126,12 @@ def init_all_databases():
     print("Both paper and live databases initialized")
 
 def get_balance_db(mode=None):
-    """Get balance from database - always returns 10000 for paper mode"""
+    """Balance used for position sizing: paper account equity in paper mode"""
     if mode is None:
         mode = get_trading_mode()
 
     if mode == 'paper':
-        return 10000.0
+        return get_paper_account().equity()
     else:
         # For live mode, you might want to fetch actual balance from exchange
         # For now, we'll calculate from trades
@@ -154,6 +195,178 @@ def update_trade_pnl(trade_id, exit_price, pnl, status, mode=None):
     finally:
         session.close()
 
+class TradeJournal:
+    """
+    Write-behind trade log: callers enqueue, one background writer commits.
+
+    Operations are applied strictly in submission order, in batched
+    transactions per database, so a crash can only lose an uncommitted tail -
+    never reorder or half-apply a batch. When the queue is full the caller
+    blocks (backpressure) rather than dropping a trade.
+    """
+    def __init__(self, max_queue=10000, batch_size=500, flush_interval=0.25):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._backlogged = False
+        # Notified by the writer after each batch it finishes
+        self._batch_done = threading.Condition()
+        self.written = 0
+        self.failed = 0
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, name="trade-journal", daemon=True)
+                self._thread.start()
+
+    def _submit(self, op):
+        if self._closed:
+            # After shutdown there is no writer - apply synchronously
+            self._apply_batch([op])
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(op)
+            self._backlogged = False
+        except queue.Full:
+            if not self._backlogged:
+                self._backlogged = True
+                print("Trade journal queue full - waiting for the writer to catch up")
+            self._queue.put(op)
+
+    def submit_trade(self, db_mode, **fields):
+        self._submit(('insert', db_mode, fields))
+
+    def submit_pnl_update(self, db_mode, trade_id, exit_price, pnl, status):
+        self._submit(('update', db_mode, {'id': trade_id, 'exit_price': exit_price, 'pnl': pnl, 'status': status}))
+
+    def _writer(self):
+        while True:
+            op = self._queue.get()
+            batch = [op]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=self.flush_interval if len(batch) == 1 else 0))
+                except queue.Empty:
+                    break
+
+            stop = any(item is None for item in batch)
+            self._apply_batch([item for item in batch if item is not None])
+            with self._batch_done:
+                for _ in batch:
+                    self._queue.task_done()
+                self._batch_done.notify_all()
+            if stop:
+                return
+
+    def _apply_batch(self, batch):
+        by_mode = {}
+        for op in batch:
+            by_mode.setdefault(op[1], []).append(op)
+
+        for db_mode, ops in by_mode.items():
+            committed = 0
+            try:
+                self._write_ops(db_mode, ops)
+                committed = len(ops)
+            except Exception as e:
+                print(f"Trade journal batch failed ({db_mode}), retrying one by one: {e}")
+                for op in ops:
+                    try:
+                        self._write_ops(db_mode, [op])
+                        committed += 1
+                    except Exception as op_error:
+                        self.failed += 1
+                        print(f"Database error in trade journal ({db_mode}): {op_error}")
+            self.written += committed
+            if committed:
+                # Rows are visible now - tell dashboards to pull the delta
+                publish('trades_committed', {'mode': db_mode, 'count': committed})
+
+    def _write_ops(self, db_mode, ops):
+        """Apply ops in order inside one transaction; consecutive inserts go as one executemany"""
+        Session = get_session(db_mode)
+        session = Session()
+        try:
+            pending_inserts = []
+            for kind, _, fields in ops:
+                if kind == 'insert':
+                    pending_inserts.append(fields)
+                    continue
+                if pending_inserts:
+                    session.execute(insert(Trade), pending_inserts)
+                    pending_inserts = []
+                values = {k: v for k, v in fields.items() if k != 'id'}
+                session.execute(update(Trade).where(Trade.id == fields['id']).values(**values))
+            if pending_inserts:
+                session.execute(insert(Trade), pending_inserts)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def flush(self, timeout=None):
+        """Block until everything submitted so far is committed"""
+        if self._thread is None:
+            return True
+        with self._batch_done:
+            return self._batch_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self):
+        """Flush pending writes and stop the writer (registered at exit)"""
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self):
+        return {'queued': self._queue.qsize(), 'written': self.written, 'failed': self.failed}
+
+
+_journal = TradeJournal()
+atexit.register(_journal.close)
+
+def get_trade_journal():
+    return _journal
+
+def journal_trade(
+    symbol, side, size, price, sl, tp, status,
+    pnl=0, trading_mode='spot', leverage=1, usd_amount=None, db_mode=None
+):
+    """Non-blocking log_trade: queue the trade for the background writer"""
+    if db_mode is None:
+        db_mode = get_trading_mode()
+    if usd_amount is None:
+        usd_amount = size * price
+
+    _journal.submit_trade(
+        db_mode,
+        symbol=symbol,
+        side=side,
+        size=size,
+        price=price,
+        stop_loss=sl,
+        take_profit=tp,
+        status=status,
+        pnl=pnl,
+        timestamp=datetime.datetime.now(),
+        trading_mode=trading_mode.lower(),
+        leverage=leverage,
+        usd_amount=usd_amount
+    )
+
+def journal_trade_pnl(trade_id, exit_price, pnl, status, mode=None):
+    """Non-blocking update_trade_pnl"""
+    if mode is None:
+        mode = get_trading_mode()
+    _journal.submit_pnl_update(mode, trade_id, exit_price, pnl, status)
+
 def get_account_balance(mode=None):
     """Get account balance from appropriate database"""
     if mode is None:
@@ -162,15 +375,18 @@ def get_account_balance(mode=None):
     Session = get_session(mode)
     session = Session()
     try:
-        trades = session.query(Trade).filter(Trade.status == 'EXECUTED').all()
-        total_pnl = sum(t.pnl or 0 for t in trades)
+        # Aggregate in SQLite instead of loading every executed trade
+        total_trades, total_pnl = session.query(
+            func.count(Trade.id),
+            func.coalesce(func.sum(Trade.pnl), 0.0)
+        ).filter(Trade.status == 'EXECUTED').one()
         starting_balance = 10000.0
         current_balance = starting_balance + total_pnl
         return {
             "balance": current_balance,
             "total_pnl": total_pnl,
             "starting_balance": starting_balance,
-            "total_trades": len(trades),
+            "total_trades": total_trades,
             "trading_mode": mode
         }
     except Exception as e:
@@ -186,40 +402,113 @@ def get_account_balance(mode=None):
     finally:
         session.close()
 
-def get_trade_history(mode=None):
-    """Get trade history from appropriate database"""
+def get_trade_stats(mode=None):
+    """Total P&L, trade count and win/loss counts over the whole history, computed in SQL"""
+    if mode is None:
+        mode = get_trading_mode()
+
+    Session = get_session(mode)
+    session = Session()
+    try:
+        pnl = func.coalesce(Trade.pnl, 0)
+        total_trades, total_pnl, win_count, loss_count = session.query(
+            func.count(Trade.id),
+            func.coalesce(func.sum(pnl), 0.0),
+            func.coalesce(func.sum(case((pnl > 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((pnl < 0, 1), else_=0)), 0)
+        ).one()
+        return {
+            "total_pnl": total_pnl,
+            "total_trades": total_trades,
+            "win_count": win_count,
+            "loss_count": loss_count
+        }
+    except Exception as e:
+        print(f"Database error in get_trade_stats ({mode}): {e}")
+        return {"total_pnl": 0.0, "total_trades": 0, "win_count": 0, "loss_count": 0}
+    finally:
+        session.close()
+
+def _trade_to_dict(t):
+    return {
+        "id": t.id,
+        "symbol": t.symbol,
+        "side": t.side,
+        "size": t.size,
+        "price": t.price,
+        "exit_price": getattr(t, 'exit_price', None),
+        "stop_loss": t.stop_loss,
+        "take_profit": t.take_profit,
+        "status": t.status,
+        "pnl": t.pnl or 0,
+        "timestamp": t.timestamp,
+        "trading_mode": t.trading_mode,
+        "leverage": t.leverage,
+        "usd_amount": t.usd_amount
+    }
+
+def query_trades(
+    mode=None, limit=None, before_id=None, since_id=None,
+    symbol=None, side=None, status=None, start=None, end=None
+):
+    """
+    Keyset-paginated trade history, newest first.
+
+    before_id continues a previous page (pass its next_cursor); since_id
+    returns only trades newer than that id, for clients polling for deltas.
+    Rows are ordered by id, which follows insertion (and so timestamp) order
+    and walks the primary key instead of sorting the table.
+
+    Returns {"trades": [...], "next_cursor": id or None, "latest_id": id or None}.
+    """
     if mode is None:
         mode = get_trading_mode()
 
     Session = get_session(mode)
     session = Session()
     try:
-        trades = session.query(Trade).order_by(Trade.timestamp.desc()).all()
-        data = []
-        for t in trades:
-            data.append({
-                "id": t.id,
-                "symbol": t.symbol,
-                "side": t.side,
-                "size": t.size,
-                "price": t.price,
-                "exit_price": getattr(t, 'exit_price', None),
-                "stop_loss": t.stop_loss,
-                "take_profit": t.take_profit,
-                "status": t.status,
-                "pnl": t.pnl or 0,
-                "timestamp": t.timestamp,
-                "trading_mode": t.trading_mode,
-                "leverage": t.leverage,
-                "usd_amount": t.usd_amount
-            })
-        return data
+        query = session.query(Trade)
+        if before_id is not None:
+            query = query.filter(Trade.id < before_id)
+        if since_id is not None:
+            query = query.filter(Trade.id > since_id)
+        if symbol:
+            query = query.filter(Trade.symbol == symbol)
+        if side:
+            query = query.filter(Trade.side == side)
+        if status:
+            query = query.filter(Trade.status == status)
+        if start is not None:
+            query = query.filter(Trade.timestamp >= start)
+        if end is not None:
+            query = query.filter(Trade.timestamp <= end)
+
+        query = query.order_by(Trade.id.desc())
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            rows = query.limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            rows = query.all()
+            has_more = False
+
+        latest_id = session.query(func.max(Trade.id)).scalar()
+        return {
+            "trades": [_trade_to_dict(t) for t in rows],
+            "next_cursor": rows[-1].id if has_more else None,
+            "latest_id": latest_id
+        }
     except Exception as e:
-        print(f"Database error in get_trade_history ({mode}): {e}")
-        return []
+        print(f"Database error in query_trades ({mode}): {e}")
+        return {"trades": [], "next_cursor": None, "latest_id": None}
     finally:
         session.close()
 
+def get_trade_history(mode=None):
+    """Get trade history from appropriate database"""
+    return query_trades(mode)["trades"]
+
 def save_settings(api_key, api_secret, exchange, symbol, real_mode, risk, stop_loss, take_profit):
     pass
 
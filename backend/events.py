@@ -0,0 +1,116 @@
+import json
+import os
+import time
+import queue
+import threading
+from collections import deque
+
+# Each SSE stream holds a server thread for as long as it is open
+MAX_SUBSCRIBERS = int(os.getenv('STREAM_MAX_SUBSCRIBERS', 32))
+
+
+class Event:
+    __slots__ = ('id', 'type', 'data', 'timestamp')
+
+    def __init__(self, event_id, event_type, data):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        self.timestamp = time.time()
+
+    def to_sse(self):
+        """Encode as a Server-Sent Events message"""
+        payload = json.dumps({'type': self.type, 'timestamp': self.timestamp, 'data': self.data}, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class SubscriberLimitReached(Exception):
+    """subscribe() refused: the bus already has max_subscribers listeners"""
+
+
+class Subscription:
+    """One listener's bounded queue; the oldest events are dropped if it falls behind"""
+    def __init__(self, bus, max_queue):
+        self.bus = bus
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _offer(self, event):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process fan-out of bot events (fills, positions, kill switch, prices).
+
+    publish never blocks the caller: every subscriber has its own bounded
+    queue. A short history lets reconnecting clients resume from the
+    Last-Event-ID they saw. max_subscribers (None = unlimited) caps how
+    many listeners may be attached at once.
+    """
+    def __init__(self, history=500, max_queue=1000, max_subscribers=None):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def publish(self, event_type, data=None):
+        with self._lock:
+            event = Event(self._next_id, event_type, data or {})
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._offer(event)
+        return event
+
+    def subscribe(self, last_event_id=None):
+        subscription = Subscription(self, self.max_queue)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                raise SubscriberLimitReached(f"{len(self._subscribers)} subscribers already attached")
+            if last_event_id is not None:
+                for event in self._history:
+                    if event.id > last_event_id:
+                        subscription._offer(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+_default_bus = EventBus(max_subscribers=MAX_SUBSCRIBERS or None)
+
+def get_event_bus():
+    return _default_bus
+
+def publish(event_type, data=None):
+    """Publish on the process-wide bus"""
+    return _default_bus.publish(event_type, data)
@@ -1,20 +1,68 @@
 import ccxt
+import copy
 import pandas as pd
 import time
 import logging
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from backend.market_cache import get_market_cache
+from backend.candle_store import store_exchange_name
+from backend.paper import get_paper_account
+from backend.metrics import timed
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def ohlcv_to_frame(bars):
+    """ccxt OHLCV rows -> DataFrame with a datetime timestamp column"""
+    df = pd.DataFrame(bars, columns=["timestamp","open","high","low","close","volume"])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
 class TradingInterface:
-    def __init__(self, api_key, api_secret, exchange_name, real_mode=False, trading_mode="spot", leverage=1):
+    """
+    One exchange account (ccxt) plus the paper account and candle store around it.
+
+    Thread safety: a ccxt sync client (its requests.Session, nonce and markets)
+    must not be used by two threads at once, but a pooled interface is shared by
+    Flask request threads, bot runtimes and fetch_ohlcv_batch workers. Every
+    exchange call therefore checks a client out of a small per-interface pool
+    (at most CLIENTS, built on demand from the same params and markets) and has
+    it to itself until the call returns; callers beyond CLIENTS wait for one.
+    Markets are loaded once and copied into each client; a background refresh
+    updates them all lazily on their next checkout.
+    """
+    CLIENTS = 8  # concurrent ccxt clients per interface - matches BATCH_WORKERS
+
+    def __init__(self, api_key, api_secret, exchange_name, real_mode=False, trading_mode="spot", leverage=1,
+                 candle_store=None, market_cache=None, paper_account=None):
         self.real_mode = real_mode
         self.trading_mode = trading_mode  # "spot" or "futures"
         self.leverage = leverage
         self.exchange_name = exchange_name
-
-        exchange_class = getattr(ccxt, exchange_name)
+        # Optional local CandleStore: fetch_ohlcv then only downloads new candles
+        self.candle_store = candle_store
+        # On-disk markets snapshot so startup doesn't block on load_markets()
+        self.market_cache = market_cache if market_cache is not None else get_market_cache()
+        self._markets_lock = threading.Lock()
+        self._markets_refreshing = False
+        # ccxt clients not in use, as (client, markets generation it was synced to)
+        self._idle_clients = []
+        self._clients_lock = threading.Lock()
+        self._client_slots = threading.BoundedSemaphore(self.CLIENTS)
+        self._markets_generation = 0
+        # Bounded worker pool for fetch_ohlcv_batch, created on first use
+        self._fetch_executor = None
+        self._fetch_executor_lock = threading.Lock()
+        # Last close seen per symbol: paper fills and get_current_price reuse it
+        self._last_prices = {}
+        self.paper = None if real_mode else (paper_account if paper_account is not None else get_paper_account())
+
+        self._exchange_class = getattr(ccxt, exchange_name)
 
         # Configure exchange parameters
         params = {}
@@ -35,11 +83,21 @@ class TradingInterface:
         # Configure for spot or futures
         if trading_mode == "futures":
             params['options'] = {'defaultType': 'future'}
+        self.sandbox = params['sandbox']
+        # Kept so other clients of this account (the async market feed) match it
+        self.exchange_params = params
+        # Testnet candles are stored apart from the mainnet history backtests read
+        self.candle_source = store_exchange_name(exchange_name, self.sandbox)
 
         try:
-            self.exchange = exchange_class(params)
-            # Load markets with error handling
-            self.markets = self._load_markets_with_retry()
+            # First client: loads the markets, then joins the pool like the rest
+            self.exchange = self._exchange_class(copy.deepcopy(params))
+            # Load markets from the disk cache when possible, else from the exchange
+            self.markets, fresh = self._load_markets_cached()
+            self.currencies = self.exchange.currencies
+            self._idle_clients.append((self.exchange, self._markets_generation))
+            if not fresh:
+                self.refresh_markets_async()
             logger.info(f"Successfully initialized {exchange_name} exchange in {trading_mode} mode")
         except Exception as e:
             logger.error(f"Failed to initialize exchange {exchange_name}: {str(e)}")
@@ -64,6 +122,72 @@ class TradingInterface:
                 logger.warning(f"Market loading attempt {attempt + 1} failed: {e}. Retrying...")
                 time.sleep(2)
 
+    def _load_markets_cached(self):
+        """Cached markets (instantly) or freshly loaded ones -> (markets, fresh); stale ones get refreshed"""
+        cached = self.market_cache.load(self.exchange_name, self.trading_mode, self.sandbox)
+        if cached is None:
+            markets = self._load_markets_with_retry()
+            self._save_markets()
+            return markets, True
+
+        markets, currencies, fetched_at = cached
+        self.exchange.set_markets(markets, currencies)
+        logger.info(f"Loaded {len(markets)} {self.exchange_name} markets from cache")
+        return self.exchange.markets, self.market_cache.is_fresh(fetched_at)
+
+    def _save_markets(self, client=None):
+        client = client or self.exchange
+        self.market_cache.save(self.exchange_name, self.trading_mode,
+                               client.markets, client.currencies, sandbox=self.sandbox)
+
+    @contextmanager
+    def _client(self):
+        """Check out a ccxt client for this thread alone; returned to the pool on exit"""
+        self._client_slots.acquire()
+        try:
+            with self._clients_lock:
+                entry = self._idle_clients.pop() if self._idle_clients else None
+                generation = self._markets_generation
+            if entry is None:
+                client = self._exchange_class(copy.deepcopy(self.exchange_params))
+                client.set_markets(self.markets, self.currencies)
+            else:
+                client, synced = entry
+                if synced != generation:
+                    client.set_markets(self.markets, self.currencies)
+            try:
+                yield client
+            finally:
+                with self._clients_lock:
+                    self._idle_clients.append((client, generation))
+        finally:
+            self._client_slots.release()
+
+    def refresh_markets_async(self):
+        """Reload markets from the exchange on a background thread"""
+        with self._markets_lock:
+            if self._markets_refreshing:
+                return
+            self._markets_refreshing = True
+
+        def refresh():
+            try:
+                with self._client() as client:
+                    markets = client.load_markets(reload=True)
+                    currencies = client.currencies
+                    self._save_markets(client)
+                with self._clients_lock:
+                    self.markets, self.currencies = markets, currencies
+                    self._markets_generation += 1
+                logger.info(f"Refreshed {self.exchange_name} markets in background")
+            except Exception as e:
+                logger.warning(f"Background market refresh failed, keeping cached markets: {e}")
+            finally:
+                with self._markets_lock:
+                    self._markets_refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
     def format_symbol_for_mode(self, symbol):
         """Convert symbol format based on trading mode"""
         try:
@@ -91,6 +215,8 @@ class TradingInterface:
         try:
             formatted_symbol = self.format_symbol_for_mode(symbol)
             if formatted_symbol not in self.markets:
+                # Cached markets may predate a new listing - refresh for next time
+                self.refresh_markets_async()
                 available_symbols = [s for s in self.markets.keys() if 'USDT' in s][:10]
                 logger.error(f"Symbol {formatted_symbol} not found. Available: {available_symbols}")
                 return False
@@ -104,13 +230,15 @@ class TradingInterface:
         if self.trading_mode == "futures" and self.real_mode and self.leverage > 1:
             try:
                 formatted_symbol = self.format_symbol_for_mode(symbol)
-                result = self.exchange.set_leverage(self.leverage, formatted_symbol)
+                with self._client() as client:
+                    result = client.set_leverage(self.leverage, formatted_symbol)
                 logger.info(f"Set leverage {self.leverage}x for {formatted_symbol}")
                 return result
             except Exception as e:
                 logger.warning(f"Leverage setting error for {symbol}: {e}")
                 return None
 
+    @timed('exchange.fetch_ohlcv')
     def fetch_ohlcv(self, symbol, timeframe='1h', limit=100, max_retries=3):
         """Fetch OHLCV data with improved error handling and retry logic"""
         formatted_symbol = self.format_symbol_for_mode(symbol)
@@ -123,15 +251,24 @@ class TradingInterface:
             try:
                 logger.debug(f"Fetching OHLCV: {formatted_symbol}, {timeframe}, limit={limit}")
 
-                bars = self.exchange.fetch_ohlcv(formatted_symbol, timeframe=timeframe, limit=limit)
+                if self.candle_store is not None:
+                    with self._client() as client:
+                        df = self.candle_store.fetch_recent(
+                            client, self.candle_source, formatted_symbol, timeframe, limit
+                        )
+                    if df.empty:
+                        raise ValueError(f"No data returned for {formatted_symbol}")
+                else:
+                    with self._client() as client:
+                        bars = client.fetch_ohlcv(formatted_symbol, timeframe=timeframe, limit=limit)
 
-                if not bars:
-                    raise ValueError(f"No data returned for {formatted_symbol}")
+                    if not bars:
+                        raise ValueError(f"No data returned for {formatted_symbol}")
 
-                df = pd.DataFrame(bars, columns=["timestamp","open","high","low","close","volume"])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                    df = ohlcv_to_frame(bars)
 
                 logger.info(f"Successfully fetched {len(df)} candles for {formatted_symbol}")
+                self.remember_price(symbol, df)
                 return df
 
             except ccxt.NetworkError as e:
@@ -158,18 +295,54 @@ class TradingInterface:
                 logger.warning(f"Unexpected error on attempt {attempt + 1}: {e}. Retrying...")
                 time.sleep(1)
 
+    BATCH_WORKERS = CLIENTS
+
+    def _get_fetch_executor(self):
+        with self._fetch_executor_lock:
+            if self._fetch_executor is None:
+                self._fetch_executor = ThreadPoolExecutor(max_workers=self.BATCH_WORKERS,
+                                                          thread_name_prefix=f"ohlcv-{self.exchange_name}")
+            return self._fetch_executor
+
+    @timed('exchange.fetch_ohlcv_batch')
+    def fetch_ohlcv_batch(self, symbols, timeframe='1h', limit=100):
+        """
+        Fetch OHLCV for many symbols concurrently on a bounded worker pool.
+
+        Each symbol is fetched once per call however often it is listed, and every
+        consumer gets the same frame. Returns {symbol: df}; symbols that failed are
+        left out (the error is logged).
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        if not unique_symbols:
+            return {}
+        if len(unique_symbols) == 1:
+            futures = None
+        else:
+            executor = self._get_fetch_executor()
+            # Workers run in a copy of the caller's context so their spans count towards its tick
+            futures = {s: executor.submit(contextvars.copy_context().run, self.fetch_ohlcv, s, timeframe, limit)
+                       for s in unique_symbols}
+
+        frames = {}
+        for symbol in unique_symbols:
+            try:
+                if futures is None:
+                    frames[symbol] = self.fetch_ohlcv(symbol, timeframe, limit)
+                else:
+                    frames[symbol] = futures[symbol].result()
+            except Exception as e:
+                logger.error(f"Batch fetch failed for {symbol} {timeframe}: {e}")
+        return frames
+
     def get_balance(self, currency="USDT"):
         """Get balance with error handling"""
         try:
             if not self.real_mode:
-                # Return mock balance for paper trading
-                return {
-                    'free': 10000.0,
-                    'used': 0.0,
-                    'total': 10000.0
-                }
-
-            balance = self.exchange.fetch_balance()
+                return self.paper.balance(currency)
+
+            with self._client() as client:
+                balance = client.fetch_balance()
             if currency in balance:
                 return balance[currency]
             else:
@@ -178,40 +351,19 @@ class TradingInterface:
 
         except Exception as e:
             logger.error(f"Error fetching balance: {e}")
-            if not self.real_mode:
-                return {'free': 10000.0, 'used': 0.0, 'total': 10000.0}
             raise
 
-    def place_order(self, symbol, side, amount, price=None, params={}):
-        """Place order with enhanced error handling"""
+    @timed('exchange.place_order')
+    def place_order(self, symbol, side, amount, price=None, params={}, fee_rate=None):
+        """Place order with enhanced error handling; fee_rate overrides the paper account's"""
         formatted_symbol = self.format_symbol_for_mode(symbol)
 
         if not self.real_mode:
-            # Enhanced simulated paper trade
-            try:
-                # Get current price for simulation
-                df = self.fetch_ohlcv(symbol, '1m', 1)
-                current_price = float(df['close'].iloc[-1])
-                simulated_price = price if price else current_price
-
-                return {
-                    'status': 'simulated',
-                    'symbol': formatted_symbol,
-                    'side': side,
-                    'amount': amount,
-                    'price': simulated_price,
-                    'id': f'sim_{int(time.time())}'
-                }
-            except Exception as e:
-                logger.warning(f"Error in paper trade simulation: {e}")
-                return {
-                    'status': 'simulated',
-                    'symbol': formatted_symbol,
-                    'side': side,
-                    'amount': amount,
-                    'price': price or 0,
-                    'id': f'sim_{int(time.time())}'
-                }
+            # Filled locally from the last price the bot fetched - no extra request
+            reference = price or self.last_price(symbol)
+            if reference is None:
+                reference = self.get_current_price(symbol)
+            return self.paper.execute(symbol, side, amount, reference, fee_rate=fee_rate)
 
         # Validate symbol before placing real order
         if not self.validate_symbol(symbol):
@@ -222,12 +374,13 @@ class TradingInterface:
             self.set_leverage_for_symbol(symbol)
 
         try:
-            if price:
-                logger.info(f"Placing limit order: {side} {amount} {formatted_symbol} at {price}")
-                return self.exchange.create_limit_order(formatted_symbol, side, amount, price, params)
-            else:
-                logger.info(f"Placing market order: {side} {amount} {formatted_symbol}")
-                return self.exchange.create_market_order(formatted_symbol, side, amount, params)
+            with self._client() as client:
+                if price:
+                    logger.info(f"Placing limit order: {side} {amount} {formatted_symbol} at {price}")
+                    return client.create_limit_order(formatted_symbol, side, amount, price, params)
+                else:
+                    logger.info(f"Placing market order: {side} {amount} {formatted_symbol}")
+                    return client.create_market_order(formatted_symbol, side, amount, params)
 
         except ccxt.InsufficientFunds as e:
             logger.error(f"Insufficient funds: {e}")
@@ -239,8 +392,49 @@ class TradingInterface:
             logger.error(f"Order placement error: {e}")
             raise
 
+    @timed('exchange.close_position')
+    def close_position(self, symbol, side, amount, fee_rate=None):
+        """
+        Offset a position the bot is closing (side is the opening side).
+
+        Paper mode fills the exit on the paper account in full, charging
+        fee_rate if given. Live mode sends nothing, as before - returns None.
+        """
+        if self.real_mode:
+            return None
+        exit_side = "sell" if side == "buy" else "buy"
+        reference = self.last_price(symbol)
+        if reference is None:
+            reference = self.get_current_price(symbol)
+        return self.paper.execute(symbol, exit_side, amount, reference, allow_partial=False, fee_rate=fee_rate)
+
+    PRICE_MAX_AGE = 30  # seconds a remembered close stands in for a fresh quote
+
+    def remember_price(self, symbol, df):
+        """Record the latest close of a fetched frame"""
+        if df is None or df.empty:
+            return
+        price = float(df['close'].iloc[-1])
+        self._last_prices[symbol] = (price, time.time())
+        if self.paper is not None:
+            self.paper.mark(symbol, price)
+
+    def last_price(self, symbol, max_age=None):
+        """Last fetched close if it is recent enough, else None"""
+        entry = self._last_prices.get(symbol)
+        if entry is None:
+            return None
+        price, seen_at = entry
+        if time.time() - seen_at > (self.PRICE_MAX_AGE if max_age is None else max_age):
+            return None
+        return price
+
+    @timed('exchange.get_current_price')
     def get_current_price(self, symbol):
         """Get current price for a symbol"""
+        price = self.last_price(symbol)
+        if price is not None:
+            return price
         try:
             df = self.fetch_ohlcv(symbol, '1m', 1)
             return float(df['close'].iloc[-1])
@@ -272,3 +466,98 @@ class TradingInterface:
         except Exception as e:
             logger.error(f"Exchange connection test failed: {e}")
             return False
+
+
+class InterfacePool:
+    """
+    Process-wide pool of long-lived TradingInterfaces.
+
+    Keyed by exchange, trading mode, real/paper, leverage and a hash of the
+    credentials, so markets metadata and the ccxt HTTP sessions are built once
+    and shared by every request and bot using the same account. Only
+    construction is locked here; each TradingInterface serialises use of its
+    own ccxt clients (see its docstring).
+    """
+    def __init__(self, candle_store=None):
+        self.candle_store = candle_store
+        self._interfaces = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(api_key, api_secret, exchange_name, real_mode, trading_mode, leverage):
+        credentials = hashlib.sha256(f"{api_key}:{api_secret}".encode()).hexdigest()[:16] if api_key else "public"
+        return (exchange_name, trading_mode, bool(real_mode), int(leverage), credentials)
+
+    def get(self, api_key='', api_secret='', exchange_name='binance', real_mode=False, trading_mode='spot', leverage=1):
+        key = self.make_key(api_key, api_secret, exchange_name, real_mode, trading_mode, leverage)
+
+        with self._lock:
+            interface = self._interfaces.get(key)
+            if interface is not None:
+                self.hits += 1
+                return interface
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Build outside the pool lock; concurrent misses on one key wait for a single build
+        with key_lock:
+            with self._lock:
+                interface = self._interfaces.get(key)
+                if interface is not None:
+                    self.hits += 1
+                    return interface
+            try:
+                interface = TradingInterface(api_key, api_secret, exchange_name, real_mode, trading_mode,
+                                             leverage, candle_store=self.candle_store)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            with self._lock:
+                self._interfaces[key] = interface
+                self.misses += 1
+            return interface
+
+    def evict(self, api_key='', api_secret='', exchange_name='binance', real_mode=False, trading_mode='spot', leverage=1):
+        key = self.make_key(api_key, api_secret, exchange_name, real_mode, trading_mode, leverage)
+        with self._lock:
+            return self._interfaces.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._interfaces.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._interfaces),
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'interfaces': [
+                    {'exchange': k[0], 'trading_mode': k[1], 'real_mode': k[2], 'leverage': k[3]}
+                    for k in self._interfaces
+                ]
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_interface_pool():
+    """Shared InterfacePool backed by the local candle store"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from backend.candle_store import get_candle_store
+            _pool = InterfacePool(candle_store=get_candle_store())
+        return _pool
+
+def get_shared_interface(api_key='', api_secret='', exchange_name='binance', real_mode=False, trading_mode='spot', leverage=1):
+    """Pooled replacement for TradingInterface(...) - reuses markets and HTTP sessions"""
+    return get_interface_pool().get(api_key, api_secret, exchange_name, real_mode, trading_mode, leverage)
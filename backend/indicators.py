@@ -0,0 +1,471 @@
+import math
+from collections import deque
+
+import numpy as np
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    """Fixed-size rolling window with O(1) mean and standard deviation"""
+    def __init__(self, period):
+        self.period = period
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def push(self, x):
+        x = float(x)
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.values) > self.period:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+        # Re-sum once per window to stop floating point drift (amortized O(1))
+        self._pushes += 1
+        if self._pushes >= self.period:
+            self._pushes = 0
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def _sums_with(self, x):
+        """Window count and sums as if x were pushed next"""
+        x = float(x)
+        total = self.total + x
+        total_sq = self.total_sq + x * x
+        count = len(self.values) + 1
+        if count > self.period:
+            old = self.values[0]
+            total -= old
+            total_sq -= old * old
+            count = self.period
+        return count, total, total_sq
+
+    def mean(self):
+        if len(self.values) < self.period:
+            return NAN
+        return self.total / self.period
+
+    def peek_mean(self, x):
+        count, total, _ = self._sums_with(x)
+        if count < self.period:
+            return NAN
+        return total / self.period
+
+    def _std(self, count, total, total_sq):
+        if count < self.period or count < 2:
+            return NAN
+        variance = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def std(self):
+        return self._std(len(self.values), self.total, self.total_sq)
+
+    def peek_std(self, x):
+        return self._std(*self._sums_with(x))
+
+
+class RollingExtremum:
+    """Rolling max (or min) over a window using a monotonic deque"""
+    def __init__(self, period, mode='max'):
+        self.period = period
+        self.sign = 1.0 if mode == 'max' else -1.0
+        self.window = deque()  # (index, signed value), signed values decreasing
+        self.count = 0
+
+    def push(self, x):
+        v = self.sign * float(x)
+        while self.window and self.window[-1][1] <= v:
+            self.window.pop()
+        self.window.append((self.count, v))
+        self.count += 1
+        while self.window[0][0] <= self.count - 1 - self.period:
+            self.window.popleft()
+
+    def value(self):
+        if self.count < self.period:
+            return NAN
+        return self.sign * self.window[0][1]
+
+    def peek(self, x):
+        if self.count + 1 < self.period:
+            return NAN
+        v = self.sign * float(x)
+        # Only the front entry can fall out of the window for the next index
+        cutoff = self.count - self.period + 1
+        for index, stored in self.window:
+            if index >= cutoff:
+                return self.sign * max(stored, v)
+        return self.sign * v
+
+
+class EMA:
+    """
+    Adjusted exponential moving average (pandas ewm(span=period)) of the
+    values pushed and not yet dropped: weights (1 - alpha)^i, normalized by
+    their sum. drop() removes the oldest value in O(1), so the average can
+    follow a sliding window.
+    """
+    def __init__(self, period):
+        self.period = period
+        self.decay = 1.0 - 2.0 / (period + 1.0)
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def push(self, x):
+        self.numerator = float(x) + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+        self.count += 1
+
+    def drop(self, x):
+        """Remove x, the oldest value still in the average"""
+        self.count -= 1
+        self.numerator -= self.decay ** self.count * float(x)
+        # Closed form rather than subtracting, so the weights never drift
+        self.denominator = (1.0 - self.decay ** self.count) / (1.0 - self.decay)
+
+    def value(self):
+        if self.denominator == 0:
+            return NAN
+        return self.numerator / self.denominator
+
+    def peek(self, x):
+        return (float(x) + self.decay * self.numerator) / (1.0 + self.decay * self.denominator)
+
+
+class RSI:
+    """Streaming version of ``calculate_rsi`` (simple moving average of gains/losses)"""
+    def __init__(self, period=14):
+        self.period = period
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.last_close = None
+
+    def _split(self, close):
+        if self.last_close is None:
+            return 0.0, 0.0
+        delta = float(close) - self.last_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    def push(self, close):
+        gain, loss = self._split(close)
+        self.gains.push(gain)
+        self.losses.push(loss)
+        self.last_close = float(close)
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def value(self):
+        return self._rsi(self.gains.mean(), self.losses.mean())
+
+    def peek(self, close):
+        gain, loss = self._split(close)
+        return self._rsi(self.gains.peek_mean(gain), self.losses.peek_mean(loss))
+
+
+class MACD:
+    """
+    Streaming version of ``calculate_macd`` over the closes pushed and not
+    yet dropped.
+
+    The MACD line is two sliding EMAs, O(1) per close. The signal line is an
+    EMA of MACD values that are each normalized from the window's first
+    close, so all of them change when the window slides and no constant-size
+    state reproduces it. It is evaluated instead as one dot product over the
+    running (un-windowed) EMA numerators kept per close, with weights cached
+    per window length - no EMA is rebuilt.
+    """
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal_decay = 1.0 - 2.0 / (signal + 1.0)
+        self._lines = (self.fast, self.slow)
+        self._running = [0.0, 0.0]         # numerators over every close since the first push
+        self._sums = (deque(), deque())    # ... as they were after each close in the window
+        self._before = [0.0, 0.0]          # ... just before the window's first close
+        self._kernels = {}
+        self._signal = None                # (numerator, denominator) over the window
+
+    def push(self, close):
+        for i, line in enumerate(self._lines):
+            line.push(close)
+            self._running[i] = float(close) + line.decay * self._running[i]
+            self._sums[i].append(self._running[i])
+        self._signal = None
+
+    def drop(self, close):
+        """Remove the oldest close in the window"""
+        for i, line in enumerate(self._lines):
+            line.drop(close)
+            self._before[i] = self._sums[i].popleft()
+        self._signal = None
+
+    def _kernel(self, n):
+        """Per line: signal weight of each window position over its EMA denominator, and the decay to it"""
+        if n not in self._kernels:
+            k = np.arange(n)
+            signal_weights = self.signal_decay ** (n - 1 - k)
+            kernel = []
+            for line in self._lines:
+                offsets = line.decay ** (k + 1)
+                kernel.append((signal_weights * (1.0 - line.decay) / (1.0 - offsets), offsets))
+            denominator = (1.0 - self.signal_decay ** n) / (1.0 - self.signal_decay)
+            self._kernels = {n: (kernel, denominator)}
+        return self._kernels[n]
+
+    def _signal_sums(self):
+        if self._signal is None:
+            n = len(self._sums[0])
+            if n == 0:
+                self._signal = (0.0, 0.0)
+            else:
+                kernel, denominator = self._kernel(n)
+                numerator = 0.0
+                for sign, (weights, offsets), sums, before in zip((1.0, -1.0), kernel, self._sums, self._before):
+                    # Each position's EMA numerator restricted to the window
+                    windowed = np.fromiter(sums, dtype=float, count=n) - offsets * before
+                    numerator += sign * float(weights @ windowed)
+                self._signal = (numerator, denominator)
+        return self._signal
+
+    def value(self):
+        macd = self.fast.value() - self.slow.value()
+        numerator, denominator = self._signal_sums()
+        signal = numerator / denominator if denominator else NAN
+        return macd, signal, macd - signal
+
+    def peek(self, close):
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        numerator, denominator = self._signal_sums()
+        signal = (macd + self.signal_decay * numerator) / (1.0 + self.signal_decay * denominator)
+        return macd, signal, macd - signal
+
+
+class BollingerBands:
+    """Streaming SMA +/- num_std rolling standard deviations"""
+    def __init__(self, period=20, num_std=2):
+        self.window = RollingWindow(period)
+        self.num_std = num_std
+
+    def push(self, close):
+        self.window.push(close)
+
+    def _bands(self, mid, std):
+        return mid, mid + std * self.num_std, mid - std * self.num_std
+
+    def value(self):
+        return self._bands(self.window.mean(), self.window.std())
+
+    def peek(self, close):
+        return self._bands(self.window.peek_mean(close), self.window.peek_std(close))
+
+
+class ATR:
+    """Streaming average true range (simple mean, as in ``calculate_dynamic_stop_loss``)"""
+    def __init__(self, period=20):
+        self.window = RollingWindow(period)
+        self.last_close = None
+
+    def _true_range(self, high, low):
+        high, low = float(high), float(low)
+        if self.last_close is None:
+            return high - low
+        return max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+
+    def push(self, high, low, close):
+        self.window.push(self._true_range(high, low))
+        self.last_close = float(close)
+
+    def value(self):
+        return self.window.mean()
+
+    def peek(self, high, low):
+        return self.window.peek_mean(self._true_range(high, low))
+
+
+class IndicatorEngine:
+    """
+    Incremental indicator state for one symbol/timeframe.
+
+    Closed candles are folded into the indicators once; the newest (still forming)
+    candle is evaluated on top of that state without being committed, so each
+    refresh costs O(1) per new candle instead of a full DataFrame recompute.
+
+    Values match the DataFrame functions run on the last frame passed to
+    update(). Rolling windows only see their last `period` candles anyway; the
+    EMAs (and MACD built on them) depend on where the frame starts, so closes
+    that slide out of the frame are dropped from them.
+    """
+    HISTORY = 4  # closes kept for short look-backs (momentum uses close[-4])
+
+    def __init__(self, short=9, long=21):
+        self.short = short
+        self.long = long
+
+        self.ma_short = RollingWindow(short)
+        self.ma_long = RollingWindow(long)
+        self.sma_20 = RollingWindow(20)
+        self.volume_10 = RollingWindow(10)
+        self.volume_20 = RollingWindow(20)
+        self.ema_fast = EMA(5)
+        self.ema_slow = EMA(13)
+        self.rsi_14 = RSI(14)
+        self.rsi_7 = RSI(7)
+        self.macd = MACD()
+        self.bollinger = BollingerBands(20, 2)
+        self.atr = ATR(20)
+        self.high_20 = RollingExtremum(20, 'max')
+        self.low_20 = RollingExtremum(20, 'min')
+        self.high_8 = RollingExtremum(8, 'max')
+        self.low_8 = RollingExtremum(8, 'min')
+
+        self.closes = deque(maxlen=self.HISTORY)
+        self.committed = 0
+        self.last_timestamp = None
+        self.live = None  # (timestamp, open, high, low, close, volume)
+        self.window = None  # length of the last frame given to update()
+        self._ema_closes = deque()  # (timestamp, close) of the closed candles the EMAs cover
+
+    @classmethod
+    def from_dataframe(cls, df, short=9, long=21):
+        engine = cls(short, long)
+        engine.update(df)
+        return engine
+
+    def __len__(self):
+        return self.committed + (1 if self.live is not None else 0)
+
+    def _commit(self, candle):
+        timestamp, _, high, low, close, volume = candle
+        for window in (self.ma_short, self.ma_long, self.sma_20):
+            window.push(close)
+        self.volume_10.push(volume)
+        self.volume_20.push(volume)
+        self.ema_fast.push(close)
+        self.ema_slow.push(close)
+        self._ema_closes.append((timestamp, float(close)))
+        self.rsi_14.push(close)
+        self.rsi_7.push(close)
+        self.macd.push(close)
+        self.bollinger.push(close)
+        self.atr.push(high, low, close)
+        self.high_20.push(high)
+        self.high_8.push(high)
+        self.low_20.push(low)
+        self.low_8.push(low)
+        self.closes.append(float(close))
+        self.committed += 1
+        self.last_timestamp = timestamp
+
+    def reset(self):
+        self.__init__(self.short, self.long)
+
+    def _slide_emas(self, first_timestamp):
+        """Drop closes before the frame's first candle from the EMA-based indicators"""
+        while self._ema_closes and self._ema_closes[0][0] < first_timestamp:
+            _, close = self._ema_closes.popleft()
+            self.ema_fast.drop(close)
+            self.ema_slow.drop(close)
+            self.macd.drop(close)
+
+    def update_candle(self, timestamp, open, high, low, close, volume):
+        """Feed one candle; a new timestamp closes the previous live candle"""
+        candle = (timestamp, open, high, low, close, volume)
+        if self.live is not None and timestamp != self.live[0]:
+            self._commit(self.live)
+        self.live = candle
+
+    def update(self, df):
+        """Sync with a freshly fetched OHLCV frame, processing only unseen candles"""
+        if df is None or df.empty:
+            return self
+
+        timestamps = df['timestamp'].to_numpy()
+        start = 0
+        if self.last_timestamp is not None:
+            if timestamps[0] > self.last_timestamp or (self._ema_closes and timestamps[0] < self._ema_closes[0][0]):
+                # No overlap with what we have already folded in, or the frame
+                # reaches back past the EMAs' first candle - start over
+                self.reset()
+            else:
+                start = int(timestamps.searchsorted(self.last_timestamp, side='right'))
+
+        columns = [df[name].to_numpy() for name in ('open', 'high', 'low', 'close', 'volume')]
+        last = len(df) - 1
+        # Rows before the last one are closed candles and use their final values
+        if start < last and self.live is not None and self.live[0] < timestamps[start]:
+            self._commit(self.live)
+            self.live = None
+        for i in range(start, last):
+            if self.live is not None and self.live[0] == timestamps[i]:
+                self.live = None
+            self._commit((timestamps[i],) + tuple(col[i] for col in columns))
+        if start <= last:
+            self.update_candle(timestamps[last], *(col[last] for col in columns))
+
+        self.window = len(df)
+        self._slide_emas(timestamps[0])
+        return self
+
+    def bars(self):
+        """Candles the values are computed over: the last frame, as len(df) was"""
+        if self.window is None:
+            return len(self)
+        return min(len(self), self.window)
+
+    def _current(self):
+        if self.live is None:
+            raise ValueError("IndicatorEngine has no candles yet")
+        return self.live
+
+    def values(self):
+        """Indicator values for the live candle ('curr') and the last closed one ('prev')"""
+        _, _, high, low, close, volume = self._current()
+        macd, macd_signal, macd_hist = self.macd.peek(close)
+        bb_mid, bb_upper, bb_lower = self.bollinger.peek(close)
+        closes = list(self.closes) + [float(close)]
+
+        return {
+            'bars': self.bars(),
+            'close': float(close),
+            'close_prev': closes[-2] if len(closes) >= 2 else NAN,
+            'close_4': closes[-4] if len(closes) >= 4 else NAN,
+            'volume': float(volume),
+            'ma_short': self.ma_short.peek_mean(close),
+            'ma_short_prev': self.ma_short.mean(),
+            'ma_long': self.ma_long.peek_mean(close),
+            'ma_long_prev': self.ma_long.mean(),
+            'sma_20': bb_mid,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+            'ema_fast': self.ema_fast.peek(close),
+            'ema_fast_prev': self.ema_fast.value(),
+            'ema_slow': self.ema_slow.peek(close),
+            'ema_slow_prev': self.ema_slow.value(),
+            'rsi_14': self.rsi_14.peek(close),
+            'rsi_7': self.rsi_7.peek(close),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'atr': self.atr.peek(high, low),
+            'high_20': self.high_20.peek(high),
+            'low_20': self.low_20.peek(low),
+            'high_8': self.high_8.peek(high),
+            'low_8': self.low_8.peek(low),
+            'volume_avg_10': self.volume_10.peek_mean(volume),
+            'volume_avg_20': self.volume_20.peek_mean(volume),
+        }
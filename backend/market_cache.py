@@ -0,0 +1,62 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds before cached markets are refreshed in the background
+DEFAULT_TTL = float(os.getenv('MARKET_CACHE_TTL', 6 * 3600))
+
+
+class MarketCache:
+    """JSON snapshot of exchange.load_markets() per exchange, trading mode and sandbox/live"""
+    def __init__(self, root=os.path.join('database', 'markets'), ttl=DEFAULT_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def _path(self, exchange_name, trading_mode, sandbox=False):
+        environment = "sandbox" if sandbox else "live"
+        return os.path.join(self.root, f"{exchange_name}_{trading_mode}_{environment}.json")
+
+    def load(self, exchange_name, trading_mode, sandbox=False):
+        """Return (markets, currencies, fetched_at) or None if nothing usable is cached"""
+        path = self._path(exchange_name, trading_mode, sandbox)
+        try:
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+            if not snapshot.get('markets'):
+                return None
+            return snapshot['markets'], snapshot.get('currencies'), snapshot.get('fetched_at', 0)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable market cache {path}: {e}")
+            return None
+
+    def save(self, exchange_name, trading_mode, markets, currencies=None, sandbox=False):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(exchange_name, trading_mode, sandbox)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'fetched_at': time.time(),
+                    'markets': markets,
+                    'currencies': currencies
+                }, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write market cache {path}: {e}")
+
+    def is_fresh(self, fetched_at):
+        return time.time() - fetched_at < self.ttl
+
+
+_default_cache = None
+
+def get_market_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MarketCache()
+    return _default_cache
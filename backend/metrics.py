@@ -0,0 +1,194 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Ticks slower than this (seconds, fetch + run_once) are logged with their breakdown
+SLOW_TICK_SECONDS = float(os.getenv('SLOW_TICK_SECONDS', 2.0))
+
+# Histogram bucket upper bounds in seconds, 100us to 30s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles interpolate within a bucket like histogram_quantile()"""
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+def _labels(pairs):
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+               for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class LatencyMetrics:
+    """
+    In-memory latency histograms keyed by (stage, bot, symbol).
+
+    span() times a block; the bot label comes from the current tick() (the
+    runtime runs each bot's run_once inside one), so bot code only names the
+    stage and symbol. Each tick also sums its spans per stage, which is what
+    the slow-tick log reports. The tick lives in context variables, so work
+    handed to a pool with contextvars.copy_context().run stays in it.
+    """
+    def __init__(self, slow_tick_seconds=SLOW_TICK_SECONDS):
+        self.slow_tick_seconds = slow_tick_seconds
+        self.slow_ticks = 0
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._bot = contextvars.ContextVar(f'metrics_bot_{id(self)}', default='')
+        self._stages = contextvars.ContextVar(f'metrics_stages_{id(self)}', default=None)
+
+    def observe(self, stage, seconds, symbol='', bot=None):
+        if bot is None:
+            bot = self._bot.get()
+        key = (stage, bot, symbol or '')
+        stages = self._stages.get()
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+            # Batch fetch workers add to their tick's dict concurrently
+            if stages is not None:
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage, symbol=''):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, symbol)
+
+    @contextmanager
+    def tick(self, bot):
+        """
+        One run_once of `bot` in this context: its spans get the bot label and
+        are summed per stage into the yielded dict. Records stage "run_once".
+        """
+        stages = {}
+        bot_token, stages_token = self._bot.set(bot), self._stages.set(stages)
+        started = time.perf_counter()
+        try:
+            yield stages
+        finally:
+            elapsed = time.perf_counter() - started
+            self._bot.reset(bot_token)
+            self._stages.reset(stages_token)
+            self.observe('run_once', elapsed, bot=bot)
+            stages['run_once'] = elapsed
+
+    def check_slow_tick(self, bot, seconds, stages):
+        """Log a tick that took longer than slow_tick_seconds, slowest stages first"""
+        if seconds <= self.slow_tick_seconds:
+            return False
+        with self._lock:
+            self.slow_ticks += 1
+        breakdown = ', '.join(f"{stage} {elapsed * 1000:.1f}ms"
+                              for stage, elapsed in sorted(stages.items(), key=lambda item: -item[1]))
+        logger.warning(f"Slow tick for bot {bot}: {seconds * 1000:.1f}ms "
+                       f"(threshold {self.slow_tick_seconds * 1000:.0f}ms) - {breakdown}")
+        return True
+
+    def snapshot(self):
+        """{(stage, bot, symbol): {'count', 'sum', 'max', 'p50', 'p95', 'p99'}}"""
+        with self._lock:
+            items = [(key, h) for key, h in self._histograms.items()]
+            return {key: {'count': h.count, 'sum': h.sum, 'max': h.max,
+                          **{f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES}}
+                    for key, h in items}
+
+    def prometheus(self, prefix='greed'):
+        """Prometheus text exposition: stage histograms, their p50/p95/p99 and the slow-tick count"""
+        name = f"{prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Latency of bot hot-path stages and exchange calls.",
+            f"# TYPE {name} histogram",
+        ]
+        quantile_lines = [
+            f"# HELP {name}_quantile Estimated p50/p95/p99 of {name}.",
+            f"# TYPE {name}_quantile gauge",
+        ]
+        with self._lock:
+            for (stage, bot, symbol), h in sorted(self._histograms.items()):
+                labels = (('stage', stage), ('bot', bot), ('symbol', symbol))
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ('+Inf',), h.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum:.9f}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+                for q in QUANTILES:
+                    quantile_lines.append(f"{name}_quantile{_labels(labels + (('quantile', q),))} {h.quantile(q):.9f}")
+            slow_ticks = self.slow_ticks
+        lines += quantile_lines
+        lines += [
+            f"# HELP {prefix}_slow_ticks_total Ticks slower than the slow-tick threshold.",
+            f"# TYPE {prefix}_slow_ticks_total counter",
+            f"{prefix}_slow_ticks_total {slow_ticks}",
+            f"# HELP {prefix}_slow_tick_threshold_seconds Slow-tick logging threshold.",
+            f"# TYPE {prefix}_slow_tick_threshold_seconds gauge",
+            f"{prefix}_slow_tick_threshold_seconds {self.slow_tick_seconds}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.slow_ticks = 0
+
+
+_default_metrics = LatencyMetrics()
+
+def get_metrics():
+    return _default_metrics
+
+def span(stage, symbol=''):
+    """Time a block as `stage` on the process-wide metrics"""
+    return _default_metrics.span(stage, symbol)
+
+def timed(stage):
+    """Decorator timing a TradingInterface-style method; its first argument, if a str, is the symbol"""
+    def decorate(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            symbol = args[0] if args and isinstance(args[0], str) else ''
+            with _default_metrics.span(stage, symbol):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
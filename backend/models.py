@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -23,3 +23,10 @@ class Trade(Base):
     leverage = Column(Integer, default=1)
     # NEW: exact USD amount for this trade
     usd_amount = Column(Float, default=0)
+
+    # Dashboard filters on status, orders by timestamp and groups by symbol
+    __table_args__ = (
+        Index('ix_trades_status', 'status'),
+        Index('ix_trades_timestamp', 'timestamp'),
+        Index('ix_trades_symbol_timestamp', 'symbol', 'timestamp'),
+    )
@@ -0,0 +1,345 @@
+import os
+import time
+import uuid
+import random
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backend.backtest import BacktestEngine, fetch_historical_data
+from backend.strategy import generate_signals
+
+STRATEGY_TYPES = ("default_ma", "custom", "momentum", "aggressive_ema", "breakout")
+PARAMETERS = ("short", "long", "stop_loss", "take_profit", "risk", "strategy_type")
+DEFAULTS = {"short": 9, "long": 21, "stop_loss": 1.0, "take_profit": 2.0, "risk": 1.0, "strategy_type": "default_ma"}
+MAX_COMBINATIONS = 20000
+BATCH_SIZE = 16  # combinations per worker task
+SUMMARY_KEYS = ("total_trades", "win_rate", "total_pnl", "return_percentage", "final_balance",
+                "max_drawdown", "profit_factor", "error")
+# Metrics where smaller is better
+ASCENDING_METRICS = ("max_drawdown",)
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+# ---------------------------------------------------------------------------
+# Worker side: candles are attached once per process from shared memory
+# ---------------------------------------------------------------------------
+
+_worker_frame = None
+_worker_shm = None
+_worker_signals = {}
+_worker_cancel = None
+
+def _init_worker(shm_name, length, cancel_flag=None):
+    global _worker_frame, _worker_shm, _worker_cancel
+    # Set by the parent on cancel; batches stop between combinations
+    _worker_cancel = cancel_flag
+    # Spawned workers share the parent's resource tracker, so attaching here does
+    # not take ownership: the parent unlinks the block when the job ends
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+
+    block = np.ndarray((len(CANDLE_FIELDS), length), dtype=np.float64, buffer=_worker_shm.buf)
+    data = {field: block[i] for i, field in enumerate(CANDLE_FIELDS)}
+    data["timestamp"] = block[0].astype(np.int64).view("datetime64[ms]")
+    _worker_frame = pd.DataFrame(data, columns=list(CANDLE_FIELDS), copy=False)
+
+def share_candles(df):
+    """Copy df's candle columns into a new shared memory block (caller closes and unlinks it)"""
+    length = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(len(CANDLE_FIELDS) * length * 8, 1))
+    block = np.ndarray((len(CANDLE_FIELDS), length), dtype=np.float64, buffer=shm.buf)
+    block[0] = df["timestamp"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+    for i, field in enumerate(CANDLE_FIELDS[1:], start=1):
+        block[i] = df[field].to_numpy(dtype=np.float64)
+    return shm
+
+def _signals_for(strategy_type, short, long):
+    # Signals only depend on strategy and MA periods, not on risk or SL/TP
+    key = (strategy_type, short, long)
+    if key not in _worker_signals:
+        if len(_worker_signals) >= 64:
+            _worker_signals.clear()
+        _worker_signals[key] = generate_signals(_worker_frame, strategy_type, short, long).to_numpy()
+    return _worker_signals[key]
+
+def _run_batch(batch, initial_balance, trade_amount):
+    """Backtest each combination; on cancel, return the ones finished so far"""
+    results = []
+    for index, params in batch:
+        if _worker_cancel is not None and _worker_cancel.is_set():
+            break
+        try:
+            engine = BacktestEngine(initial_balance)
+            report = engine.run_backtest(
+                _worker_frame, params["strategy_type"], params["risk"], params["stop_loss"],
+                params["take_profit"], trade_amount, short=params["short"], long=params["long"],
+                signals=_signals_for(params["strategy_type"], params["short"], params["long"])
+            )
+        except Exception as e:
+            report = {"error": str(e)}
+        results.append((index, params, {k: report[k] for k in SUMMARY_KEYS if k in report}))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Parameter spaces
+# ---------------------------------------------------------------------------
+
+def _grid_values(name, spec):
+    """A grid axis: a list of values or {"min", "max", "step"}"""
+    if isinstance(spec, dict):
+        low, high, step = spec["min"], spec["max"], spec.get("step", 1)
+        values = np.arange(low, high + step / 2, step).tolist()
+        if all(isinstance(v, int) for v in (low, high, step)):
+            values = [int(v) for v in values]
+        else:
+            values = [round(v, 10) for v in values]
+        return values
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+def _sample_value(rng, spec):
+    """A random draw: from a list of values or uniformly in {"min", "max"}"""
+    if isinstance(spec, dict):
+        low, high = spec["min"], spec["max"]
+        if isinstance(low, int) and isinstance(high, int):
+            return rng.randint(low, high)
+        return round(rng.uniform(low, high), 4)
+    if isinstance(spec, (list, tuple)):
+        return rng.choice(list(spec))
+    return spec
+
+def _valid(params):
+    return params["short"] < params["long"] and params["strategy_type"] in STRATEGY_TYPES
+
+def build_combinations(space, mode="grid", samples=100, seed=0):
+    """Expand a parameter space into concrete backtest configurations"""
+    unknown = set(space) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown optimizer parameters: {', '.join(sorted(unknown))}")
+    space = {**DEFAULTS, **space}
+
+    if mode == "grid":
+        axes = [_grid_values(name, space[name]) for name in PARAMETERS]
+        total = int(np.prod([len(axis) for axis in axes]))
+        if total > MAX_COMBINATIONS:
+            raise ValueError(f"Grid has {total} combinations (max {MAX_COMBINATIONS}); narrow it or use random mode")
+        combos = [dict(zip(PARAMETERS, values)) for values in itertools.product(*axes)]
+    elif mode == "random":
+        if samples > MAX_COMBINATIONS:
+            raise ValueError(f"At most {MAX_COMBINATIONS} samples")
+        rng = random.Random(seed)
+        combos, seen = [], set()
+        for _ in range(samples * 20):
+            if len(combos) >= samples:
+                break
+            params = {name: _sample_value(rng, space[name]) for name in PARAMETERS}
+            key = tuple(params[name] for name in PARAMETERS)
+            if key not in seen and _valid(params):
+                seen.add(key)
+                combos.append(params)
+    else:
+        raise ValueError(f"Unknown optimizer mode: {mode}")
+
+    combos = [params for params in combos if _valid(params)]
+    if not combos:
+        raise ValueError("Parameter space has no valid combinations (short must be below long)")
+    return combos
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+def _sort_key(metric):
+    descending = metric not in ASCENDING_METRICS
+
+    def key(entry):
+        value = entry["metrics"].get(metric)
+        if value == "Infinite":
+            value = float("inf")
+        if not isinstance(value, (int, float)) or "error" in entry["metrics"]:
+            return (1, 0.0)
+        return (0, -value if descending else value)
+    return key
+
+
+class OptimizationJob:
+    """One sweep: candles in shared memory, backtests fanned out over a process pool"""
+    def __init__(self, df, combinations, metric="total_pnl", initial_balance=10000,
+                 trade_amount=None, max_workers=None, description=""):
+        self.id = uuid.uuid4().hex[:12]
+        self.df = df.reset_index(drop=True)
+        self.combinations = combinations
+        self.metric = metric
+        self.initial_balance = initial_balance
+        self.trade_amount = trade_amount
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.description = description
+
+        self.status = "pending"
+        self.error = None
+        self.results = []
+        self.completed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        # Cross-process copy of _cancel, handed to the workers (created in _run)
+        self._cancel_flag = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def total(self):
+        return len(self.combinations)
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"optimizer-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+        flag = self._cancel_flag
+        if flag is not None:
+            flag.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status
+
+    def _batches(self):
+        # Group combinations that share signals so each worker computes them once
+        indexed = sorted(enumerate(self.combinations),
+                         key=lambda item: (item[1]["strategy_type"], item[1]["short"], item[1]["long"]))
+        return [indexed[i:i + BATCH_SIZE] for i in range(0, len(indexed), BATCH_SIZE)]
+
+    def _run(self):
+        shm = None
+        try:
+            shm = share_candles(self.df)
+            # spawn: the API server runs threads, which fork does not copy safely
+            context = multiprocessing.get_context("spawn")
+            self._cancel_flag = context.Event()
+            if self._cancel.is_set():
+                self._cancel_flag.set()
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(shm.name, len(self.df), self._cancel_flag)) as pool:
+                futures = [pool.submit(_run_batch, batch, self.initial_balance, self.trade_amount)
+                           for batch in self._batches()]
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # Record every batch that ran, including ones cut short by a cancel
+                        entries = [{"index": index, "params": params, "metrics": metrics}
+                                   for index, params, metrics in future.result()]
+                        with self._lock:
+                            self.results.extend(entries)
+                            self.completed += len(entries)
+                    if self._cancel.is_set():
+                        # Queued batches are dropped; running ones stop after their current combination
+                        pending = {future for future in pending if not future.cancel()}
+            self.status = "cancelled" if self._cancel.is_set() else "done"
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e)
+            print(f"Optimizer job {self.id} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    def ranked(self, top=None):
+        with self._lock:
+            ranked = sorted(self.results, key=_sort_key(self.metric))
+        return ranked[:top] if top else ranked
+
+    def progress(self, top=10):
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        completed = self.completed
+        return {
+            "job_id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "error": self.error,
+            "metric": self.metric,
+            "completed": completed,
+            "total": self.total,
+            "percent": round(completed / self.total * 100, 1) if self.total else 100.0,
+            "elapsed": round(elapsed, 2),
+            "eta": round(elapsed / completed * (self.total - completed), 1) if completed and self.status == "running" else None,
+            "candles": len(self.df),
+            "workers": self.max_workers,
+            "top": self.ranked(top)
+        }
+
+
+class Optimizer:
+    """Registry of running and finished optimization jobs"""
+    def __init__(self, max_jobs=20):
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, df, space, mode="grid", samples=100, metric="total_pnl", initial_balance=10000,
+              trade_amount=None, max_workers=None, seed=0, description=""):
+        if metric not in SUMMARY_KEYS or metric == "error":
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        if len(df) < 50:
+            raise ValueError("Insufficient data for optimization (need at least 50 candles)")
+
+        combinations = build_combinations(space, mode, samples, seed)
+        job = OptimizationJob(df, combinations, metric, initial_balance, trade_amount,
+                              max_workers, description)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job.start()
+
+    def start_for_symbol(self, symbol, years, space, **kwargs):
+        """Sweep over the same hourly history run_backtest uses"""
+        df = fetch_historical_data(symbol, '1h', years * 365 * 24)
+        return self.start(df, space, description=f"{symbol} 1h, {years} year(s)", **kwargs)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.status not in ("pending", "running")]
+        finished.sort(key=lambda job: job.finished_at or 0)
+        while len(self._jobs) >= self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0).id, None)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self):
+        return [{"job_id": job.id, "status": job.status, "completed": job.completed, "total": job.total,
+                 "description": job.description} for job in self._jobs.values()]
+
+
+_default_optimizer = None
+_default_lock = threading.Lock()
+
+def get_optimizer():
+    global _default_optimizer
+    with _default_lock:
+        if _default_optimizer is None:
+            _default_optimizer = Optimizer()
+        return _default_optimizer
@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+
+from backend.risk import TRADING_FEE_RATE
+
+logger = logging.getLogger(__name__)
+
+STARTING_BALANCE = float(os.getenv('PAPER_STARTING_BALANCE', 10000))
+SLIPPAGE_BPS = float(os.getenv('PAPER_SLIPPAGE_BPS', 5))
+FEE_RATE = float(os.getenv('PAPER_FEE_RATE', TRADING_FEE_RATE))
+# Largest notional a single opening order fills; the rest is cancelled (0 = no limit)
+MAX_FILL_NOTIONAL = float(os.getenv('PAPER_MAX_FILL_NOTIONAL', 0))
+# Seconds fills are batched before the account file is rewritten
+SAVE_DELAY = float(os.getenv('PAPER_SAVE_DELAY', 1.0))
+
+
+def split_symbol(symbol):
+    """'BTC/USDT' or 'BTC/USDT:USDT' -> ('BTC', 'USDT')"""
+    base, _, quote = symbol.partition('/')
+    return base, quote.split(':')[0] or 'USDT'
+
+
+class PaperAccount:
+    """
+    Local matching engine and per-currency ledger for paper trading.
+
+    Market orders fill at the caller's reference price (the last price the bot
+    already fetched) moved by slippage against the taker, and pay fee_rate on
+    the filled notional in the quote currency (the caller's fee_rate, else the
+    account's). Opening orders above max_fill_notional fill partially. Short
+    sales are allowed and show up as a negative base balance until bought
+    back. Balances and the last marks persist to a JSON file, written by a
+    background thread at most every save_delay seconds and on exit, so
+    holdings keep their value across restarts until fresh prices arrive.
+    """
+    def __init__(self, path=os.path.join('database', 'paper_account.json'), starting_balance=STARTING_BALANCE,
+                 slippage_bps=SLIPPAGE_BPS, fee_rate=FEE_RATE, max_fill_notional=MAX_FILL_NOTIONAL,
+                 save_delay=SAVE_DELAY):
+        self.path = path
+        self.starting_balance = starting_balance
+        self.slippage_bps = slippage_bps
+        self.fee_rate = fee_rate
+        self.max_fill_notional = max_fill_notional
+        self.save_delay = save_delay
+        self.balances = {'USDT': starting_balance}
+        self.fees_paid = 0.0
+        self.marks = {}  # 'BASE/QUOTE' -> last price seen
+        self._unpriced = set()  # currencies already warned about having no mark
+        self._order_count = 0
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._save_lock = threading.Lock()
+        self._saver = None
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.balances = {k: float(v) for k, v in state['balances'].items()}
+            self.starting_balance = float(state.get('starting_balance', self.starting_balance))
+            self.fees_paid = float(state.get('fees_paid', 0.0))
+            self._order_count = int(state.get('orders', 0))
+            self.marks = {k: float(v) for k, v in state.get('marks', {}).items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable paper account {self.path}: {e}")
+
+    def _save(self):
+        """Schedule a write of the current state (called with _lock held)"""
+        if not self.path:
+            return
+        self._dirty.set()
+        if self._saver is None:
+            self._saver = threading.Thread(target=self._save_loop, name="paper-account", daemon=True)
+            self._saver.start()
+            atexit.register(self.flush)
+
+    def _save_loop(self):
+        while True:
+            self._dirty.wait()
+            # Fills landing meanwhile go out in the same write
+            time.sleep(self.save_delay)
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to the account file now"""
+        with self._save_lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            with self._lock:
+                state = {'balances': dict(self.balances), 'starting_balance': self.starting_balance,
+                         'fees_paid': self.fees_paid, 'orders': self._order_count,
+                         'marks': dict(self.marks), 'updated_at': time.time()}
+            tmp_path = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"Could not write paper account {self.path}: {e}")
+
+    @staticmethod
+    def _mark_key(symbol):
+        # Spot and futures symbols of a pair value the same base balance
+        return '/'.join(split_symbol(symbol))
+
+    def mark(self, symbol, price):
+        """Latest price for symbol, used to value non-quote balances"""
+        self.marks[self._mark_key(symbol)] = float(price)
+
+    def execute(self, symbol, side, amount, price, allow_partial=True, fee_rate=None):
+        """Fill a market order against `price`; returns a ccxt-style order dict"""
+        if price is None or price <= 0:
+            raise ValueError(f"No reference price to fill {side} {symbol}")
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Unknown order side: {side}")
+
+        base, quote = split_symbol(symbol)
+        slip = self.slippage_bps / 10000
+        fill_price = price * (1 + slip) if side == 'buy' else price * (1 - slip)
+
+        filled = amount
+        if allow_partial and self.max_fill_notional > 0 and amount * fill_price > self.max_fill_notional:
+            filled = self.max_fill_notional / fill_price
+        cost = filled * fill_price
+        fee = cost * (self.fee_rate if fee_rate is None else fee_rate)
+
+        with self._lock:
+            sign = 1 if side == 'buy' else -1
+            self.balances[base] = self.balances.get(base, 0.0) + sign * filled
+            self.balances[quote] = self.balances.get(quote, 0.0) - sign * cost - fee
+            self.fees_paid += fee
+            self._order_count += 1
+            order_id = f'paper_{self._order_count}'
+            self.marks[self._mark_key(symbol)] = float(price)
+            self._save()
+
+        return {
+            'id': order_id,
+            'status': 'simulated',
+            'symbol': symbol,
+            'side': side,
+            'type': 'market',
+            'amount': amount,
+            'filled': filled,
+            'remaining': amount - filled,
+            'price': fill_price,
+            'average': fill_price,
+            'cost': cost,
+            'fee': {'cost': fee, 'currency': quote},
+            'timestamp': int(time.time() * 1000)
+        }
+
+    def balance(self, currency='USDT'):
+        with self._lock:
+            total = self.balances.get(currency, 0.0)
+        return {'free': total, 'used': 0.0, 'total': total}
+
+    def equity(self, quote='USDT'):
+        """Quote balance plus every other currency valued at its last mark (persisted, so never dropped)"""
+        with self._lock:
+            total = self.balances.get(quote, 0.0)
+            for currency, amount in self.balances.items():
+                if currency == quote or not amount:
+                    continue
+                price = self.marks.get(f"{currency}/{quote}")
+                if price is None:
+                    # Only accounts saved before marks were persisted lack one, until the next fetch
+                    if currency not in self._unpriced:
+                        self._unpriced.add(currency)
+                        logger.warning(f"No {currency}/{quote} price yet; {amount} {currency} left out of equity")
+                    continue
+                total += amount * price
+        return total
+
+    def reset(self, starting_balance=None):
+        with self._lock:
+            if starting_balance is not None:
+                self.starting_balance = float(starting_balance)
+            self.balances = {'USDT': self.starting_balance}
+            self.fees_paid = 0.0
+            self._order_count = 0
+            self._save()
+
+    def snapshot(self):
+        with self._lock:
+            balances = {k: v for k, v in self.balances.items() if v}
+            fees_paid, orders = self.fees_paid, self._order_count
+        return {
+            'balances': balances,
+            'equity': round(self.equity(), 2),
+            'starting_balance': self.starting_balance,
+            'fees_paid': round(fees_paid, 4),
+            'orders': orders,
+            'slippage_bps': self.slippage_bps,
+            'fee_rate': self.fee_rate,
+            'max_fill_notional': self.max_fill_notional or None
+        }
+
+
+_default_account = None
+_default_lock = threading.Lock()
+
+def get_paper_account():
+    global _default_account
+    with _default_lock:
+        if _default_account is None:
+            _default_account = PaperAccount()
+        return _default_account
@@ -0,0 +1,106 @@
+# Kept apart from bot_core so backtests can read the policies without pulling
+# in the live engine (exchange, database, events)
+from backend.risk import TRADING_FEE_RATE
+
+# What distinguishes the bot modes; everything else runs through TradingEngine.
+#   single_symbol       trades exactly one pair
+#   interval            seconds between ticks the API server schedules
+#   timeframe/limit     candles fetched per symbol each tick
+#   fast_signals        get_fast_strategy_signal instead of get_strategy_signal
+#   cooldown_seconds    per-pair wait after an entry
+#   max_open_positions / max_positions_per_symbol   entry caps (None = no cap)
+#   risk_multiplier, max_risk, min_risk_per_pair    risk % is scaled, capped,
+#                       split across the pairs, then floored per pair
+#   min_stop_loss / min_take_profit                 floors on the SL/TP %
+#   fee_rate            per-side fee charged in realized P&L
+#   kill_switch_max_loss  total P&L the loss streak must also be below (None = streak only)
+BOT_POLICIES = {
+    'single': {
+        'label': 'Single-Pair',
+        'single_symbol': True,
+        'interval': 10,
+        'timeframe': '1h',
+        'limit': 100,
+        'strategy_type': 'default_ma',
+        'fast_signals': False,
+        'cooldown_seconds': 300,
+        'max_open_positions': 3,
+        'max_positions_per_symbol': None,
+        'risk_multiplier': 1.0,
+        'max_risk': None,
+        'min_risk_per_pair': 0.0,
+        'min_stop_loss': 0.0,
+        'min_take_profit': 0.0,
+        'fee_rate': 0.0,
+        'kill_switch_threshold': 10,
+        'kill_switch_max_loss': None,
+    },
+    'multi_pair': {
+        'label': 'Multi-Pair',
+        'single_symbol': False,
+        'interval': 10,
+        'timeframe': '1h',
+        'limit': 100,
+        'strategy_type': 'default_ma',
+        'fast_signals': False,
+        'cooldown_seconds': 300,
+        'max_open_positions': None,
+        'max_positions_per_symbol': 2,
+        'risk_multiplier': 1.0,
+        'max_risk': None,
+        'min_risk_per_pair': 0.0,
+        'min_stop_loss': 0.0,
+        'min_take_profit': 0.0,
+        'fee_rate': 0.0,
+        'kill_switch_threshold': 10,
+        'kill_switch_max_loss': None,
+    },
+    'high_frequency': {
+        'label': 'High-Frequency',
+        'single_symbol': True,
+        'interval': 5,
+        'timeframe': '5m',
+        'limit': 50,
+        'strategy_type': 'aggressive_ema',
+        'fast_signals': True,
+        'cooldown_seconds': 30,
+        'max_open_positions': 3,
+        'max_positions_per_symbol': None,
+        'risk_multiplier': 1.5,
+        'max_risk': 3.0,
+        'min_risk_per_pair': 0.0,
+        'min_stop_loss': 1.5,
+        'min_take_profit': 2.0,
+        'fee_rate': TRADING_FEE_RATE,
+        'kill_switch_threshold': 15,
+        'kill_switch_max_loss': -100.0,
+    },
+    'super_aggressive': {
+        'label': 'Super Aggressive',
+        'single_symbol': False,
+        'interval': 15,
+        'timeframe': '5m',
+        'limit': 30,
+        'strategy_type': 'aggressive_ema',
+        'fast_signals': True,
+        'cooldown_seconds': 30,
+        'max_open_positions': None,
+        'max_positions_per_symbol': 2,
+        'risk_multiplier': 1.0,
+        'max_risk': None,
+        'min_risk_per_pair': 0.3,
+        'min_stop_loss': 1.5,
+        'min_take_profit': 2.0,
+        'fee_rate': TRADING_FEE_RATE,
+        'kill_switch_threshold': 20,
+        'kill_switch_max_loss': -200.0,
+    },
+}
+
+def get_policy(policy, **overrides):
+    """Policy dict by name (see BOT_POLICIES) or as given, with overrides applied"""
+    if isinstance(policy, str):
+        if policy not in BOT_POLICIES:
+            raise ValueError(f"Unknown bot policy: {policy}")
+        policy = BOT_POLICIES[policy]
+    return {**policy, **overrides}
@@ -0,0 +1,174 @@
+import numpy as np
+
+from backend.triggers import TriggerIndex
+
+
+class Position:
+    """
+    One open position. Slotted to keep hundreds of them small; still readable
+    like the dicts the bots used before (position['entry_price'], dict(position)).
+    """
+    FIELDS = ('trade_id', 'symbol', 'side', 'entry_price', 'position_size', 'usd_amount', 'timestamp')
+    __slots__ = FIELDS + ('slot',)
+
+    def __init__(self, trade_id, symbol, side, entry_price, position_size, usd_amount=None, timestamp=None):
+        self.trade_id = trade_id
+        self.symbol = symbol
+        self.side = side
+        self.entry_price = float(entry_price)
+        self.position_size = float(position_size)
+        self.usd_amount = usd_amount if usd_amount is not None else self.entry_price * self.position_size
+        self.timestamp = timestamp
+        self.slot = None
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self):
+        return (f"Position(#{self.trade_id} {self.side} {self.position_size:g} {self.symbol} "
+                f"@ {self.entry_price:g})")
+
+
+class PositionBook:
+    """
+    Open positions of one bot.
+
+    Positions are kept by trade id with a per-symbol index, so adding,
+    removing and per-symbol counts are O(1). Prices, sizes and sides also
+    live in preallocated NumPy columns (freed slots are reused), so the whole
+    book is marked to market in one vectorized pass. Stop/target levels go
+    into a TriggerIndex.
+    """
+    def __init__(self, capacity=64):
+        self._positions = {}
+        self._by_symbol = {}
+        self.triggers = TriggerIndex()
+
+        self._entry = np.zeros(capacity)
+        self._size = np.zeros(capacity)
+        self._sign = np.zeros(capacity)  # +1 long, -1 short, 0 free slot
+        self._code = np.zeros(capacity, dtype=np.int64)
+        self._free = list(range(capacity - 1, -1, -1))
+
+        self._codes = {}  # symbol -> column code
+        self._marks = np.full(8, np.nan)  # last price per symbol code
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(list(self._positions.values()))
+
+    def __contains__(self, trade_id):
+        return trade_id in self._positions
+
+    def get(self, trade_id):
+        return self._positions.get(trade_id)
+
+    def for_symbol(self, symbol):
+        return list(self._by_symbol.get(symbol, {}).values())
+
+    def count(self, symbol=None):
+        if symbol is None:
+            return len(self._positions)
+        return len(self._by_symbol.get(symbol, ()))
+
+    def symbols(self):
+        return list(self._by_symbol)
+
+    def _symbol_code(self, symbol):
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self._codes)
+            if code >= len(self._marks):
+                self._marks = np.concatenate((self._marks, np.full(len(self._marks), np.nan)))
+        return code
+
+    def _grow(self):
+        old = len(self._entry)
+        self._entry = np.concatenate((self._entry, np.zeros(old)))
+        self._size = np.concatenate((self._size, np.zeros(old)))
+        self._sign = np.concatenate((self._sign, np.zeros(old)))
+        self._code = np.concatenate((self._code, np.zeros(old, dtype=np.int64)))
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def add(self, position, stop_price=None, take_price=None):
+        """Track position; with stop/take prices its exits are indexed too"""
+        if position.trade_id in self._positions:
+            self.remove(position.trade_id)
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        position.slot = slot
+        self._entry[slot] = position.entry_price
+        self._size[slot] = position.position_size
+        self._sign[slot] = 1.0 if position.side == "buy" else -1.0
+        self._code[slot] = self._symbol_code(position.symbol)
+
+        self._positions[position.trade_id] = position
+        self._by_symbol.setdefault(position.symbol, {})[position.trade_id] = position
+        if stop_price is not None and take_price is not None:
+            self.triggers.add(position.trade_id, position.symbol, position.side, stop_price, take_price)
+        return position
+
+    def remove(self, trade_id):
+        position = self._positions.pop(trade_id, None)
+        if position is None:
+            return None
+        same_symbol = self._by_symbol[position.symbol]
+        del same_symbol[trade_id]
+        if not same_symbol:
+            del self._by_symbol[position.symbol]
+        self.triggers.remove(trade_id)
+
+        self._sign[position.slot] = 0.0
+        self._free.append(position.slot)
+        position.slot = None
+        return position
+
+    def mark(self, symbol, price):
+        self._marks[self._symbol_code(symbol)] = price
+
+    def crossed(self, symbol, price):
+        """Record price and return [(position, reason)] whose stop or target it reached"""
+        self.mark(symbol, price)
+        return [(self._positions[trade_id], reason) for trade_id, reason in self.triggers.crossed(symbol, price)]
+
+    def unrealized_pnl(self, prices=None, fee_rate=0.0):
+        """
+        Mark every open position in one pass; returns {'total', 'by_symbol'}.
+
+        Uses `prices` ({symbol: price}) where given, else the last price the
+        book saw. fee_rate charges entry and exit notional like the bots'
+        P&L. Symbols without any price yet are left out.
+        """
+        marks = self._marks.copy()
+        for symbol, price in (prices or {}).items():
+            if symbol in self._codes:
+                marks[self._codes[symbol]] = price
+
+        prices_by_slot = marks[self._code]
+        live = (self._sign != 0) & ~np.isnan(prices_by_slot)
+        pnl = np.where(
+            live,
+            self._sign * (prices_by_slot - self._entry) * self._size
+            - fee_rate * (self._entry + prices_by_slot) * self._size,
+            0.0
+        )
+        by_code = np.bincount(self._code, weights=pnl, minlength=len(self._codes))
+        return {
+            'total': float(pnl.sum()),
+            'by_symbol': {symbol: float(by_code[code]) for symbol, code in self._codes.items()
+                          if symbol in self._by_symbol}
+        }
@@ -0,0 +1,250 @@
+import json
+import time
+import hashlib
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import ccxt
+
+from backend.candle_store import get_candle_store
+from backend.metrics import LatencyMetrics
+
+
+class VirtualClock:
+    """Stand-in for the `time` module: time() only moves when the replay advances it"""
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0)
+
+    def advance(self, seconds):
+        self.now += seconds
+        return self.now
+
+    def __getattr__(self, name):
+        # monotonic(), perf_counter() and friends keep working for profiling code
+        return getattr(time, name)
+
+
+class ReplayInterface:
+    """
+    TradingInterface stand-in serving stored candles as of the virtual clock.
+
+    A candle becomes visible once it has closed (open time + timeframe <=
+    clock time), so the last close is the price a live bot would have seen at
+    that moment. Orders fill at that price; nothing touches the network.
+    """
+    def __init__(self, frames, clock, trading_mode="spot", leverage=1, exchange_name="replay"):
+        self.clock = clock
+        self.trading_mode = trading_mode
+        self.leverage = leverage
+        self.exchange_name = exchange_name
+        self.real_mode = False
+        self.orders = []
+        self.fetches = 0
+        self._last_prices = {}  # symbol -> last close served, what orders fill at
+
+        # (symbol, timeframe) -> (frame, close times in epoch seconds)
+        self._series = {}
+        for (symbol, timeframe), df in frames.items():
+            df = df.reset_index(drop=True)
+            opened = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64) / 1000.0
+            self._series[(symbol, timeframe)] = (df, opened + ccxt.Exchange.parse_timeframe(timeframe))
+
+    @classmethod
+    def from_candle_store(cls, symbols, timeframe, clock, start_ms=None, end_ms=None,
+                          exchange_name="binance", store=None, **kwargs):
+        """Replay candles already synced into the local candle store"""
+        store = store or get_candle_store()
+        frames = {(symbol, timeframe): store.read_frame(exchange_name, symbol, timeframe, start_ms, end_ms)
+                  for symbol in symbols}
+        empty = [symbol for (symbol, _), df in frames.items() if df.empty]
+        if empty:
+            raise ValueError(f"No stored {timeframe} candles for {', '.join(empty)}")
+        return cls(frames, clock, **kwargs)
+
+    def time_range(self, warmup=100):
+        """(first, last) clock times with `warmup` closed candles for every series"""
+        starts, ends = [], []
+        for df, closes in self._series.values():
+            starts.append(closes[min(warmup, len(closes)) - 1])
+            ends.append(closes[-1])
+        return max(starts), max(ends)
+
+    # -- TradingInterface API used by the bots ---------------------------------
+
+    def format_symbol_for_mode(self, symbol):
+        return symbol
+
+    def validate_symbol(self, symbol):
+        return any(key[0] == symbol for key in self._series)
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', limit=100, max_retries=3):
+        series = self._series.get((symbol, timeframe))
+        if series is None:
+            raise ValueError(f"No replay data for {symbol} {timeframe}")
+        df, closes = series
+        self.fetches += 1
+        end = int(closes.searchsorted(self.clock.time(), side='right'))
+        if end:
+            self._last_prices[symbol] = float(df['close'].iat[end - 1])
+        return df.iloc[max(end - limit, 0):end]
+
+    def fetch_ohlcv_batch(self, symbols, timeframe='1h', limit=100):
+        frames = {}
+        for symbol in dict.fromkeys(symbols):
+            try:
+                frames[symbol] = self.fetch_ohlcv(symbol, timeframe, limit)
+            except ValueError:
+                pass
+        return frames
+
+    def get_current_price(self, symbol):
+        prices = [self.fetch_ohlcv(symbol, timeframe, 1) for (s, timeframe) in self._series if s == symbol]
+        prices = [df for df in prices if not df.empty]
+        if not prices:
+            raise ValueError(f"No replay price for {symbol} yet")
+        return float(max(prices, key=lambda df: df['timestamp'].iloc[-1])['close'].iloc[-1])
+
+    def get_balance(self, currency="USDT"):
+        return {'free': 10000.0, 'used': 0.0, 'total': 10000.0}
+
+    def place_order(self, symbol, side, amount, price=None, params={}, fee_rate=None):
+        order = {
+            'status': 'simulated',
+            'symbol': symbol,
+            'side': side,
+            'amount': amount,
+            'price': price or self._last_prices.get(symbol) or self.get_current_price(symbol),
+            'id': f'replay_{len(self.orders) + 1}',
+            'timestamp': self.clock.time()
+        }
+        self.orders.append(order)
+        return order
+
+    def close_position(self, symbol, side, amount, fee_rate=None):
+        return self.place_order(symbol, "sell" if side == "buy" else "buy", amount)
+
+
+class ReplayRecorder:
+    """Receives what the bots would journal and publish during a replay"""
+    def __init__(self, clock, initial_balance=10000.0):
+        self.clock = clock
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.trades = []
+        self.events = Counter()
+
+    def journal_trade(self, symbol, side, size, price, sl, tp, status, pnl=0,
+                      trading_mode='spot', leverage=1, usd_amount=None, db_mode=None):
+        self.balance += pnl or 0
+        self.trades.append({
+            'time': self.clock.time(),
+            'symbol': symbol,
+            'side': side,
+            'size': size,
+            'price': price,
+            'pnl': pnl,
+            'status': status
+        })
+
+    def get_balance_db(self, mode=None):
+        return self.balance
+
+    def publish(self, event_type, data=None):
+        self.events[event_type] += 1
+
+    def digest(self):
+        """Stable fingerprint of the journaled trades, for regression checks"""
+        payload = json.dumps(self.trades, sort_keys=True, default=float).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+
+def _discard(*args, **kwargs):
+    pass
+
+
+@contextmanager
+def replay_context(bot, clock, recorder, metrics, quiet=True):
+    """
+    Point `bot` at the virtual clock, the recorder and `metrics` (a
+    LatencyMetrics) instead of real time, the trade database, the event bus
+    and the process-wide latency histograms; quiet also drops its log lines.
+    Only this bot's collaborators change (restored on exit), so replays can
+    run next to live bots and each other.
+    """
+    swapped = {
+        'clock': clock,
+        'journal_trade': recorder.journal_trade,
+        'get_balance_db': recorder.get_balance_db,
+        'publish': recorder.publish,
+        'metrics': metrics,
+    }
+    if quiet:
+        swapped['log'] = _discard
+    saved = {name: getattr(bot, name) for name in swapped}
+    try:
+        for name, value in swapped.items():
+            setattr(bot, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(bot, name, value)
+
+
+def replay(bot, interface, start=None, end=None, tick_seconds=None, max_ticks=None, warmup=100,
+           initial_balance=10000.0, quiet=True):
+    """
+    Drive bot.run_once() over the interface's candles on its virtual clock.
+
+    bot must have been built with `interface`. Ticks are spaced like the live
+    runtime schedules the bot (its policy's interval) unless tick_seconds is given.
+    Returns the journaled trades, event counts, throughput and the replay's
+    own stage latencies (keyed "stage" or "stage symbol").
+    """
+    clock = interface.clock
+    first, last = interface.time_range(warmup)
+    start = first if start is None else start
+    end = last if end is None else end
+    tick_seconds = tick_seconds or getattr(bot, 'policy', {}).get('interval', 10)
+
+    recorder = ReplayRecorder(clock, initial_balance)
+    metrics = LatencyMetrics()
+    label = type(bot).__name__
+    clock.now = float(start)
+    ticks = 0
+    started = time.perf_counter()
+    with replay_context(bot, clock, recorder, metrics, quiet):
+        while clock.now <= end and (max_ticks is None or ticks < max_ticks):
+            with metrics.tick(label):
+                bot.run_once()
+            ticks += 1
+            clock.advance(tick_seconds)
+    elapsed = time.perf_counter() - started
+
+    closed = [t for t in recorder.trades if t['side'].startswith('close_')]
+    return {
+        'bot': type(bot).__name__,
+        'ticks': ticks,
+        'tick_seconds': tick_seconds,
+        'start': start,
+        'end': min(clock.now - tick_seconds, end),
+        'elapsed': round(elapsed, 3),
+        'ticks_per_second': round(ticks / elapsed, 1) if elapsed > 0 else None,
+        'orders': len(interface.orders),
+        'closed_trades': len(closed),
+        'total_pnl': round(sum(t['pnl'] for t in closed), 2),
+        'final_balance': round(recorder.balance, 2),
+        'open_positions': len(getattr(bot, 'open_positions', [])),
+        'kill_switch_triggered': bool(getattr(bot, 'kill_switch_triggered', False)),
+        'events': dict(recorder.events),
+        'latency': {f"{stage} {symbol}" if symbol else stage: stats
+                    for (stage, _, symbol), stats in metrics.snapshot().items()},
+        'trades': recorder.trades,
+        'digest': recorder.digest(),
+    }
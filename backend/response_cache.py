@@ -0,0 +1,115 @@
+import time
+import threading
+from collections import OrderedDict
+
+import ccxt
+
+# Bounds for cache lifetimes derived from the candle interval (seconds)
+MIN_TTL = 1.0
+MAX_TTL = 60.0
+
+
+def ttl_for_timeframe(timeframe):
+    """A twentieth of the candle interval: 3s for 1m, 15s for 5m, capped at a minute"""
+    try:
+        seconds = ccxt.Exchange.parse_timeframe(timeframe)
+    except Exception:
+        return MIN_TTL
+    return min(max(seconds / 20.0, MIN_TTL), MAX_TTL)
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Small TTL cache for market-data responses with single-flight loading.
+
+    Concurrent misses on one key wait for the first caller's fetch instead of
+    each hitting the exchange. Failures are handed to the waiters but not cached.
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def get_or_load(self, key, ttl, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + ttl, flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                # Coalesced requests were served without their own exchange call
+                'hit_rate': round((self.hits + self.coalesced) / requests, 4) if requests else 0.0
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_response_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -84,3 +84,17 @@ def kelly_criterion_position_size(balance, win_rate, avg_win, avg_loss):
     safe_kelly = max(0, min(kelly_fraction * 0.25, 0.05))  # Max 5% of balance
 
     return balance * safe_kelly
+
+# Exchange fee per side (0.1%), as charged by the fast bot policies (see policies.BOT_POLICIES)
+TRADING_FEE_RATE = 0.001
+
+def calculate_net_pnl(entry_price, exit_price, side, position_size, fee_rate=TRADING_FEE_RATE):
+    """P&L of a round trip after paying fee_rate on both the entry and the exit notional"""
+    if side == "buy":
+        price_change = exit_price - entry_price
+    else:
+        price_change = entry_price - exit_price
+
+    gross_pnl = price_change * position_size
+    fee_cost = (entry_price + exit_price) * position_size * fee_rate
+    return gross_pnl - fee_cost
@@ -0,0 +1,434 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backend.backtest import BacktestEngine, fetch_historical_data, max_drawdown_percent
+from backend import optimizer
+from backend.optimizer import build_combinations, share_candles, SUMMARY_KEYS, BATCH_SIZE, MAX_COMBINATIONS
+
+MC_METHODS = ("bootstrap", "shuffle")
+PERCENTILES = (5, 25, 50, 75, 95)
+# Simulated trades (rows x trades) per Monte Carlo chunk, bounds memory per task
+CHUNK_CELLS = 2_000_000
+# Below this many simulated trades a process pool costs more than it saves
+PARALLEL_MIN_CELLS = 5_000_000
+MAX_SIMULATIONS = 100_000
+
+
+class RobustnessCancelled(Exception):
+    """Raised inside run_robustness when its cancel event is set"""
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo
+# ---------------------------------------------------------------------------
+
+def _simulate_chunk(pnl, initial_balance, count, method, seed, ruin_drawdown):
+    """count resampled equity curves in one 2-D pass: (max drawdown %, final balance, ruined)"""
+    rng = np.random.default_rng(seed)
+    n = len(pnl)
+    if method == "bootstrap":
+        paths = pnl[rng.integers(0, n, size=(count, n))]
+    else:
+        paths = pnl[rng.permuted(np.broadcast_to(np.arange(n), (count, n)), axis=1)]
+    equity = initial_balance + np.cumsum(paths, axis=1)
+    drawdowns = max_drawdown_percent(equity, initial_balance)
+    return drawdowns, equity[:, -1], drawdowns >= ruin_drawdown
+
+def _summarize(values, digits=2):
+    points = np.percentile(values, PERCENTILES)
+    summary = {f"p{p}": round(float(v), digits) for p, v in zip(PERCENTILES, points)}
+    summary["mean"] = round(float(values.mean()), digits)
+    return summary
+
+def monte_carlo(pnl, initial_balance=10000, simulations=1000, method="bootstrap", seed=0,
+                ruin_drawdown=50.0, max_workers=None):
+    """
+    Confidence intervals for drawdown and return from resampled trade sequences.
+
+    "shuffle" reorders the trades (same final balance, different paths);
+    "bootstrap" draws trades with replacement. P&L is taken in account
+    currency as the backtest realized it. Chunks get their own seeds from
+    one SeedSequence, so results do not depend on the number of workers.
+    """
+    if method not in MC_METHODS:
+        raise ValueError(f"Unknown Monte Carlo method: {method}")
+    if not 0 < simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    pnl = np.asarray(pnl, dtype=float)
+    if len(pnl) < 2:
+        raise ValueError("Need at least 2 trades for a Monte Carlo run")
+
+    rows = max(CHUNK_CELLS // len(pnl), 1)
+    counts = [min(rows, simulations - start) for start in range(0, simulations, rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    args = [(pnl, initial_balance, count, method, chunk_seed, ruin_drawdown)
+            for count, chunk_seed in zip(counts, seeds)]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(args))
+    started = time.time()
+    if max_workers > 1 and simulations * len(pnl) >= PARALLEL_MIN_CELLS:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        max_workers = 1
+        chunks = [_simulate_chunk(*chunk_args) for chunk_args in args]
+
+    drawdowns = np.concatenate([chunk[0] for chunk in chunks])
+    finals = np.concatenate([chunk[1] for chunk in chunks])
+    ruined = np.concatenate([chunk[2] for chunk in chunks])
+    returns = (finals - initial_balance) / initial_balance * 100
+
+    return {
+        "method": method,
+        "simulations": simulations,
+        "trades": len(pnl),
+        "seed": seed,
+        "max_drawdown": _summarize(drawdowns),
+        "return_percentage": _summarize(returns),
+        "final_balance": _summarize(finals),
+        "probability_of_loss": round(float((finals < initial_balance).mean() * 100), 2),
+        "ruin_drawdown": ruin_drawdown,
+        "probability_of_ruin": round(float(ruined.mean() * 100), 2),
+        "workers": max_workers,
+        "elapsed": round(time.time() - started, 3)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Walk-forward
+# ---------------------------------------------------------------------------
+
+def walk_forward_splits(length, train_bars, test_bars, step=None, anchored=False):
+    """
+    (train_start, train_end, test_start, test_end) windows over `length` bars.
+
+    Each test window directly follows its training window; windows roll by
+    `step` (default test_bars). Anchored splits keep the training start at 0.
+    """
+    step = step or test_bars
+    if train_bars < 50 or test_bars < 50:
+        raise ValueError("Training and test windows need at least 50 candles each")
+    splits = []
+    train_start = 0
+    while train_start + train_bars + test_bars <= length:
+        train_end = train_start + train_bars
+        splits.append((0 if anchored else train_start, train_end, train_end, train_end + test_bars))
+        train_start += step
+    if not splits:
+        raise ValueError(f"{length} candles are too few for a {train_bars}/{test_bars} walk-forward split")
+    return splits
+
+def _run_windows(tasks, initial_balance, trade_amount):
+    """Worker: backtest parameter sets on slices of the shared candles"""
+    frame = optimizer._worker_frame
+    results = []
+    for key, start, end, params in tasks:
+        try:
+            signals = optimizer._signals_for(params["strategy_type"], params["short"], params["long"])
+            engine = BacktestEngine(initial_balance)
+            report = engine.run_backtest(
+                frame.iloc[start:end], params["strategy_type"], params["risk"], params["stop_loss"],
+                params["take_profit"], trade_amount, short=params["short"], long=params["long"],
+                signals=signals[start:end]
+            )
+            pnl = [trade["pnl"] for trade in engine.trades]
+        except Exception as e:
+            report, pnl = {"error": str(e)}, []
+        results.append((key, {k: report[k] for k in SUMMARY_KEYS if k in report}, pnl))
+    return results
+
+def _batched(tasks):
+    # Windows sharing signal parameters go to the same worker, like optimizer sweeps
+    tasks = sorted(tasks, key=lambda task: (task[3]["strategy_type"], task[3]["short"], task[3]["long"]))
+    return [tasks[i:i + BATCH_SIZE] for i in range(0, len(tasks), BATCH_SIZE)]
+
+def walk_forward(df, space, train_bars, test_bars, step=None, anchored=False, metric="total_pnl",
+                 mode="grid", samples=100, seed=0, initial_balance=10000, trade_amount=None,
+                 max_workers=None, on_progress=None, cancel=None):
+    """
+    Rolling walk-forward analysis.
+
+    For every split the parameter space is backtested on the training window,
+    the best set by `metric` is then run on the following test window. Both
+    phases fan out over one process pool sharing the candles. Returns the
+    folds, the out-of-sample summary and the out-of-sample trade P&L in order.
+
+    on_progress(done, total) is called as backtests finish; setting the
+    `cancel` event stops the pool and raises RobustnessCancelled.
+    """
+    if metric not in SUMMARY_KEYS or metric == "error":
+        raise ValueError(f"Unknown ranking metric: {metric}")
+    df = df.reset_index(drop=True)
+    combinations = build_combinations(space, mode, samples, seed)
+    splits = walk_forward_splits(len(df), train_bars, test_bars, step, anchored)
+    if len(splits) * len(combinations) > MAX_COMBINATIONS:
+        raise ValueError(f"{len(splits)} folds x {len(combinations)} combinations exceeds {MAX_COMBINATIONS} backtests")
+
+    rank = optimizer._sort_key(metric)
+    max_workers = max_workers or os.cpu_count() or 1
+    started = time.time()
+    folds = [{"fold": k, "train": (train_start, train_end), "test": (test_start, test_end)}
+             for k, (train_start, train_end, test_start, test_end) in enumerate(splits)]
+    total = len(splits) * (len(combinations) + 1)
+    done = 0
+
+    shm = share_candles(df)
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                 initializer=optimizer._init_worker, initargs=(shm.name, len(df))) as pool:
+            def run_all(tasks):
+                nonlocal done
+                futures = [pool.submit(_run_windows, batch, initial_balance, trade_amount)
+                           for batch in _batched(tasks)]
+                results = []
+                for future in futures:
+                    if cancel is not None and cancel.is_set():
+                        pool.shutdown(wait=True, cancel_futures=True)
+                        raise RobustnessCancelled()
+                    batch = future.result()
+                    results.extend(batch)
+                    done += len(batch)
+                    if on_progress is not None:
+                        on_progress(done, total)
+                return results
+
+            # In-sample: every combination on every training window
+            in_sample = {}
+            tasks = [((k, c), train_start, train_end, params)
+                     for k, (train_start, train_end, _, _) in enumerate(splits)
+                     for c, params in enumerate(combinations)]
+            for (k, c), metrics, _ in run_all(tasks):
+                in_sample.setdefault(k, []).append({"params": combinations[c], "metrics": metrics})
+
+            # Out-of-sample: the fold's winner on the unseen window that follows
+            tasks = []
+            for fold in folds:
+                best = sorted(in_sample[fold["fold"]], key=rank)[0]
+                fold["params"] = best["params"]
+                fold["in_sample"] = best["metrics"]
+                tasks.append((fold["fold"], fold["test"][0], fold["test"][1], best["params"]))
+            for k, metrics, pnl in run_all(tasks):
+                folds[k]["out_of_sample"] = metrics
+                folds[k]["pnl"] = pnl
+    finally:
+        shm.close()
+        shm.unlink()
+
+    oos_pnl = [p for fold in folds for p in fold.pop("pnl")]
+    timestamps = df["timestamp"]
+    for fold in folds:
+        fold["test_period"] = (str(timestamps.iloc[fold["test"][0]]), str(timestamps.iloc[fold["test"][1] - 1]))
+
+    # Walk-forward efficiency: how much of the in-sample return survives out of sample
+    is_returns = np.array([fold["in_sample"].get("return_percentage", 0.0) for fold in folds], dtype=float)
+    oos_returns = np.array([fold["out_of_sample"].get("return_percentage", 0.0) for fold in folds], dtype=float)
+    efficiency = float(oos_returns.mean() / is_returns.mean()) if is_returns.mean() > 0 else None
+    equity = initial_balance + np.cumsum(oos_pnl)
+
+    return {
+        "metric": metric,
+        "folds": folds,
+        "combinations": len(combinations),
+        "summary": {
+            "folds": len(folds),
+            "profitable_folds": int((oos_returns > 0).sum()),
+            "out_of_sample_trades": len(oos_pnl),
+            "out_of_sample_pnl": round(float(np.sum(oos_pnl)), 2),
+            "out_of_sample_max_drawdown": round(float(max_drawdown_percent(equity, initial_balance)), 2),
+            "mean_in_sample_return": round(float(is_returns.mean()), 2),
+            "mean_out_of_sample_return": round(float(oos_returns.mean()), 2),
+            "efficiency": round(efficiency, 3) if efficiency is not None else None
+        },
+        "oos_pnl": oos_pnl,
+        "workers": max_workers,
+        "elapsed": round(time.time() - started, 2)
+    }
+
+
+def run_robustness(symbol, years, risk, stop_loss, take_profit, space=None, train_bars=None,
+                   test_bars=None, simulations=1000, method="bootstrap", metric="total_pnl",
+                   seed=0, max_workers=None, on_progress=None, cancel=None):
+    """
+    Check a run_backtest configuration: Monte Carlo on its trades and a
+    walk-forward over the same hourly history. Without a space the walk-forward
+    just re-runs the given configuration on each fold.
+
+    on_progress(stage, done, total) reports each phase; the `cancel` event is
+    checked between phases and during the walk-forward.
+    """
+    def enter(stage, done=0, total=1):
+        if cancel is not None and cancel.is_set():
+            raise RobustnessCancelled()
+        if on_progress is not None:
+            on_progress(stage, done, total)
+
+    enter("fetch")
+    df = fetch_historical_data(symbol, '1h', years * 365 * 24)
+    config = {"risk": risk, "stop_loss": stop_loss, "take_profit": take_profit}
+
+    enter("backtest")
+    engine = BacktestEngine()
+    backtest = engine.run_backtest(df, "default_ma", risk, stop_loss, take_profit)
+    if "error" in backtest:
+        return {"error": backtest["error"]}
+    pnl = [trade["pnl"] for trade in engine.trades]
+
+    enter("monte_carlo")
+    mc = monte_carlo(pnl, engine.initial_balance, simulations, method, seed, max_workers=max_workers)
+
+    # Default: 6 folds, training on three times the test window
+    test_bars = test_bars or max(len(df) // 9, 50)
+    train_bars = train_bars or 3 * test_bars
+    enter("walk_forward", 0, 0)
+    forward = walk_forward(df, {**config, **(space or {})}, train_bars, test_bars, metric=metric,
+                           seed=seed, initial_balance=engine.initial_balance, max_workers=max_workers,
+                           on_progress=lambda done, total: enter("walk_forward", done, total), cancel=cancel)
+    oos_pnl = forward.pop("oos_pnl")
+
+    enter("walk_forward_monte_carlo")
+    return {
+        "success": True,
+        "symbol": symbol,
+        "config": config,
+        "backtest": {k: backtest[k] for k in SUMMARY_KEYS if k in backtest},
+        "monte_carlo": mc,
+        "walk_forward": forward,
+        "walk_forward_monte_carlo": monte_carlo(oos_pnl, engine.initial_balance, simulations, method, seed,
+                                                max_workers=max_workers) if len(oos_pnl) >= 2 else None,
+        "data_points": len(df)
+    }
+
+
+class RobustnessJob:
+    """One run_robustness call on a background thread, tracked like an OptimizationJob"""
+    def __init__(self, symbol, years, risk, stop_loss, take_profit, **options):
+        self.id = uuid.uuid4().hex[:12]
+        self.args = (symbol, years, risk, stop_loss, take_profit)
+        self.options = options
+        self.description = f"{symbol} 1h, {years} year(s)"
+
+        self.status = "pending"
+        self.error = None
+        self.result = None
+        self.stage = None
+        self.completed = 0
+        self.total = 0
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"robustness-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status
+
+    def _progress(self, stage, completed, total):
+        self.stage, self.completed, self.total = stage, completed, total
+
+    def _run(self):
+        try:
+            result = run_robustness(*self.args, on_progress=self._progress, cancel=self._cancel, **self.options)
+            if "error" in result:
+                self.status = "error"
+                self.error = result["error"]
+            else:
+                self.result = result
+                self.status = "done"
+        except RobustnessCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e)
+            print(f"Robustness job {self.id} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+
+    def progress(self):
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "error": self.error,
+            "stage": self.stage,
+            "completed": self.completed,
+            "total": self.total,
+            "percent": round(self.completed / self.total * 100, 1) if self.total else None,
+            "elapsed": round(elapsed, 2),
+            "result": self.result
+        }
+
+
+class Robustness:
+    """Registry of running and finished robustness jobs"""
+    def __init__(self, max_jobs=20):
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, symbol, years, risk, stop_loss, take_profit, simulations=1000, method="bootstrap",
+              metric="total_pnl", **options):
+        # Reject bad input here rather than minutes into the job
+        if metric not in SUMMARY_KEYS or metric == "error":
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        if method not in MC_METHODS:
+            raise ValueError(f"Unknown Monte Carlo method: {method}")
+        if not 0 < simulations <= MAX_SIMULATIONS:
+            raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+
+        job = RobustnessJob(symbol, years, risk, stop_loss, take_profit, simulations=simulations,
+                            method=method, metric=metric, **options)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job.start()
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.status not in ("pending", "running")]
+        finished.sort(key=lambda job: job.finished_at or 0)
+        while len(self._jobs) >= self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0).id, None)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self):
+        return [{"job_id": job.id, "status": job.status, "stage": job.stage, "description": job.description}
+                for job in self._jobs.values()]
+
+
+_default_robustness = None
+_default_lock = threading.Lock()
+
+def get_robustness():
+    global _default_robustness
+    with _default_lock:
+        if _default_robustness is None:
+            _default_robustness = Robustness()
+        return _default_robustness
@@ -0,0 +1,327 @@
+import copy
+import asyncio
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import ccxt.async_support as ccxt_async
+
+from backend.exchange import ohlcv_to_frame
+from backend.events import publish
+from backend.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMarketFeed:
+    """
+    Concurrent OHLCV fetching on ccxt's asyncio clients, one per exchange,
+    trading mode, sandbox/live network and account.
+
+    Shared by every bot on the runtime: a request already in flight for the
+    same network, symbol and timeframe is joined rather than repeated, and a frame
+    fetched within max_age seconds serves any request for as many candles or
+    fewer (the tail of it). Bots on overlapping symbols thus cost one fetch.
+    """
+    def __init__(self, max_concurrency=16, max_age=2.0):
+        self.max_age = max_age
+        self._clients = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._recent = {}    # (exchange, mode, sandbox, symbol, timeframe) -> (fetched_at, limit, df)
+        self._inflight = {}  # same key -> (limit, task)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _client(self, iface):
+        key = (iface.exchange_name, iface.trading_mode, iface.sandbox, iface.exchange_params.get('apiKey'))
+        if key not in self._clients:
+            # Same sandbox flag, credentials and options as the sync interface
+            client = getattr(ccxt_async, iface.exchange_name)(copy.deepcopy(iface.exchange_params))
+            # Reuse the markets the sync interface already has (cached or loaded)
+            client.set_markets(iface.markets, iface.currencies)
+            self._clients[key] = client
+        return self._clients[key]
+
+    async def _download(self, iface, symbol, timeframe, limit):
+        client = self._client(iface)
+        async with self._semaphore:
+            bars = await client.fetch_ohlcv(iface.format_symbol_for_mode(symbol), timeframe=timeframe, limit=limit)
+        if not bars:
+            raise ValueError(f"No data returned for {symbol}")
+        return ohlcv_to_frame(bars)
+
+    def _landed(self, key, limit, task):
+        if self._inflight.get(key, (None, None))[1] is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        cached = self._recent.get(key)
+        # Keep the longer of two fresh frames so it can serve both requests
+        if cached is None or cached[1] <= limit or time.monotonic() - cached[0] > self.max_age:
+            self._recent[key] = (time.monotonic(), limit, task.result())
+
+    async def fetch(self, iface, symbol, timeframe, limit):
+        key = (iface.exchange_name, iface.trading_mode, iface.sandbox, symbol, timeframe)
+        cached = self._recent.get(key)
+        if cached is not None and cached[1] >= limit and time.monotonic() - cached[0] <= self.max_age:
+            self.hits += 1
+            return cached[2].iloc[-limit:]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] >= limit:
+            self.coalesced += 1
+            task = inflight[1]
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._download(iface, symbol, timeframe, limit))
+            task.add_done_callback(lambda t: self._landed(key, limit, t))
+            self._inflight[key] = (limit, task)
+        # Shielded so a bot stopping mid-fetch doesn't cancel it for the others
+        df = await asyncio.shield(task)
+        return df.iloc[-limit:]
+
+    def stats(self):
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            'requests': requests,
+            'fetches': self.misses,
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'shared_ratio': round((self.hits + self.coalesced) / requests, 3) if requests else 0.0,
+            'clients': len(self._clients),
+            'max_age': self.max_age
+        }
+
+    async def fetch_many(self, iface, requests):
+        """{(symbol, timeframe, limit): df} for all requests, fetched concurrently; failures left out"""
+        unique = list(dict.fromkeys(requests))
+        results = await asyncio.gather(*(self.fetch(iface, *r) for r in unique), return_exceptions=True)
+        frames = {}
+        for request, result in zip(unique, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Async fetch failed for {request}: {result}")
+            else:
+                frames[request] = result
+        return frames
+
+    async def close(self):
+        for client in self._clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing async exchange client: {e}")
+        self._clients.clear()
+
+
+class PrefetchedInterface:
+    """TradingInterface stand-in serving candles fetched for the current tick"""
+    def __init__(self, iface, frames):
+        self.iface = iface
+        self.frames = frames
+        # Prefetched closes are the latest prices the bot sees (paper fills use them)
+        remember = getattr(iface, 'remember_price', None)
+        if remember is not None:
+            for (symbol, _, _), df in frames.items():
+                remember(symbol, df)
+
+    def __getattr__(self, name):
+        return getattr(self.iface, name)
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', limit=100, max_retries=3):
+        df = self.frames.get((symbol, timeframe, limit))
+        if df is not None:
+            return df
+        return self.iface.fetch_ohlcv(symbol, timeframe, limit, max_retries)
+
+    def fetch_ohlcv_batch(self, symbols, timeframe='1h', limit=100):
+        frames = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            df = self.frames.get((symbol, timeframe, limit))
+            if df is not None:
+                frames[symbol] = df
+            else:
+                missing.append(symbol)
+        if missing:
+            frames.update(self.iface.fetch_ohlcv_batch(missing, timeframe, limit))
+        return frames
+
+
+class BotRuntime:
+    """
+    Hosts any number of bots on one asyncio loop (running on its own thread).
+
+    Each bot is a task on a fixed-rate timer: its candles are fetched
+    concurrently with ccxt.async_support, then the unchanged synchronous
+    run_once runs on a worker thread against those prefetched frames.
+    """
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.loop = None
+        self.feed = None
+        self._thread = None
+        self._executor = None
+        self._bots = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self.loop is not None and self._thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bot-tick")
+            self._thread = threading.Thread(target=self.loop.run_forever, name="bot-runtime", daemon=True)
+            self._thread.start()
+            self._call(self._create_feed())
+
+    async def _create_feed(self):
+        # Semaphore must be created on the runtime loop
+        self.feed = AsyncMarketFeed()
+
+    def _call(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _run_tick(self, bot_id, bot, frames):
+        """run_once against the prefetched frames; returns its spans' time per stage"""
+        original = bot.iface
+        bot.iface = PrefetchedInterface(original, frames)
+        try:
+            with get_metrics().tick(bot_id) as stages:
+                bot.run_once()
+        finally:
+            bot.iface = original
+        return stages
+
+    async def _run_bot(self, bot_id, bot, interval, on_stop):
+        entry = self._bots[bot_id]
+        loop = asyncio.get_running_loop()
+        metrics = get_metrics()
+        # First tick runs now; later ones land on the interval grid, so bots with
+        # commensurate intervals tick together and share the feed's fetches
+        next_tick = loop.time() // interval * interval
+        try:
+            while True:
+                started = loop.time()
+                stages = {}
+                try:
+                    frames = await self.feed.fetch_many(bot.iface, bot.market_data_requests())
+                    stages['prefetch'] = loop.time() - started
+                    metrics.observe('prefetch', stages['prefetch'], bot=bot_id)
+                    tick = loop.run_in_executor(self._executor, self._run_tick, bot_id, bot, frames)
+                    try:
+                        stages.update(await asyncio.shield(tick))
+                    except asyncio.CancelledError:
+                        # Let an in-flight run_once finish so positions/DB stay consistent
+                        await tick
+                        raise
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Bot {bot_id} tick error: {e}")
+
+                entry['ticks'] += 1
+                entry['last_tick'] = time.time()
+                entry['last_tick_duration'] = loop.time() - started
+                metrics.observe('tick', entry['last_tick_duration'], bot=bot_id)
+                metrics.check_slow_tick(bot_id, entry['last_tick_duration'], stages)
+
+                if bot.is_kill_switch_active():
+                    print(f"Kill switch triggered - stopping bot {bot_id}")
+                    break
+
+                # Fixed-rate schedule: sleep to the next slot, skipping slots we overran
+                next_tick += interval
+                now = loop.time()
+                if next_tick <= now:
+                    missed = int((now - next_tick) // interval) + 1
+                    entry['overruns'] += missed
+                    next_tick += missed * interval
+                await asyncio.sleep(next_tick - now)
+        finally:
+            entry['running'] = False
+            publish('bot_status', {'bot_id': bot_id, 'running': False, 'kill_switch_active': bot.is_kill_switch_active()})
+            if on_stop:
+                try:
+                    on_stop(bot_id)
+                except Exception as e:
+                    print(f"Bot {bot_id} stop callback error: {e}")
+
+    async def _start(self, bot_id, bot, interval, on_stop):
+        self._bots[bot_id] = {
+            'bot': bot,
+            'interval': interval,
+            'running': True,
+            'ticks': 0,
+            'overruns': 0,
+            'last_tick': None,
+            'last_tick_duration': None,
+            'task': None
+        }
+        self._bots[bot_id]['task'] = asyncio.create_task(self._run_bot(bot_id, bot, interval, on_stop))
+        publish('bot_status', {'bot_id': bot_id, 'running': True, 'kill_switch_active': bot.is_kill_switch_active()})
+
+    async def _stop(self, bot_id):
+        entry = self._bots.get(bot_id)
+        if entry is None:
+            return False
+        entry['task'].cancel()
+        await asyncio.gather(entry['task'], return_exceptions=True)
+        return True
+
+    def start_bot(self, bot_id, bot, interval, on_stop=None):
+        """Schedule bot.run_once every `interval` seconds under bot_id"""
+        if self.is_running(bot_id):
+            raise ValueError(f"Bot {bot_id} is already running")
+        self._ensure_loop()
+        self._call(self._start(bot_id, bot, interval, on_stop))
+
+    def stop_bot(self, bot_id, timeout=60):
+        """Cancel a bot and wait for its current tick to finish"""
+        if self.loop is None:
+            return False
+        return self._call(self._stop(bot_id), timeout)
+
+    def remove_bot(self, bot_id, timeout=60):
+        """Stop bot_id if it is running and forget it"""
+        self.stop_bot(bot_id, timeout)
+        return self._bots.pop(bot_id, None) is not None
+
+    def is_running(self, bot_id):
+        entry = self._bots.get(bot_id)
+        return bool(entry and entry['running'])
+
+    def running_bot_ids(self):
+        return [bot_id for bot_id, entry in list(self._bots.items()) if entry['running']]
+
+    def get_bot(self, bot_id):
+        entry = self._bots.get(bot_id)
+        return entry['bot'] if entry else None
+
+    def status(self, bot_id):
+        entry = self._bots.get(bot_id)
+        if entry is None:
+            return None
+        return {k: v for k, v in entry.items() if k not in ('bot', 'task')}
+
+    def bot_ids(self):
+        return list(self._bots)
+
+    def feed_stats(self):
+        return self.feed.stats() if self.feed is not None else None
+
+    async def _shutdown(self):
+        for bot_id in list(self._bots):
+            await self._stop(bot_id)
+        await self.feed.close()
+
+    def shutdown(self, timeout=60):
+        """Stop every bot, close async exchange clients and the loop"""
+        if self.loop is None:
+            return
+        self._call(self._shutdown(), timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self.loop = None
@@ -8,6 +8,10 @@ def check_volatility_filter(df, max_volatility_percent=5.0, min_volatility_perce
 
     current_price = df['close'].iloc[-1]
     prev_price = df['close'].iloc[-2]
+    return volatility_in_range(current_price, prev_price, max_volatility_percent, min_volatility_percent)
+
+def volatility_in_range(current_price, prev_price, max_volatility_percent=5.0, min_volatility_percent=0.5):
+    """Volatility filter on the last candle-to-candle price change"""
     price_change_percent = abs((current_price - prev_price) / prev_price * 100)
 
     # Avoid both extreme volatility and dead markets
@@ -55,11 +59,15 @@ def check_trend_strength(df, period=20):
     lows = df['low'].rolling(period).min()
     current_price = df['close'].iloc[-1]
 
+    return classify_trend(current_price, highs.iloc[-1], lows.iloc[-1])
+
+def classify_trend(current_price, recent_high, recent_low):
+    """Classify trend from the current price and the recent high/low range"""
     # Strong uptrend: price in upper 25% of recent range
-    if current_price >= highs.iloc[-1] * 0.98:
+    if current_price >= recent_high * 0.98:
         return "strong_up"
     # Strong downtrend: price in lower 25% of recent range
-    elif current_price <= lows.iloc[-1] * 1.02:
+    elif current_price <= recent_low * 1.02:
         return "strong_down"
     else:
         return "neutral"
@@ -91,8 +99,17 @@ def advanced_ma_strategy(df, short=9, long=21):
     macd_hist_curr = df['macd_hist'].iloc[-1]
 
     current_price = df['close'].iloc[-1]
-    trend_strength = check_trend_strength(df)
 
+    return ma_crossover_decision(
+        ma_short_curr, ma_short_prev, ma_long_curr, ma_long_prev,
+        rsi_curr, macd_curr, macd_signal_curr, macd_hist_curr,
+        current_price, check_volume_confirmation(df)
+    )
+
+def ma_crossover_decision(ma_short_curr, ma_short_prev, ma_long_curr, ma_long_prev,
+                          rsi_curr, macd_curr, macd_signal_curr, macd_hist_curr,
+                          current_price, volume_confirmed):
+    """Buy/sell/hold decision of the enhanced MA strategy from indicator values"""
     # MA Crossover Detection
     bullish_cross = (ma_short_prev <= ma_long_prev and ma_short_curr > ma_long_curr)
     bearish_cross = (ma_short_prev >= ma_long_prev and ma_short_curr < ma_long_curr)
@@ -114,7 +131,7 @@ def advanced_ma_strategy(df, short=9, long=21):
             buy_confirmations += 1
 
         # 4. Volume confirmation
-        if check_volume_confirmation(df):
+        if volume_confirmed:
             buy_confirmations += 1
 
         # Need at least 3 out of 4 confirmations
@@ -138,7 +155,7 @@ def advanced_ma_strategy(df, short=9, long=21):
             sell_confirmations += 1
 
         # 4. Volume confirmation
-        if check_volume_confirmation(df):
+        if volume_confirmed:
             sell_confirmations += 1
 
         # Need at least 3 out of 4 confirmations
@@ -178,6 +195,14 @@ def aggressive_scalping_strategy(df):
     # Price momentum (last 3 candles trend)
     price_momentum = (df['close'].iloc[-1] - df['close'].iloc[-4]) / df['close'].iloc[-4] * 100
 
+    return scalping_decision(
+        ema_fast_curr, ema_fast_prev, ema_slow_curr, ema_slow_prev,
+        rsi_curr, current_price, price_momentum
+    )
+
+def scalping_decision(ema_fast_curr, ema_fast_prev, ema_slow_curr, ema_slow_prev,
+                      rsi_curr, current_price, price_momentum):
+    """Buy/sell/hold decision of the aggressive scalping strategy from indicator values"""
     # BULLISH: Fast EMA crosses above slow EMA
     bullish_cross = (ema_fast_prev <= ema_slow_prev and ema_fast_curr > ema_slow_curr)
 
@@ -244,18 +269,24 @@ def momentum_breakout_strategy(df):
     bb_lower = df['bb_lower'].iloc[-1]
     rsi = df['rsi'].iloc[-1]
 
+    return bollinger_breakout_decision(
+        current_price, sma_20, bb_upper, bb_lower, rsi, check_volume_confirmation(df)
+    )
+
+def bollinger_breakout_decision(current_price, sma_20, bb_upper, bb_lower, rsi, volume_confirmed):
+    """Buy/sell/hold decision of the momentum (Bollinger) breakout strategy"""
     # Bullish breakout: Price breaks above BB upper with strong RSI
     if (current_price > bb_upper and
         current_price > sma_20 and
         rsi > 60 and rsi < 80 and
-        check_volume_confirmation(df)):
+        volume_confirmed):
         return "buy"
 
     # Bearish breakdown: Price breaks below BB lower with weak RSI
     if (current_price < bb_lower and
         current_price < sma_20 and
         rsi < 40 and rsi > 20 and
-        check_volume_confirmation(df)):
+        volume_confirmed):
         return "sell"
 
     return "hold"
@@ -281,6 +312,10 @@ def momentum_breakout_fast(df):
     current_volume = df['volume'].iloc[-1]
     volume_spike = current_volume > avg_volume * 1.2
 
+    return range_breakout_decision(current_price, prev_price, recent_high, recent_low, volume_spike)
+
+def range_breakout_decision(current_price, prev_price, recent_high, recent_low, volume_spike):
+    """Buy/sell/hold decision of the fast range breakout strategy"""
     # BREAKOUT BUY: Price breaks above recent high with volume
     if current_price > recent_high and prev_price <= recent_high:
         if volume_spike or current_price > recent_high * 1.002:  # 0.2% breakout
@@ -301,8 +336,74 @@ def moving_average_crossover(df, short=9, long=21):
     """Original MA crossover but enhanced"""
     return advanced_ma_strategy(df, short, long)
 
-def get_strategy_signal(df, strategy_type="default_ma", short=9, long=21, enable_volatility_filter=True):
-    """Main strategy dispatcher with enhanced filters"""
+def check_volume_levels(bars, current_volume, avg_volume, volume_sma_period=20):
+    """Volume confirmation from precomputed values (see check_volume_confirmation)"""
+    if bars < volume_sma_period:
+        return True
+    return current_volume >= (avg_volume * 0.8)
+
+def strategy_signal_from_indicators(ind, strategy_type="default_ma"):
+    """Run a strategy on IndicatorEngine.values() instead of a full DataFrame"""
+    bars = ind['bars']
+
+    if strategy_type == "momentum":
+        if bars < 30:
+            return "hold"
+        return bollinger_breakout_decision(
+            ind['close'], ind['sma_20'], ind['bb_upper'], ind['bb_lower'], ind['rsi_14'],
+            check_volume_levels(bars, ind['volume'], ind['volume_avg_20'])
+        )
+    elif strategy_type == "aggressive_ema":
+        if bars < 20:
+            return "hold"
+        price_momentum = (ind['close'] - ind['close_4']) / ind['close_4'] * 100
+        return scalping_decision(
+            ind['ema_fast'], ind['ema_fast_prev'], ind['ema_slow'], ind['ema_slow_prev'],
+            ind['rsi_7'], ind['close'], price_momentum
+        )
+    elif strategy_type == "breakout":
+        if bars < 10:
+            return "hold"
+        volume_spike = ind['volume'] > ind['volume_avg_10'] * 1.2
+        return range_breakout_decision(
+            ind['close'], ind['close_prev'], ind['high_8'], ind['low_8'], volume_spike
+        )
+    else:
+        # custom / default_ma both run the enhanced MA strategy
+        if bars < max(ind['long'] + 5, 26):
+            return "hold"
+        return ma_crossover_decision(
+            ind['ma_short'], ind['ma_short_prev'], ind['ma_long'], ind['ma_long_prev'],
+            ind['rsi_14'], ind['macd'], ind['macd_signal'], ind['macd_hist'],
+            ind['close'], check_volume_levels(bars, ind['volume'], ind['volume_avg_20'])
+        )
+
+def _indicator_values(indicators, short, long):
+    if (indicators.short, indicators.long) != (short, long):
+        raise ValueError(f"IndicatorEngine built for MA {indicators.short}/{indicators.long}, "
+                         f"strategy asked for {short}/{long}")
+    ind = indicators.values()
+    ind['long'] = long
+    return ind
+
+def get_strategy_signal(df, strategy_type="default_ma", short=9, long=21, enable_volatility_filter=True,
+                        indicators=None):
+    """Main strategy dispatcher with enhanced filters
+
+    Pass an up-to-date IndicatorEngine as ``indicators`` to skip recomputing
+    every indicator from ``df`` (df is then not read at all).
+    """
+    if indicators is not None:
+        ind = _indicator_values(indicators, short, long)
+
+        if enable_volatility_filter and ind['bars'] >= 2:
+            if not volatility_in_range(ind['close'], ind['close_prev']):
+                return "hold"
+
+        signal = strategy_signal_from_indicators(ind, strategy_type)
+        if signal != "hold" and ind['bars'] >= 20:
+            signal = apply_trend_filter(signal, classify_trend(ind['close'], ind['high_20'], ind['low_20']))
+        return signal
 
     # Apply volatility filter first
     if enable_volatility_filter and not check_volatility_filter(df):
@@ -322,25 +423,164 @@ def get_strategy_signal(df, strategy_type="default_ma", short=9, long=21, enable
 
     # Final trend filter - avoid counter-trend trades in strong markets
     if signal != "hold":
-        trend = check_trend_strength(df)
+        signal = apply_trend_filter(signal, check_trend_strength(df))
 
-        # Don't short in strong uptrend, don't buy in strong downtrend
-        if signal == "sell" and trend == "strong_up":
-            return "hold"
-        elif signal == "buy" and trend == "strong_down":
-            return "hold"
+    return signal
 
+def apply_trend_filter(signal, trend):
+    """Don't short in strong uptrend, don't buy in strong downtrend"""
+    if signal == "sell" and trend == "strong_up":
+        return "hold"
+    elif signal == "buy" and trend == "strong_down":
+        return "hold"
     return signal
 
 # NEW FAST STRATEGY FUNCTIONS FOR HIGH-FREQUENCY TRADING
 
-def get_fast_strategy_signal(df, strategy_type="aggressive_ema"):
+def get_fast_strategy_signal(df, strategy_type="aggressive_ema", indicators=None):
     """
     FAST STRATEGY DISPATCHER FOR HIGH-FREQUENCY TRADING
     No volatility filters, no trend filters - pure aggression
     """
+    if indicators is not None:
+        ind = _indicator_values(indicators, indicators.short, indicators.long)
+        fast_type = "breakout" if strategy_type == "breakout" else "aggressive_ema"
+        return strategy_signal_from_indicators(ind, fast_type)
 
     if strategy_type == "breakout":
         return momentum_breakout_fast(df)
     else:
         return aggressive_scalping_strategy(df)
+
+# VECTORIZED WHOLE-SERIES SIGNALS (BACKTESTING)
+
+def _crossover_votes(prev_fast, prev_slow, curr_fast, curr_slow):
+    """Vectorized bullish/bearish crossover masks (bearish only where not bullish, like the elif)"""
+    bullish = (prev_fast <= prev_slow) & (curr_fast > curr_slow)
+    bearish = ~bullish & (prev_fast >= prev_slow) & (curr_fast < curr_slow)
+    return bullish, bearish
+
+def _previous(values):
+    """values shifted one bar back (NaN for the first bar)"""
+    return np.concatenate(([np.nan], values[:-1]))
+
+def _volume_confirmation_series(df, bars, volume_sma_period=20):
+    volume = df['volume'].to_numpy(dtype=float)
+    avg_volume = df['volume'].rolling(volume_sma_period).mean().to_numpy()
+    return (bars < volume_sma_period) | (volume >= avg_volume * 0.8)
+
+def _ma_signal_series(df, bars, short, long):
+    close = df['close'].to_numpy(dtype=float)
+    ma_short = df['close'].rolling(short).mean().to_numpy()
+    ma_long = df['close'].rolling(long).mean().to_numpy()
+    rsi = calculate_rsi(df).to_numpy()
+    macd, macd_signal, macd_hist = (s.to_numpy() for s in calculate_macd(df))
+    volume_ok = _volume_confirmation_series(df, bars)
+
+    bullish, bearish = _crossover_votes(_previous(ma_short), _previous(ma_long), ma_short, ma_long)
+    buy_votes = ((rsi < 75).astype(int) + ((macd > macd_signal) & (macd_hist > 0))
+                 + (close > ma_short) + volume_ok)
+    sell_votes = ((rsi > 25).astype(int) + ((macd < macd_signal) & (macd_hist < 0))
+                  + (close < ma_short) + volume_ok)
+
+    enough_data = bars >= max(long + 5, 26)
+    return enough_data & bullish & (buy_votes >= 3), enough_data & bearish & (sell_votes >= 3)
+
+def _scalping_signal_series(df, bars):
+    close = df['close'].to_numpy(dtype=float)
+    ema_fast = calculate_ema(df, 5).to_numpy()
+    ema_slow = calculate_ema(df, 13).to_numpy()
+    rsi = calculate_rsi(df, 7).to_numpy()
+    close_4 = df['close'].shift(3).to_numpy()
+    price_momentum = (close - close_4) / close_4 * 100
+
+    bullish, bearish = _crossover_votes(_previous(ema_fast), _previous(ema_slow), ema_fast, ema_slow)
+    buy_score = ((40 < rsi) & (rsi < 80)).astype(int) + (price_momentum > 0.1) + (close > ema_fast)
+    sell_score = ((20 < rsi) & (rsi < 60)).astype(int) + (price_momentum < -0.1) + (close < ema_fast)
+
+    enough_data = bars >= 20
+    return enough_data & bullish & (buy_score >= 2), enough_data & bearish & (sell_score >= 2)
+
+def _bollinger_signal_series(df, bars):
+    close = df['close'].to_numpy(dtype=float)
+    sma_20 = df['close'].rolling(20).mean()
+    std_20 = df['close'].rolling(20).std()
+    bb_upper = (sma_20 + std_20 * 2).to_numpy()
+    bb_lower = (sma_20 - std_20 * 2).to_numpy()
+    sma_20 = sma_20.to_numpy()
+    rsi = calculate_rsi(df).to_numpy()
+    volume_ok = _volume_confirmation_series(df, bars)
+
+    enough_data = bars >= 30
+    buy = (close > bb_upper) & (close > sma_20) & (rsi > 60) & (rsi < 80) & volume_ok
+    sell = (close < bb_lower) & (close < sma_20) & (rsi < 40) & (rsi > 20) & volume_ok
+    return enough_data & buy, enough_data & ~buy & sell
+
+def _range_breakout_signal_series(df, bars):
+    close = df['close'].to_numpy(dtype=float)
+    prev_close = df['close'].shift(1).to_numpy()
+    recent_high = df['high'].rolling(8).max().to_numpy()
+    recent_low = df['low'].rolling(8).min().to_numpy()
+    volume = df['volume'].to_numpy(dtype=float)
+    volume_spike = volume > df['volume'].rolling(10).mean().to_numpy() * 1.2
+
+    enough_data = bars >= 10
+    buy = ((close > recent_high) & (prev_close <= recent_high)
+           & (volume_spike | (close > recent_high * 1.002)))
+    sell = ((close < recent_low) & (prev_close >= recent_low)
+            & (volume_spike | (close < recent_low * 0.998)))
+    return enough_data & buy, enough_data & ~buy & sell
+
+def _raw_signal_series(df, strategy_type, short, long, bars):
+    if strategy_type == "momentum":
+        return _bollinger_signal_series(df, bars)
+    elif strategy_type == "aggressive_ema":
+        return _scalping_signal_series(df, bars)
+    elif strategy_type == "breakout":
+        return _range_breakout_signal_series(df, bars)
+    else:
+        return _ma_signal_series(df, bars, short, long)
+
+def _to_signal_series(df, buy, sell):
+    signals = np.full(len(df), "hold", dtype=object)
+    signals[buy] = "buy"
+    signals[sell] = "sell"
+    return pd.Series(signals, index=df.index, name="signal")
+
+def generate_signals(df, strategy_type="default_ma", short=9, long=21, enable_volatility_filter=True):
+    """
+    Vectorized get_strategy_signal for every bar of df in one pass.
+
+    Entry i equals get_strategy_signal(df.iloc[:i+1], ...) - every indicator used
+    is causal, so computing it once over the whole frame gives the same values
+    as recomputing it on each growing prefix.
+    """
+    bars = np.arange(1, len(df) + 1)
+    buy, sell = _raw_signal_series(df, strategy_type, short, long, bars)
+
+    if enable_volatility_filter:
+        close = df['close'].to_numpy(dtype=float)
+        prev_close = df['close'].shift(1).to_numpy()
+        change = np.abs((close - prev_close) / prev_close * 100)
+        volatility_ok = (bars < 2) | ((0.5 <= change) & (change <= 5.0))
+        buy &= volatility_ok
+        sell &= volatility_ok
+
+    # Trend filter: no buys in strong downtrends, no sells in strong uptrends
+    close = df['close'].to_numpy(dtype=float)
+    recent_high = df['high'].rolling(20).max().to_numpy()
+    recent_low = df['low'].rolling(20).min().to_numpy()
+    has_trend = bars >= 20
+    strong_up = has_trend & (close >= recent_high * 0.98)
+    strong_down = has_trend & ~strong_up & (close <= recent_low * 1.02)
+    buy &= ~strong_down
+    sell &= ~strong_up
+
+    return _to_signal_series(df, buy, sell)
+
+def generate_fast_signals(df, strategy_type="aggressive_ema"):
+    """Vectorized get_fast_strategy_signal for every bar of df (no filters)"""
+    bars = np.arange(1, len(df) + 1)
+    fast_type = "breakout" if strategy_type == "breakout" else "aggressive_ema"
+    buy, sell = _raw_signal_series(df, fast_type, 9, 21, bars)
+    return _to_signal_series(df, buy, sell)
@@ -0,0 +1,116 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class _Highest:
+    """Sorts after any key, so (level, _HIGHEST) bounds every entry at that level"""
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_HIGHEST = _Highest()
+
+
+def exit_levels(entry_price, side, stop_loss, take_profit):
+    """(stop price, take-profit price) for a position, percentages as the bots use them"""
+    if side == "buy":
+        return entry_price * (1 - stop_loss / 100), entry_price * (1 + take_profit / 100)
+    return entry_price * (1 + stop_loss / 100), entry_price * (1 - take_profit / 100)
+
+
+class _SymbolTriggers:
+    """Sorted (level, key) lists for one symbol, one per side and exit type"""
+    __slots__ = ('long_stops', 'long_takes', 'short_stops', 'short_takes')
+
+    def __init__(self):
+        self.long_stops = []
+        self.long_takes = []
+        self.short_stops = []
+        self.short_takes = []
+
+    def __len__(self):
+        return len(self.long_stops) + len(self.short_stops)
+
+
+class TriggerIndex:
+    """
+    Stop-loss / take-profit levels of open positions, sorted per symbol.
+
+    A price only visits the positions whose level it crossed: with levels
+    kept sorted, each side's hits are a prefix or suffix found by bisect, so
+    a check costs O(log n + k) for k hits instead of a scan of every position.
+    Comparisons are inclusive, like should_close_position.
+    """
+    def __init__(self):
+        self._symbols = {}
+        self._entries = {}  # key -> (symbol, side, stop_price, take_price)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, symbol, side, stop_price, take_price):
+        if key in self._entries:
+            self.remove(key)
+        book = self._symbols.get(symbol)
+        if book is None:
+            book = self._symbols[symbol] = _SymbolTriggers()
+        if side == "buy":
+            insort(book.long_stops, (stop_price, key))
+            insort(book.long_takes, (take_price, key))
+        else:
+            insort(book.short_stops, (stop_price, key))
+            insort(book.short_takes, (take_price, key))
+        self._entries[key] = (symbol, side, stop_price, take_price)
+
+    @staticmethod
+    def _discard(levels, level, key):
+        i = bisect_left(levels, (level, key))
+        if i < len(levels) and levels[i] == (level, key):
+            del levels[i]
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        symbol, side, stop_price, take_price = entry
+        book = self._symbols[symbol]
+        if side == "buy":
+            self._discard(book.long_stops, stop_price, key)
+            self._discard(book.long_takes, take_price, key)
+        else:
+            self._discard(book.short_stops, stop_price, key)
+            self._discard(book.short_takes, take_price, key)
+        if not book:
+            del self._symbols[symbol]
+        return True
+
+    def crossed(self, symbol, price):
+        """
+        [(key, reason)] for positions on symbol whose stop or target `price`
+        reached, stops first. Entries stay indexed until remove(key).
+        """
+        book = self._symbols.get(symbol)
+        if book is None:
+            return []
+        hits = {}
+        # Long stops fire at or below the stop, short stops at or above it
+        for _, key in book.long_stops[bisect_left(book.long_stops, (price,)):]:
+            hits[key] = "stop_loss"
+        for _, key in book.short_stops[:bisect_right(book.short_stops, (price, _HIGHEST))]:
+            hits[key] = "stop_loss"
+        # Long targets fire at or above the target, short targets at or below it
+        for _, key in book.long_takes[:bisect_right(book.long_takes, (price, _HIGHEST))]:
+            hits.setdefault(key, "take_profit")
+        for _, key in book.short_takes[bisect_left(book.short_takes, (price,)):]:
+            hits.setdefault(key, "take_profit")
+        return list(hits.items())
+
+    def symbols(self):
+        return list(self._symbols)
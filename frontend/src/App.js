@@ -1,9 +1,10 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import Dashboard from './components/Dashboard';
 import Settings from './components/Settings';
 import TradeHistory from './components/TradeHistory';
 import BotControls from './components/BotControls';
 import axios from 'axios';
+import { subscribe, isStreamOpen } from './eventStream';
 
 function App() {
     const [activeTab, setActiveTab] = useState('dashboard');
@@ -25,6 +26,8 @@ function App() {
         super_aggressive_mode: false
     });
     const [configLoaded, setConfigLoaded] = useState(false);
+    // Newest trade id we hold and the database it came from, for delta polling
+    const tradeCursor = useRef({ latestId: null, mode: null });
 
     const loadInitialConfig = useCallback(async () => {
         if (configLoaded) return;
@@ -61,26 +64,74 @@ function App() {
         }
     }, [configLoaded]);
 
+    // Full history once (page by page), afterwards only trades newer than the last seen id
+    const fetchTrades = useCallback(async () => {
+        const { latestId } = tradeCursor.current;
+
+        if (latestId !== null) {
+            const res = await axios.get('/api/trades', { params: { since_id: latestId, limit: 1000 } });
+            const page = res.data;
+            if (page.trading_mode === tradeCursor.current.mode && !page.next_cursor) {
+                if (page.trades.length > 0) {
+                    tradeCursor.current.latestId = page.trades[0].id;
+                    setTrades(prev => [...page.trades, ...prev]);
+                }
+                return;
+            }
+            // Mode switched or too far behind - reload from scratch
+        }
+
+        let all = [];
+        let cursor = null;
+        let first = null;
+        do {
+            const res = await axios.get('/api/trades', { params: { limit: 1000, cursor } });
+            if (first === null) first = res.data;
+            all = all.concat(res.data.trades);
+            cursor = res.data.next_cursor;
+        } while (cursor);
+
+        tradeCursor.current = {
+            latestId: all.length > 0 ? all[0].id : (first.latest_id ?? 0),
+            mode: first.trading_mode
+        };
+        setTrades(all);
+    }, []);
+
     const fetchData = useCallback(async () => {
         try {
-            const [balanceRes, tradesRes, statusRes] = await Promise.all([
+            const [balanceRes, statusRes] = await Promise.all([
                 axios.get('/api/balance'),
-                axios.get('/api/trades'),
-                axios.get('/api/status')
+                axios.get('/api/status'),
+                fetchTrades()
             ]);
             setBalance(balanceRes.data);
-            setTrades(tradesRes.data);
             setBotStatus(statusRes.data);
         } catch (error) {
             console.error('Error fetching data:', error);
         }
-    }, []);
+    }, [fetchTrades]);
 
     useEffect(() => {
         loadInitialConfig();
         fetchData();
-        const interval = setInterval(fetchData, 3000);
-        return () => clearInterval(interval);
+
+        // Bot events trigger a refresh; polling is only a fallback while the stream is down
+        const unsubscribers = ['open', 'trades_committed', 'position_closed', 'kill_switch', 'bot_status']
+            .map(type => subscribe(type, fetchData));
+
+        let lastPoll = Date.now();
+        const interval = setInterval(() => {
+            if (!isStreamOpen() || Date.now() - lastPoll >= 30000) {
+                lastPoll = Date.now();
+                fetchData();
+            }
+        }, 3000);
+
+        return () => {
+            clearInterval(interval);
+            unsubscribers.forEach(unsubscribe => unsubscribe());
+        };
     }, [loadInitialConfig, fetchData]);
 
     const handleConfigChange = (newConfig) => {
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ReferenceDot } from 'recharts';
 import axios from 'axios';
 
@@ -191,6 +191,44 @@ function BotControls({ settings, botStatus, onRefresh }) {
         setChartData(demoData);
     }, [currentConfig.multi_pair_mode, currentConfig.symbols, currentConfig.symbol]);
 
+    // Today's trades: loaded once per day (page by page), afterwards only trades newer than the last seen id
+    const todayTradesCache = useRef({ day: null, mode: null, latestId: null, trades: [] });
+
+    const fetchTodayTrades = useCallback(async (todayStart) => {
+        const cache = todayTradesCache.current;
+
+        if (cache.day === todayStart && cache.latestId !== null) {
+            const res = await axios.get('/api/trades', { params: { since_id: cache.latestId, limit: 1000 } });
+            const page = res.data;
+            if (page.trading_mode === cache.mode && !page.next_cursor) {
+                if (page.trades.length > 0) {
+                    cache.latestId = page.trades[0].id;
+                    cache.trades = [...page.trades, ...cache.trades];
+                }
+                return cache.trades;
+            }
+            // Mode switched or too far behind - reload today's trades
+        }
+
+        let all = [];
+        let cursor = null;
+        let first = null;
+        do {
+            const res = await axios.get('/api/trades', { params: { start: todayStart, limit: 1000, cursor } });
+            if (first === null) first = res.data;
+            all = all.concat(res.data.trades);
+            cursor = res.data.next_cursor;
+        } while (cursor);
+
+        todayTradesCache.current = {
+            day: todayStart,
+            mode: first.trading_mode,
+            latestId: all.length > 0 ? all[0].id : (first.latest_id ?? 0),
+            trades: all
+        };
+        return all;
+    }, []);
+
     // Fetch live chart data
     const fetchStrategyData = useCallback(async () => {
         try {
@@ -206,20 +244,20 @@ function BotControls({ settings, botStatus, onRefresh }) {
             const endpoint = (currentConfig.aggressive_mode || currentConfig.super_aggressive_mode) ? '/api/ohlcv-fast' : '/api/ohlcv';
             const timeframe = (currentConfig.aggressive_mode || currentConfig.super_aggressive_mode) ? '5m' : '1m';
 
-            const [ohlcvRes, tradesRes] = await Promise.all([
+            // Local midnight, in the server's naive timestamp format
+            const now = new Date();
+            const pad = (n) => String(n).padStart(2, '0');
+            const todayStart = `${now.getFullYear()}-${pad(now.getMonth() + 1)}-${pad(now.getDate())}T00:00:00`;
+
+            const [ohlcvRes, todayTrades] = await Promise.all([
                 axios.get(`${endpoint}?symbol=${symbolToFetch}&timeframe=${timeframe}&limit=50`),
-                axios.get('/api/trades')
+                fetchTodayTrades(todayStart)
             ]);
 
             const ohlcvData = ohlcvRes.data.data;
-            const recentTrades = tradesRes.data.slice(-10);
 
             // Calculate live statistics
-            const todayTrades = tradesRes.data.filter(trade => {
-                const tradeDate = new Date(trade.timestamp).toDateString();
-                const today = new Date().toDateString();
-                return tradeDate === today;
-            });
+            const recentTrades = todayTrades.slice(0, 10);
 
             const wins = todayTrades.filter(t => t.pnl > 0);
             const losses = todayTrades.filter(t => t.pnl < 0);
@@ -254,7 +292,7 @@ function BotControls({ settings, botStatus, onRefresh }) {
             console.error('Error fetching strategy data:', error);
             generateDemoStrategyData();
         }
-    }, [currentConfig.multi_pair_mode, currentConfig.symbols, currentConfig.symbol, currentConfig.aggressive_mode, currentConfig.super_aggressive_mode, generateDemoStrategyData]);
+    }, [currentConfig.multi_pair_mode, currentConfig.symbols, currentConfig.symbol, currentConfig.aggressive_mode, currentConfig.super_aggressive_mode, generateDemoStrategyData, fetchTodayTrades]);
 
     const calculateMovingAverage = (prices, period) => {
         const ma = [];
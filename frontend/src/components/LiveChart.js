@@ -1,11 +1,14 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ReferenceDot } from 'recharts';
+import { subscribe } from '../eventStream';
 
 function LiveChart({ symbol = 'BTC/USDT', trades = [] }) {
     const [chartData, setChartData] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [currentPrice, setCurrentPrice] = useState(null);
+    // Candles we already hold, so refreshes only ask for newer ones
+    const candles = useRef({ symbol: null, timestamp: [], close: [], volume: [] });
 
     // ✅ generateDemoData defined first
     const generateDemoData = useCallback(() => {
@@ -66,8 +69,13 @@ function LiveChart({ symbol = 'BTC/USDT', trades = [] }) {
         try {
             console.log('LiveChart fetching data for symbol:', symbol);
 
+            // Columnar payload; after the first load only candles from the last one we have on
+            const held = candles.current.symbol === symbol ? candles.current : null;
+            const lastTimestamp = held && held.timestamp.length > 0 ? held.timestamp[held.timestamp.length - 1] : null;
+            const since = lastTimestamp !== null ? `&since=${lastTimestamp}` : '';
+
             const [ohlcvResponse, priceResponse] = await Promise.all([
-                fetch(`/api/ohlcv?symbol=${encodeURIComponent(symbol)}&timeframe=1h&limit=24`),
+                fetch(`/api/ohlcv?symbol=${encodeURIComponent(symbol)}&timeframe=1h&limit=24&format=columnar${since}`),
                 fetch(`/api/current-price?symbol=${encodeURIComponent(symbol)}`)
             ]);
 
@@ -85,15 +93,26 @@ function LiveChart({ symbol = 'BTC/USDT', trades = [] }) {
                 console.log('LiveChart fetched current price for', symbol, ':', priceData.price);
             }
 
-            if (ohlcvData.data && ohlcvData.data.length > 0) {
-                const chartPoints = ohlcvData.data.map((candle, index) => ({
-                    time: new Date(candle.timestamp).toLocaleTimeString([], {
+            const columns = ohlcvData.columns;
+            if (columns && (held || columns.timestamp.length > 0)) {
+                // Replace candles from `since` on (the last one may have still been forming)
+                const keep = held ? held.timestamp.filter(t => t < (ohlcvData.since ?? Infinity)).length : 0;
+                const merged = {
+                    symbol,
+                    timestamp: (held ? held.timestamp.slice(0, keep) : []).concat(columns.timestamp).slice(-24),
+                    close: (held ? held.close.slice(0, keep) : []).concat(columns.close).slice(-24),
+                    volume: (held ? held.volume.slice(0, keep) : []).concat(columns.volume).slice(-24)
+                };
+                candles.current = merged;
+
+                const chartPoints = merged.timestamp.map((timestamp, index) => ({
+                    time: new Date(timestamp).toLocaleTimeString([], {
                         hour: '2-digit',
                         minute: '2-digit'
                     }),
-                    price: parseFloat(candle.close),
-                    volume: parseFloat(candle.volume),
-                    timestamp: candle.timestamp,
+                    price: merged.close[index],
+                    volume: merged.volume[index],
+                    timestamp: timestamp,
                     index: index
                 }));
 
@@ -121,6 +140,15 @@ function LiveChart({ symbol = 'BTC/USDT', trades = [] }) {
         }
     }, [symbol, fetchChartData]);
 
+    // Live price ticks pushed by the running bot
+    useEffect(() => {
+        return subscribe('price', (data) => {
+            if (data && data.symbol === symbol) {
+                setCurrentPrice(data.price);
+            }
+        });
+    }, [symbol]);
+
     // Get trade markers for visualization
     const getTradeMarkers = () => {
         if (!trades || trades.length === 0 || !chartData || chartData.length === 0) {
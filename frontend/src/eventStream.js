@@ -0,0 +1,58 @@
+// One shared EventSource on /api/stream for every component.
+// The browser reconnects by itself and resumes from the last event id.
+
+const listeners = {};
+let source = null;
+let open = false;
+const REOPEN_DELAY_MS = 30000;
+
+function dispatch(type, event) {
+    let payload;
+    try {
+        payload = JSON.parse(event.data);
+    } catch (error) {
+        console.error('Bad stream event:', error);
+        return;
+    }
+    (listeners[type] || []).forEach(handler => handler(payload.data, payload));
+}
+
+function ensureSource() {
+    if (source || typeof EventSource === 'undefined') return;
+
+    source = new EventSource('/api/stream');
+    source.onopen = () => {
+        open = true;
+        dispatch('open', { data: '{}' });
+    };
+    source.onerror = () => {
+        open = false;
+        // A refused stream (503 when the server is at its stream cap) is not retried by the browser
+        if (source.readyState === EventSource.CLOSED) {
+            source = null;
+            setTimeout(ensureSource, REOPEN_DELAY_MS);
+        }
+    };
+    Object.keys(listeners)
+        .filter(type => type !== 'open')
+        .forEach(type => source.addEventListener(type, e => dispatch(type, e)));
+}
+
+export function subscribe(type, handler) {
+    if (!listeners[type]) {
+        listeners[type] = [];
+        if (source && type !== 'open') {
+            source.addEventListener(type, e => dispatch(type, e));
+        }
+    }
+    listeners[type].push(handler);
+    ensureSource();
+
+    return () => {
+        listeners[type] = listeners[type].filter(h => h !== handler);
+    };
+}
+
+export function isStreamOpen() {
+    return open;
+}
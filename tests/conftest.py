@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def synthetic_candles(n=300, seed=7, volatility=0.006, freq='5min'):
+    """Random-walk OHLCV frame in the layout the exchange interfaces return"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq=freq),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, volatility / 2, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, volatility / 2, n)),
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    })
+
+
+@pytest.fixture
+def make_candles():
+    return synthetic_candles
+
+
+@pytest.fixture
+def trade_db(tmp_path, monkeypatch):
+    """Fresh SQLite trades database, returned as the db_mode to pass around"""
+    from backend import db
+
+    monkeypatch.setattr(db, '_engines', {})
+    monkeypatch.setattr(db, '_sessions', {})
+    monkeypatch.setattr(db, 'get_database_path', lambda mode: f"sqlite:///{tmp_path / mode}.sqlite")
+    db.init_db('test')
+    yield 'test'
+    for engine in db._engines.values():
+        engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def api_server(tmp_path_factory):
+    """The Flask app module, imported from a scratch directory (it creates its databases in the cwd)"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('api'))
+    os.makedirs('database', exist_ok=True)
+    try:
+        import api_server
+    finally:
+        os.chdir(cwd)
+    return api_server
@@ -0,0 +1,86 @@
+"""
+find_exit resolves stop-loss/take-profit bar by bar: gaps fill at the open and
+a bar spanning both levels counts as a stop. BacktestEngine realizes exits in
+exit order and never holds more than max_open_positions.
+"""
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.backtest import BacktestEngine, find_exit
+
+
+def bars(*ohlc):
+    """(open, high, low) rows -> the arrays find_exit takes"""
+    rows = np.array(ohlc, dtype=float)
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+FLAT = (100.0, 100.5, 99.5)
+
+
+@pytest.mark.parametrize("side, stop, take, row, expected", [
+    # Touched inside the bar: fill at the level
+    ("buy", 98.0, 103.0, (100.0, 101.0, 97.5), (98.0, "stop_loss")),
+    ("buy", 98.0, 103.0, (100.0, 103.5, 99.0), (103.0, "take_profit")),
+    ("sell", 102.0, 97.0, (100.0, 102.5, 99.0), (102.0, "stop_loss")),
+    ("sell", 102.0, 97.0, (100.0, 101.0, 96.0), (97.0, "take_profit")),
+    # Opened beyond the level: fill at the (worse or better) open
+    ("buy", 98.0, 103.0, (96.0, 97.0, 95.0), (96.0, "stop_loss")),
+    ("buy", 98.0, 103.0, (105.0, 106.0, 104.0), (105.0, "take_profit")),
+    ("sell", 102.0, 97.0, (104.0, 105.0, 103.0), (104.0, "stop_loss")),
+    ("sell", 102.0, 97.0, (95.0, 96.0, 94.0), (95.0, "take_profit")),
+])
+def test_levels_and_gaps(side, stop, take, row, expected):
+    opens, highs, lows = bars(FLAT, FLAT, row)
+    assert find_exit(opens, highs, lows, 1, side, stop, take) == (2, *expected)
+
+
+@pytest.mark.parametrize("side, stop, take", [("buy", 98.0, 103.0), ("sell", 102.0, 97.0)])
+def test_bar_spanning_both_levels_is_a_stop(side, stop, take):
+    opens, highs, lows = bars(FLAT, (100.0, 104.0, 96.0))
+    assert find_exit(opens, highs, lows, 1, side, stop, take) == (1, stop, "stop_loss")
+
+
+def test_gap_through_the_target_after_a_spanning_open_is_still_taken_at_the_open():
+    # Opens beyond the target even though the range also reaches the stop
+    opens, highs, lows = bars(FLAT, (104.0, 104.5, 97.0))
+    assert find_exit(opens, highs, lows, 1, "buy", 98.0, 103.0) == (1, 104.0, "take_profit")
+
+
+def test_scan_starts_at_start_and_reports_no_exit():
+    opens, highs, lows = bars((100.0, 110.0, 90.0), FLAT, FLAT)
+    assert find_exit(opens, highs, lows, 1, "buy", 98.0, 103.0) is None
+    assert find_exit(opens, highs, lows, 0, "buy", 98.0, 103.0) == (0, 98.0, "stop_loss")
+    assert find_exit(opens, highs, lows, 3, "buy", 98.0, 103.0) is None
+
+
+@pytest.mark.parametrize("hit_at", [63, 64, 65, 400, 4999])
+def test_exit_found_across_growing_windows(hit_at):
+    opens, highs, lows = bars(*[FLAT] * 5000)
+    lows[hit_at] = 97.0
+    assert find_exit(opens, highs, lows, 0, "buy", 98.0, 103.0) == (hit_at, 98.0, "stop_loss")
+
+
+def test_positions_close_in_exit_order_and_respect_the_cap(make_candles):
+    df = make_candles(3000, seed=5, volatility=0.01, freq='1h')
+    engine = BacktestEngine(max_open_positions=2)
+    engine.run_backtest(df, 'momentum', 1.0, 1.0, 2.0)
+
+    exits = [pd.Timestamp(t['exit_timestamp']) for t in engine.trades]
+    assert len(exits) > 20 and exits == sorted(exits)
+    entries = sorted(pd.Timestamp(t['timestamp']) for t in engine.trades)
+    for entry in entries:
+        # Open at this entry's close: entered at or before it, exiting after it
+        held = sum(pd.Timestamp(t['timestamp']) <= entry < pd.Timestamp(t['exit_timestamp']) for t in engine.trades)
+        assert held <= 2
+
+
+def test_backtests_do_not_import_the_live_engine():
+    code = ("import sys, backend.backtest; "
+            "print(sorted(m for m in ('backend.bot_core', 'backend.exchange', 'backend.db') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
@@ -0,0 +1,111 @@
+"""
+Every bot mode runs on TradingEngine with its BOT_POLICIES entry. The mode
+classes must keep what the separate pre-engine classes hardcoded: risk
+scaling, SL/TP floors, fees, candles, caps, cooldowns and kill switch.
+"""
+import pytest
+
+from backend.bot_core import (HighFrequencyTradingBot, MultiPairTradingBot, SuperAggressiveMultiPairBot,
+                              TradingBot, TradingEngine, create_bot)
+from backend.positions import Position
+from backend.replay import ReplayInterface, VirtualClock, replay
+from tests.conftest import synthetic_candles
+
+PAIRS = ['A/USDT', 'B/USDT', 'C/USDT']
+
+# mode -> (class, symbols, risk, stop_loss, take_profit, what the old class derived from them)
+BASELINE = {
+    'single': (TradingBot, 'A/USDT', 2.0, 0.5, 1.0, dict(
+        risk=2.0, stop_loss=0.5, take_profit=1.0, fee_rate=0.0, candles=('1h', 100),
+        kill_switch_threshold=10, cooldown=300, max_open=3, max_per_symbol=None, kill_switch_max_loss=None)),
+    'multi_pair': (MultiPairTradingBot, PAIRS, 3.0, 0.5, 1.0, dict(
+        risk=1.0, stop_loss=0.5, take_profit=1.0, fee_rate=0.0, candles=('1h', 100),
+        kill_switch_threshold=10, cooldown=300, max_open=None, max_per_symbol=2, kill_switch_max_loss=None)),
+    'high_frequency': (HighFrequencyTradingBot, 'A/USDT', 2.5, 1.0, 1.0, dict(
+        risk=3.0, stop_loss=1.5, take_profit=2.0, fee_rate=0.001, candles=('5m', 50),
+        kill_switch_threshold=15, cooldown=30, max_open=3, max_per_symbol=None, kill_switch_max_loss=-100)),
+    'super_aggressive': (SuperAggressiveMultiPairBot, PAIRS, 0.6, 1.0, 1.0, dict(
+        risk=0.3, stop_loss=1.5, take_profit=2.0, fee_rate=0.001, candles=('5m', 30),
+        kill_switch_threshold=20, cooldown=30, max_open=None, max_per_symbol=2, kill_switch_max_loss=-200)),
+}
+MODES = list(BASELINE)
+
+
+class Idle:
+    """Interface for bots that are only inspected, never run"""
+
+
+def build(mode):
+    cls, symbols, risk, stop_loss, take_profit, expected = BASELINE[mode]
+    return cls(Idle(), symbols, risk, stop_loss, take_profit), expected
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_risk_floors_fees_and_candles(mode):
+    bot, expected = build(mode)
+    assert bot.risk == pytest.approx(expected['risk'])
+    assert (bot.stop_loss, bot.take_profit) == (expected['stop_loss'], expected['take_profit'])
+    assert bot.kill_switch_threshold == expected['kill_switch_threshold']
+    # 0.1% per side on entry and exit notional for the fast bots, none for the others
+    assert bot.calculate_realistic_pnl(100.0, 110.0, 'buy', 1.0) == pytest.approx(10 - 210 * expected['fee_rate'])
+    assert {(tf, limit) for _, tf, limit in bot.market_data_requests(current_time=10**9)} == {expected['candles']}
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_cooldown_and_position_caps(mode):
+    bot, expected = build(mode)
+    symbol = bot.symbols[0]
+    now = 10**9
+    bot.last_trade_times[symbol] = now
+    assert not bot._can_open(symbol, now + expected['cooldown'] - 1)
+    assert bot._can_open(symbol, now + expected['cooldown'])
+
+    later = now + expected['cooldown']
+    for trade_id in range(1, 4):
+        bot.open_positions.add(Position(trade_id, symbol, 'buy', 100.0, 1.0))
+        cap = expected['max_open'] if expected['max_open'] is not None else expected['max_per_symbol']
+        assert bot._can_open(symbol, later) == (trade_id < cap)
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_kill_switch_condition(mode):
+    bot, expected = build(mode)
+    max_loss = expected['kill_switch_max_loss']
+    bot.total_pnl = 0.0 if max_loss is None else max_loss + 1
+    streak = [bot.check_kill_switch(-1.0) for _ in range(expected['kill_switch_threshold'])]
+
+    if max_loss is None:
+        assert streak[-1] and not any(streak[:-1])
+        return
+    # The fast bots also need the total loss past their limit
+    assert not any(streak)
+    bot.total_pnl = max_loss - 1
+    assert bot.check_kill_switch(-1.0) and bot.is_kill_switch_active()
+
+
+@pytest.fixture(scope='module')
+def frames():
+    frames = {}
+    for i, symbol in enumerate(PAIRS):
+        frames[(symbol, '1h')] = synthetic_candles(500, seed=i, volatility=0.008, freq='1h')
+        frames[(symbol, '5m')] = synthetic_candles(1500, seed=10 + i, volatility=0.008, freq='5min')
+    return frames
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_mode_class_create_bot_and_bare_engine_trade_alike(mode, frames):
+    cls, symbols, risk, stop_loss, take_profit, _ = BASELINE[mode]
+    single = isinstance(symbols, str)
+    makers = [
+        lambda iface: cls(iface, symbols, risk, stop_loss, take_profit),
+        lambda iface: create_bot(mode, iface, symbols, risk, stop_loss, take_profit),
+        lambda iface: TradingEngine(iface, [symbols] if single else symbols, risk, stop_loss, take_profit, mode),
+    ]
+    tick_seconds = 600 if BASELINE[mode][5]['candles'][0] == '1h' else 60
+    results = []
+    for make in makers:
+        iface = ReplayInterface(frames, VirtualClock())
+        results.append(replay(make(iface), iface, tick_seconds=tick_seconds, max_ticks=2500))
+
+    assert results[0]['orders'] > 0
+    assert len({r['digest'] for r in results}) == 1
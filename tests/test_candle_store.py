@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+
+from backend.candle_store import COLUMNS, ITEM_SIZE, CandleSeries, CandleStore, store_exchange_name
+
+HOUR = 3600 * 1000
+
+
+def bar(i, close=None):
+    close = float(i + 1) if close is None else close
+    return [i * HOUR, close, close + 1, close - 1, close, 10.0 + i]
+
+
+class FakeExchange:
+    """ccxt-like source of hourly candles 0..count-1, recording its requests"""
+    def __init__(self, count):
+        self.bars = [bar(i) for i in range(count)]
+        self.requests = []
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return 3600
+
+    def milliseconds(self):
+        return self.bars[-1][0] + HOUR // 2
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append((since, limit))
+        rows = [b for b in self.bars if since is None or b[0] >= since]
+        return rows[:limit] if since is not None else rows[-limit:]
+
+
+def test_append_overwrites_the_forming_candle_and_appends(tmp_path):
+    series = CandleSeries(str(tmp_path))
+    assert series.write([bar(0), bar(1)]) == 2
+    assert series.write([bar(1, close=5.0), bar(2)]) == 1
+
+    cols = series.read()
+    assert cols['timestamp'].tolist() == [0, HOUR, 2 * HOUR]
+    assert cols['close'].tolist() == [1.0, 5.0, 3.0]
+
+
+def test_duplicate_timestamps_in_a_batch_keep_the_last(tmp_path):
+    series = CandleSeries(str(tmp_path))
+    series.write([bar(1), bar(0), bar(1, close=7.0)])
+    assert series.read()['close'].tolist() == [1.0, 7.0]
+
+
+def test_rewrite_merges_backfills_in_order(tmp_path):
+    series = CandleSeries(str(tmp_path))
+    series.write([bar(3), bar(4)])
+    assert series.write([bar(0), bar(1), bar(4, close=9.0)]) == 2
+
+    cols = series.read()
+    assert cols['timestamp'].tolist() == [0, HOUR, 3 * HOUR, 4 * HOUR]
+    assert cols['close'].tolist() == [1.0, 2.0, 4.0, 9.0]
+
+
+def test_recover_trims_a_partially_written_append(tmp_path):
+    series = CandleSeries(str(tmp_path))
+    series.write([bar(0), bar(1)])
+    # Crash mid-append: every column but the timestamp got the third row
+    for column in COLUMNS[1:]:
+        with open(os.path.join(str(tmp_path), f"{column}.bin"), 'ab') as f:
+            f.write(np.float64(1.0).tobytes())
+
+    reopened = CandleSeries(str(tmp_path))
+    assert reopened.length == 2
+    assert reopened.read()['close'].tolist() == [1.0, 2.0]
+    for column in COLUMNS:
+        assert os.path.getsize(os.path.join(str(tmp_path), f"{column}.bin")) == 2 * ITEM_SIZE
+
+
+def test_frames_already_read_do_not_change_when_the_last_candle_does(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.series('binance', 'BTC/USDT', '1h').write([bar(0), bar(1)])
+    before = store.read_frame('binance', 'BTC/USDT', '1h')
+    history = store.read('binance', 'BTC/USDT', '1h', end_ms=0)
+
+    store.series('binance', 'BTC/USDT', '1h').write([bar(1, close=9.0)])
+    assert before['close'].tolist() == [1.0, 2.0]
+    assert isinstance(history['close'], np.memmap)  # ranges before the last candle stay zero-copy
+    assert store.read_frame('binance', 'BTC/USDT', '1h')['close'].tolist() == [1.0, 9.0]
+
+
+def test_fill_gaps_downloads_only_the_missing_candles(tmp_path):
+    store = CandleStore(str(tmp_path))
+    exchange = FakeExchange(10)
+    series = store.series('binance', 'BTC/USDT', '1h')
+    series.write([b for b in exchange.bars if b[0] not in (3 * HOUR, 4 * HOUR, 7 * HOUR)])
+
+    assert store.fill_gaps(exchange, 'binance', 'BTC/USDT', '1h') == 2
+    assert series.read()['timestamp'].tolist() == [i * HOUR for i in range(10)]
+    assert [since for since, _ in exchange.requests] == [3 * HOUR, 7 * HOUR]
+
+
+def test_fetch_recent_syncs_incrementally(tmp_path):
+    store = CandleStore(str(tmp_path))
+    exchange = FakeExchange(50)
+    df = store.fetch_recent(exchange, 'binance', 'BTC/USDT', '1h', limit=20)
+    assert len(df) == 20 and df['close'].iloc[-1] == 50.0
+
+    exchange.bars.append(bar(50))
+    exchange.requests.clear()
+    df = store.fetch_recent(exchange, 'binance', 'BTC/USDT', '1h', limit=20)
+    assert df['close'].iloc[-1] == 51.0
+    # Only from the last stored (possibly forming) candle on
+    assert exchange.requests == [(49 * HOUR, 1000)]
+
+
+def test_testnet_candles_are_stored_apart(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.series(store_exchange_name('binance', sandbox=True), 'BTC/USDT', '1h').write([bar(0)])
+    assert store.read_frame('binance', 'BTC/USDT', '1h').empty
+    assert store_exchange_name('binance') == 'binance'
@@ -0,0 +1,57 @@
+"""
+EventBus fan-out and the cap on concurrent /api/stream subscribers.
+"""
+import pytest
+
+from backend.events import EventBus, SubscriberLimitReached
+
+
+def test_subscribers_get_events_and_resume_from_last_id():
+    bus = EventBus(history=10)
+    first = bus.publish('price', {'p': 1})
+    bus.publish('price', {'p': 2})
+
+    live = bus.subscribe()
+    resumed = bus.subscribe(last_event_id=first.id)
+    bus.publish('price', {'p': 3})
+
+    assert live.get(timeout=0).data == {'p': 3}
+    assert [resumed.get(timeout=0).data['p'] for _ in range(2)] == [2, 3]
+
+
+def test_slow_subscriber_drops_the_oldest_events():
+    bus = EventBus(max_queue=2)
+    subscription = bus.subscribe()
+    for p in range(5):
+        bus.publish('price', {'p': p})
+
+    assert subscription.dropped == 3
+    assert [subscription.get(timeout=0).data['p'] for _ in range(2)] == [3, 4]
+
+
+def test_subscriber_cap_is_enforced_and_freed_on_close():
+    bus = EventBus(max_subscribers=2)
+    first = bus.subscribe()
+    bus.subscribe()
+    with pytest.raises(SubscriberLimitReached):
+        bus.subscribe()
+
+    first.close()
+    bus.subscribe()
+    assert bus.subscriber_count() == 2
+
+
+def test_stream_endpoint_answers_503_beyond_the_cap(api_server, monkeypatch):
+    bus = EventBus(max_subscribers=1)
+    monkeypatch.setattr(api_server, 'get_event_bus', lambda: bus)
+    client = api_server.app.test_client()
+
+    stream = client.get('/api/stream')
+    assert stream.status_code == 200 and bus.subscriber_count() == 1
+    refused = client.get('/api/stream')
+    assert refused.status_code == 503 and 'Retry-After' in refused.headers
+
+    assert next(stream.response).startswith(b"retry:")
+    stream.close()
+    assert bus.subscriber_count() == 0
+    assert client.get('/api/stream').status_code == 200
@@ -0,0 +1,120 @@
+"""
+A pooled TradingInterface is shared across threads: no ccxt client may be used
+by two of them at once, while batch fetches still run in parallel.
+"""
+import threading
+import time
+
+import ccxt
+import pytest
+
+from backend.exchange import TradingInterface
+from backend.metrics import get_metrics
+
+SYMBOLS = [f"C{i}/USDT" for i in range(24)]
+
+
+class FakeClient:
+    """ccxt stand-in that fails if two threads are inside one instance at once"""
+    instances = []
+
+    def __init__(self, params):
+        self.params = params
+        self.markets = {}
+        self.currencies = {}
+        self.busy = threading.Lock()
+        self.overlaps = 0
+        FakeClient.instances.append(self)
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = dict(markets)
+        self.currencies = dict(currencies or {})
+
+    def load_markets(self, reload=False):
+        self.set_markets({s: {'symbol': s} for s in SYMBOLS + ['NEW/USDT']})
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', limit=100, since=None):
+        if not self.busy.acquire(blocking=False):
+            self.overlaps += 1
+            self.busy.acquire()
+        try:
+            time.sleep(0.01)
+            return [[i * 3600_000, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(limit)]
+        finally:
+            self.busy.release()
+
+
+class FreshMarkets:
+    def __init__(self, fresh=True):
+        self.fresh = fresh
+
+    def load(self, exchange_name, trading_mode, sandbox=False):
+        return {s: {'symbol': s} for s in SYMBOLS}, {}, 0
+
+    def is_fresh(self, fetched_at):
+        return self.fresh
+
+    def save(self, *args, **kwargs):
+        pass
+
+
+class Paper:
+    def mark(self, symbol, price):
+        pass
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    FakeClient.instances = []
+    monkeypatch.setattr(ccxt, 'fakeex', FakeClient, raising=False)
+    return TradingInterface('', '', 'fakeex', market_cache=FreshMarkets(), paper_account=Paper())
+
+
+def test_batch_fetch_never_shares_a_client(interface):
+    frames = interface.fetch_ohlcv_batch(SYMBOLS, '1h', 5)
+
+    assert sorted(frames) == sorted(SYMBOLS)
+    assert sum(c.overlaps for c in FakeClient.instances) == 0
+    # Still concurrent: several clients, never more than the pool allows
+    assert 1 < len(FakeClient.instances) <= TradingInterface.CLIENTS
+
+
+def test_threads_outside_the_batch_pool_wait_for_a_client(interface):
+    threads = [threading.Thread(target=interface.fetch_ohlcv, args=(s, '1h', 3)) for s in SYMBOLS]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(c.overlaps for c in FakeClient.instances) == 0
+    assert len(FakeClient.instances) <= TradingInterface.CLIENTS
+
+
+def test_new_clients_share_the_loaded_markets(interface):
+    interface.fetch_ohlcv_batch(SYMBOLS, '1h', 2)
+    assert all(set(c.markets) == set(SYMBOLS) for c in FakeClient.instances)
+
+
+def test_market_refresh_reaches_every_client(monkeypatch):
+    FakeClient.instances = []
+    monkeypatch.setattr(ccxt, 'fakeex', FakeClient, raising=False)
+    interface = TradingInterface('', '', 'fakeex', market_cache=FreshMarkets(fresh=False), paper_account=Paper())
+    deadline = time.time() + 5
+    while 'NEW/USDT' not in interface.markets and time.time() < deadline:
+        time.sleep(0.01)
+
+    interface.fetch_ohlcv_batch(SYMBOLS, '1h', 2)
+    assert 'NEW/USDT' in interface.markets
+    assert all('NEW/USDT' in c.markets for c in FakeClient.instances)
+
+
+def test_batch_worker_spans_count_towards_the_tick(interface):
+    metrics = get_metrics()
+    with metrics.tick('bot-7') as stages:
+        interface.fetch_ohlcv_batch(SYMBOLS, '1h', 2)
+
+    fetched = {symbol for (stage, bot, symbol), h in metrics.snapshot().items()
+               if stage == 'exchange.fetch_ohlcv' and bot == 'bot-7'}
+    assert fetched == set(SYMBOLS)
+    assert stages['exchange.fetch_ohlcv'] >= 0.01 * len(SYMBOLS)
@@ -0,0 +1,95 @@
+"""
+The incremental IndicatorEngine must give the same signals as the DataFrame
+strategy functions run on the frame a bot fetched, at the bots' real fetch
+limits (a sliding window of `limit` candles, refreshed several times per candle).
+"""
+import pytest
+
+from backend.policies import BOT_POLICIES
+from backend.indicators import EMA, IndicatorEngine
+from backend.strategy import calculate_ema, calculate_macd, get_fast_strategy_signal, get_strategy_signal
+
+LIMITS = sorted({policy['limit'] for policy in BOT_POLICIES.values()})
+FAST_STRATEGIES = ['aggressive_ema', 'breakout']
+STRATEGIES = ['default_ma', 'custom', 'momentum', 'aggressive_ema', 'breakout']
+
+
+def fetched_windows(df, limit, refreshes=2):
+    """Frames a bot sees: `limit` candles, the last one still forming"""
+    for end in range(limit, len(df) + 1):
+        final = df.iloc[end - limit:end]
+        for step in range(1, refreshes + 1):
+            window = final.copy()
+            last = window.index[-1]
+            # The live candle's close walks from its open to its final close
+            window.loc[last, 'close'] = window.at[last, 'open'] + (final.at[last, 'close'] - window.at[last, 'open']) * step / refreshes
+            window.loc[last, 'high'] = max(window.at[last, 'high'], window.at[last, 'close'])
+            window.loc[last, 'low'] = min(window.at[last, 'low'], window.at[last, 'close'])
+            yield window
+
+
+@pytest.mark.parametrize('limit', LIMITS)
+def test_ema_and_macd_match_the_fetched_window(limit, make_candles):
+    engine = IndicatorEngine()
+    for window in fetched_windows(make_candles(200), limit, refreshes=1):
+        ind = engine.update(window).values()
+        assert ind['bars'] == len(window)
+        assert ind['ema_fast'] == pytest.approx(calculate_ema(window, 5).iloc[-1], rel=1e-9)
+        assert ind['ema_slow'] == pytest.approx(calculate_ema(window, 13).iloc[-1], rel=1e-9)
+        macd, signal, _ = calculate_macd(window)
+        assert ind['macd'] == pytest.approx(macd.iloc[-1], rel=1e-9, abs=1e-12)
+        assert ind['macd_signal'] == pytest.approx(signal.iloc[-1], rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize('limit', LIMITS)
+@pytest.mark.parametrize('strategy_type', FAST_STRATEGIES)
+def test_fast_signals_match_the_fetched_window(limit, strategy_type, make_candles):
+    engine = IndicatorEngine()
+    mismatches = [
+        i for i, window in enumerate(fetched_windows(make_candles(), limit))
+        if get_fast_strategy_signal(window, strategy_type, indicators=engine.update(window))
+        != get_fast_strategy_signal(window, strategy_type)
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('limit', LIMITS)
+@pytest.mark.parametrize('strategy_type', STRATEGIES)
+def test_signals_match_the_fetched_window(limit, strategy_type, make_candles):
+    engine = IndicatorEngine()
+    mismatches = [
+        i for i, window in enumerate(fetched_windows(make_candles(), limit))
+        if get_strategy_signal(window, strategy_type, indicators=engine.update(window))
+        != get_strategy_signal(window, strategy_type)
+    ]
+    assert mismatches == []
+
+
+def test_one_candle_slide_is_incremental(monkeypatch, make_candles):
+    df = make_candles(120)
+    engine = IndicatorEngine().update(df.iloc[0:100])
+    ema_fast, macd = engine.ema_fast, engine.macd
+
+    pushes = []
+    resets = []
+    monkeypatch.setattr(EMA, 'push', lambda self, x, push=EMA.push: (pushes.append(self), push(self, x))[1])
+    monkeypatch.setattr(IndicatorEngine, 'reset', lambda self: resets.append(self))
+    engine.update(df.iloc[1:101])
+
+    assert resets == []
+    assert engine.ema_fast is ema_fast and engine.macd is macd
+    # The candle that closed goes into EMA(5), EMA(13) and MACD's two lines once each
+    assert len(pushes) == 4 and len(set(map(id, pushes))) == 4
+
+
+def test_emas_stay_exact_over_a_long_slide(make_candles):
+    df = make_candles(3000, seed=11)
+    engine = IndicatorEngine()
+    for end in range(30, len(df) + 1):
+        window = df.iloc[end - 30:end]
+        engine.update(window)
+    ind = engine.values()
+    macd, signal, _ = calculate_macd(window)
+    assert ind['ema_slow'] == pytest.approx(calculate_ema(window, 13).iloc[-1], rel=1e-9)
+    assert ind['macd'] == pytest.approx(macd.iloc[-1], rel=1e-9)
+    assert ind['macd_signal'] == pytest.approx(signal.iloc[-1], rel=1e-9)
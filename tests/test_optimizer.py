@@ -0,0 +1,100 @@
+"""
+Parameter spaces expand to valid, de-duplicated combinations, and a cancelled
+sweep stops promptly while keeping every result it already computed.
+"""
+import threading
+import time
+
+import pytest
+
+from backend import optimizer
+from backend.optimizer import MAX_COMBINATIONS, OptimizationJob, build_combinations
+
+
+def test_grid_is_the_product_of_its_axes_minus_invalid_pairs():
+    combos = build_combinations({"short": [5, 20, 30], "long": [21, 30], "stop_loss": [1.0, 2.0]})
+
+    # (5,21) (5,30) (20,21) (20,30) are valid, 30 is never below long
+    assert len(combos) == 4 * 2
+    assert all(c["short"] < c["long"] for c in combos)
+    assert {c["take_profit"] for c in combos} == {optimizer.DEFAULTS["take_profit"]}
+
+
+def test_grid_ranges_keep_ints_and_round_floats():
+    combos = build_combinations({"short": {"min": 5, "max": 9, "step": 2},
+                                 "stop_loss": {"min": 0.1, "max": 0.3, "step": 0.1}})
+
+    assert sorted({c["short"] for c in combos}) == [5, 7, 9]
+    assert all(isinstance(c["short"], int) for c in combos)
+    assert sorted({c["stop_loss"] for c in combos}) == [0.1, 0.2, 0.3]
+
+
+def test_random_mode_is_seeded_unique_and_valid():
+    space = {"short": {"min": 3, "max": 30}, "long": {"min": 10, "max": 60},
+             "risk": {"min": 0.5, "max": 2.0}, "strategy_type": list(optimizer.STRATEGY_TYPES)}
+    combos = build_combinations(space, mode="random", samples=50, seed=3)
+
+    assert len(combos) == 50
+    assert len({tuple(c[p] for p in optimizer.PARAMETERS) for c in combos}) == 50
+    assert all(c["short"] < c["long"] and 0.5 <= c["risk"] <= 2.0 for c in combos)
+    assert combos == build_combinations(space, mode="random", samples=50, seed=3)
+    assert combos != build_combinations(space, mode="random", samples=50, seed=4)
+
+
+@pytest.mark.parametrize("space, mode, message", [
+    ({"period": [1, 2]}, "grid", "Unknown optimizer parameters"),
+    ({"short": [30], "long": [21]}, "grid", "no valid combinations"),
+    ({"short": {"min": 1, "max": MAX_COMBINATIONS + 1}}, "grid", "combinations"),
+    ({}, "annealing", "Unknown optimizer mode"),
+])
+def test_bad_spaces_are_rejected(space, mode, message):
+    with pytest.raises(ValueError, match=message):
+        build_combinations(space, mode=mode)
+
+
+class FlagAfter:
+    """Cancel flag that reads as set from the n-th check on"""
+    def __init__(self, n):
+        self.n = n
+        self.checks = 0
+
+    def is_set(self):
+        self.checks += 1
+        return self.checks > self.n
+
+
+@pytest.fixture
+def worker(make_candles):
+    shm = optimizer.share_candles(make_candles(400, freq='1h'))
+    yield lambda flag: optimizer._init_worker(shm.name, 400, flag)
+    optimizer._worker_shm.close()
+    optimizer._worker_frame = optimizer._worker_shm = optimizer._worker_cancel = None
+    optimizer._worker_signals.clear()
+    shm.close()
+    shm.unlink()
+
+
+def test_a_batch_stops_between_combinations_on_cancel(worker):
+    batch = list(enumerate(build_combinations({"stop_loss": [0.5, 1.0, 1.5, 2.0, 2.5]})))
+
+    worker(FlagAfter(2))
+    assert [index for index, _, _ in optimizer._run_batch(batch, 10000, None)] == [0, 1]
+
+    worker(threading.Event())
+    results = optimizer._run_batch(batch, 10000, None)
+    assert len(results) == 5 and all("total_trades" in metrics for _, _, metrics in results)
+
+
+def test_cancelled_job_stops_early_and_keeps_finished_results(make_candles):
+    combos = build_combinations({"short": [5, 7, 9, 11], "long": [21, 30, 40, 50],
+                                 "stop_loss": [0.5, 1.0, 1.5, 2.0], "take_profit": [1, 2, 3]})
+    job = OptimizationJob(make_candles(2000, freq='1h'), combos, max_workers=1).start()
+    deadline = time.time() + 60
+    while job.completed == 0 and time.time() < deadline:
+        time.sleep(0.01)
+
+    job.cancel()
+    assert job.wait(30) == "cancelled"
+    assert 0 < job.completed < job.total
+    assert len(job.results) == job.completed
+    assert len({entry["index"] for entry in job.results}) == job.completed
@@ -0,0 +1,118 @@
+"""
+PaperAccount fills: slippage against the taker, fees on the filled notional,
+partial fills above max_fill_notional, and equity that survives a restart.
+"""
+import json
+import time
+
+import pytest
+
+from backend.paper import PaperAccount
+
+
+def account(**kwargs):
+    kwargs = {'path': None, 'starting_balance': 10000.0, 'slippage_bps': 10, 'fee_rate': 0.001,
+              'max_fill_notional': 0, **kwargs}
+    return PaperAccount(**kwargs)
+
+
+def test_buy_pays_slippage_and_fee():
+    paper = account()
+    order = paper.execute('BTC/USDT', 'buy', 0.1, 20000.0)
+
+    assert order['price'] == pytest.approx(20020.0)
+    assert order['cost'] == pytest.approx(2002.0)
+    assert order['fee'] == {'cost': pytest.approx(2.002), 'currency': 'USDT'}
+    assert paper.balances['BTC'] == pytest.approx(0.1)
+    assert paper.balances['USDT'] == pytest.approx(10000 - 2002 - 2.002)
+    assert paper.fees_paid == pytest.approx(2.002)
+
+
+def test_sell_fills_below_the_reference_and_may_go_short():
+    paper = account()
+    order = paper.execute('ETH/USDT', 'sell', 2, 1000.0)
+
+    assert order['price'] == pytest.approx(999.0)
+    assert paper.balances['ETH'] == pytest.approx(-2)
+    assert paper.balances['USDT'] == pytest.approx(10000 + 1998 - 1.998)
+    # Short marked at the last price: proceeds minus what buying back costs
+    assert paper.equity() == pytest.approx(10000 + 1998 - 1.998 - 2000)
+
+
+def test_callers_fee_rate_overrides_the_accounts():
+    paper = account()
+    assert paper.execute('BTC/USDT', 'buy', 0.1, 20000.0, fee_rate=0.0)['fee']['cost'] == 0.0
+    assert paper.execute('BTC/USDT', 'buy', 0.1, 20000.0, fee_rate=0.002)['fee']['cost'] == pytest.approx(4.004)
+
+
+def test_orders_above_the_notional_cap_fill_partially():
+    paper = account(slippage_bps=0, max_fill_notional=1000.0)
+    order = paper.execute('BTC/USDT', 'buy', 0.2, 20000.0)
+
+    assert order['filled'] == pytest.approx(0.05)
+    assert order['remaining'] == pytest.approx(0.15)
+    assert order['cost'] == pytest.approx(1000.0)
+    assert paper.balances['BTC'] == pytest.approx(0.05)
+
+
+def test_closing_orders_fill_in_full():
+    paper = account(slippage_bps=0, max_fill_notional=1000.0)
+    order = paper.execute('BTC/USDT', 'sell', 0.2, 20000.0, allow_partial=False)
+    assert order['filled'] == pytest.approx(0.2) and order['remaining'] == 0
+
+
+@pytest.mark.parametrize('price, side', [(None, 'buy'), (0, 'buy'), (100.0, 'hold')])
+def test_bad_orders_are_rejected(price, side):
+    with pytest.raises(ValueError):
+        account().execute('BTC/USDT', side, 1, price)
+
+
+def test_equity_follows_the_latest_mark():
+    paper = account(slippage_bps=0, fee_rate=0)
+    paper.execute('BTC/USDT', 'buy', 0.1, 20000.0)
+    paper.mark('BTC/USDT', 25000.0)
+    assert paper.equity() == pytest.approx(10000 + 500)
+
+
+def test_futures_symbols_value_the_same_holding():
+    paper = account(slippage_bps=0, fee_rate=0)
+    paper.execute('BTC/USDT:USDT', 'buy', 0.1, 20000.0)
+    assert paper.equity() == pytest.approx(10000)
+    paper.mark('BTC/USDT:USDT', 21000.0)
+    assert paper.equity() == pytest.approx(10100)
+
+
+def test_equity_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'paper.json')
+    paper = account(path=path, save_delay=60)
+    paper.execute('BTC/USDT', 'buy', 0.1, 20000.0)
+    paper.mark('BTC/USDT', 21000.0)
+    paper.execute('ETH/USDT', 'sell', 1, 1000.0)
+    paper.flush()
+
+    restarted = account(path=path)
+    assert restarted.balances == pytest.approx(paper.balances)
+    assert restarted.equity() == pytest.approx(paper.equity())
+    assert restarted.fees_paid == pytest.approx(paper.fees_paid)
+
+
+def test_accounts_saved_without_marks_still_load(tmp_path):
+    path = tmp_path / 'paper.json'
+    path.write_text(json.dumps({'balances': {'USDT': 8000.0, 'BTC': 0.1}, 'starting_balance': 10000.0}))
+
+    paper = account(path=str(path))
+    assert paper.equity() == pytest.approx(8000.0)
+    paper.mark('BTC/USDT', 20000.0)
+    assert paper.equity() == pytest.approx(10000.0)
+
+
+def test_fills_are_written_in_the_background(tmp_path):
+    path = tmp_path / 'paper.json'
+    paper = account(path=str(path), save_delay=0.01)
+    paper.execute('BTC/USDT', 'buy', 0.1, 20000.0)
+
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    state = json.loads(path.read_text())
+    assert state['orders'] == 1 and state['marks'] == {'BTC/USDT': 20000.0}
@@ -0,0 +1,121 @@
+"""
+PositionBook keeps open positions by id and symbol, reuses freed NumPy slots,
+and marks the whole book to market like the bots' per-position P&L.
+"""
+import random
+
+import pytest
+
+from backend.positions import Position, PositionBook
+
+
+def pnl(position, price, fee_rate=0.0):
+    """The bots' realized P&L formula for closing `position` at price"""
+    sign = 1 if position.side == 'buy' else -1
+    size = position.position_size
+    return sign * (price - position.entry_price) * size - fee_rate * (position.entry_price + price) * size
+
+
+def test_add_and_remove_keep_symbol_counts():
+    book = PositionBook()
+    book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 1.0))
+    book.add(Position(2, 'BTC/USDT', 'sell', 101.0, 2.0))
+    book.add(Position(3, 'ETH/USDT', 'buy', 10.0, 5.0))
+
+    assert len(book) == 3 and book.count('BTC/USDT') == 2 and 2 in book
+    assert sorted(book.symbols()) == ['BTC/USDT', 'ETH/USDT']
+
+    removed = book.remove(3)
+    assert removed.trade_id == 3 and removed.slot is None
+    assert book.symbols() == ['BTC/USDT'] and book.count('ETH/USDT') == 0
+    assert book.remove(3) is None
+    assert [p.trade_id for p in book.for_symbol('BTC/USDT')] == [1, 2]
+
+
+def test_re_adding_an_id_replaces_the_position():
+    book = PositionBook()
+    book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 1.0), 95.0, 110.0)
+    book.add(Position(1, 'ETH/USDT', 'sell', 10.0, 3.0), 11.0, 9.0)
+
+    assert len(book) == 1 and book.count('BTC/USDT') == 0
+    assert book.get(1).symbol == 'ETH/USDT'
+    assert book.crossed('BTC/USDT', 90.0) == []
+
+
+def test_freed_slots_are_reused_and_the_book_grows():
+    book = PositionBook(capacity=2)
+    first = book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 1.0))
+    slot = first.slot
+    book.remove(1)
+    assert book.add(Position(2, 'BTC/USDT', 'buy', 100.0, 1.0)).slot == slot
+
+    for trade_id in range(3, 40):
+        book.add(Position(trade_id, f"S{trade_id % 7}/USDT", 'buy', 100.0, 1.0))
+    assert len(book) == 38
+    assert len({p.slot for p in book}) == 38
+
+
+def test_unrealized_pnl_matches_each_position():
+    rng = random.Random(5)
+    book = PositionBook(capacity=4)
+    positions = []
+    for trade_id in range(50):
+        position = Position(trade_id, rng.choice(['BTC/USDT', 'ETH/USDT', 'SOL/USDT']), rng.choice(['buy', 'sell']),
+                            rng.uniform(90, 110), rng.uniform(0.1, 3))
+        book.add(position)
+        positions.append(position)
+    for position in rng.sample(positions, 15):
+        book.remove(position.trade_id)
+        positions.remove(position)
+
+    prices = {'BTC/USDT': 103.0, 'ETH/USDT': 97.5, 'SOL/USDT': 100.0}
+    result = book.unrealized_pnl(prices, fee_rate=0.001)
+
+    for symbol, price in prices.items():
+        expected = sum(pnl(p, price, 0.001) for p in positions if p.symbol == symbol)
+        assert result['by_symbol'][symbol] == pytest.approx(expected)
+    assert result['total'] == pytest.approx(sum(pnl(p, prices[p.symbol], 0.001) for p in positions))
+
+
+def test_unrealized_pnl_uses_last_marks_and_skips_unpriced_symbols():
+    book = PositionBook()
+    book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 2.0))
+    book.add(Position(2, 'ETH/USDT', 'sell', 10.0, 4.0))
+
+    assert book.unrealized_pnl() == {'total': 0.0, 'by_symbol': {'BTC/USDT': 0.0, 'ETH/USDT': 0.0}}
+
+    book.mark('BTC/USDT', 105.0)
+    assert book.unrealized_pnl() == {'total': 10.0, 'by_symbol': {'BTC/USDT': 10.0, 'ETH/USDT': 0.0}}
+    # Explicit prices win over marks; symbols the book never held are ignored
+    result = book.unrealized_pnl({'BTC/USDT': 95.0, 'ETH/USDT': 9.0, 'XRP/USDT': 1.0})
+    assert result == {'total': pytest.approx(-10.0 + 4.0), 'by_symbol': {'BTC/USDT': -10.0, 'ETH/USDT': 4.0}}
+
+
+def test_closed_positions_leave_the_marks_alone():
+    book = PositionBook()
+    book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 1.0))
+    book.add(Position(2, 'BTC/USDT', 'buy', 110.0, 1.0))
+    book.mark('BTC/USDT', 120.0)
+    book.remove(2)
+
+    assert book.unrealized_pnl() == {'total': 20.0, 'by_symbol': {'BTC/USDT': 20.0}}
+    book.remove(1)
+    assert book.unrealized_pnl() == {'total': 0.0, 'by_symbol': {}}
+
+
+def test_crossed_marks_and_returns_positions():
+    book = PositionBook()
+    long = book.add(Position(1, 'BTC/USDT', 'buy', 100.0, 1.0), 98.0, 104.0)
+    book.add(Position(2, 'BTC/USDT', 'buy', 100.0, 1.0))  # no levels: never triggered
+
+    assert book.crossed('BTC/USDT', 97.0) == [(long, 'stop_loss')]
+    assert book.unrealized_pnl()['total'] == pytest.approx(-6.0)
+
+
+def test_position_reads_like_the_old_dicts():
+    position = Position(7, 'BTC/USDT', 'sell', '100', 0.5, timestamp=123)
+    assert position['entry_price'] == 100.0 and position['usd_amount'] == 50.0
+    assert dict(position) == position.to_dict()
+    assert position.get('slot') is None and position.get('missing', 'x') == 'x'
+    with pytest.raises(KeyError):
+        position['slot']
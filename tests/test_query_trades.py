@@ -0,0 +1,112 @@
+"""
+query_trades pages newest-first by id; /api/trades keeps its plain list for
+callers that pass no paging parameters.
+"""
+import datetime
+
+import pytest
+
+from backend.db import TradeJournal, query_trades
+
+DAY = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def trades(trade_db):
+    """12 trades: ids 1..12, alternating buy/sell, BTC for ids 1-6 and ETH after, one hour apart"""
+    journal = TradeJournal(flush_interval=0.01)
+    for i in range(12):
+        journal.submit_trade(
+            trade_db, symbol='BTC/USDT' if i < 6 else 'ETH/USDT', side='buy' if i % 2 == 0 else 'sell',
+            size=1.0, price=100.0 + i, stop_loss=None, take_profit=None,
+            status='EXECUTED' if i % 3 == 0 else 'OPEN', pnl=float(i), timestamp=DAY + datetime.timedelta(hours=i),
+            trading_mode='spot', leverage=1, usd_amount=100.0 + i
+        )
+    journal.close()
+    return trade_db
+
+
+def ids(page):
+    return [t['id'] for t in page['trades']]
+
+
+def test_cursor_walks_every_trade_once_newest_first(trades):
+    seen = []
+    page = query_trades(trades, limit=5)
+    while True:
+        seen += ids(page)
+        if page['next_cursor'] is None:
+            break
+        assert page['next_cursor'] == seen[-1]
+        page = query_trades(trades, limit=5, before_id=page['next_cursor'])
+
+    assert seen == list(range(12, 0, -1))
+
+
+def test_last_full_page_has_no_cursor(trades):
+    assert query_trades(trades, limit=12)['next_cursor'] is None
+    assert query_trades(trades, limit=11)['next_cursor'] == 2
+
+
+def test_since_id_returns_only_newer_trades(trades):
+    page = query_trades(trades, limit=100, since_id=9)
+    assert ids(page) == [12, 11, 10]
+    assert page['latest_id'] == 12
+    assert query_trades(trades, limit=100, since_id=12)['trades'] == []
+
+
+def test_since_id_pages_when_far_behind(trades):
+    page = query_trades(trades, limit=2, since_id=3)
+    # Newest first, so a client this far behind sees next_cursor and reloads
+    assert ids(page) == [12, 11] and page['next_cursor'] == 11
+
+
+def test_filters_combine_with_paging(trades):
+    assert ids(query_trades(trades, symbol='ETH/USDT', side='buy')) == [11, 9, 7]
+    assert ids(query_trades(trades, status='EXECUTED')) == [10, 7, 4, 1]
+    window = query_trades(trades, start=DAY + datetime.timedelta(hours=3), end=DAY + datetime.timedelta(hours=5))
+    assert ids(window) == [6, 5, 4]
+
+    page = query_trades(trades, limit=2, symbol='BTC/USDT')
+    assert ids(page) == [6, 5]
+    assert ids(query_trades(trades, limit=2, symbol='BTC/USDT', before_id=page['next_cursor'])) == [4, 3]
+
+
+def test_latest_id_ignores_filters(trades):
+    assert query_trades(trades, limit=1, symbol='BTC/USDT')['latest_id'] == 12
+
+
+@pytest.fixture
+def client(api_server, monkeypatch):
+    calls = []
+
+    def fake_query_trades(**kwargs):
+        calls.append(kwargs)
+        return {'trades': [{'id': 2}, {'id': 1}], 'next_cursor': None, 'latest_id': 2}
+
+    monkeypatch.setattr(api_server, 'query_trades', fake_query_trades)
+    monkeypatch.setattr(api_server, 'get_trading_mode', lambda: 'paper')
+    client = api_server.app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_trades_endpoint_without_paging_is_the_full_list(client):
+    response = client.get('/api/trades')
+    assert response.get_json() == [{'id': 2}, {'id': 1}]
+    assert client.calls[-1]['limit'] is None
+
+    client.get('/api/trades?symbol=BTC/USDT')
+    assert client.calls[-1]['limit'] is None and client.calls[-1]['symbol'] == 'BTC/USDT'
+
+
+@pytest.mark.parametrize('query', ['limit=50', 'cursor=10', 'since_id=3'])
+def test_trades_endpoint_with_paging_returns_a_page(client, query):
+    body = client.get(f'/api/trades?{query}').get_json()
+    assert body == {'trades': [{'id': 2}, {'id': 1}], 'next_cursor': None, 'latest_id': 2, 'trading_mode': 'paper'}
+    assert client.calls[-1]['limit'] == (50 if query == 'limit=50' else 200)
+
+
+def test_trades_endpoint_caps_the_page_size(client):
+    client.get('/api/trades?limit=50000&since_id=1')
+    assert client.calls[-1]['limit'] == 1000 and client.calls[-1]['since_id'] == 1
@@ -0,0 +1,88 @@
+"""
+Replays drive a bot on a virtual clock through collaborators swapped on that
+bot alone: no module globals, no process-wide stdout, so replays are
+repeatable and can run beside each other and beside live bots.
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+from backend import bot_core
+from backend.bot_core import MultiPairTradingBot, TradingBot
+from backend.metrics import get_metrics
+from backend.replay import ReplayInterface, VirtualClock, replay
+
+SYMBOLS = ['A/USDT', 'B/USDT', 'C/USDT']
+
+
+@pytest.fixture(scope='module')
+def frames():
+    from tests.conftest import synthetic_candles
+    return {(symbol, '1h'): synthetic_candles(600, seed=i, volatility=0.008, freq='1h')
+            for i, symbol in enumerate(SYMBOLS)}
+
+
+def run(frames, make_bot, interface_class=ReplayInterface, **kwargs):
+    interface = interface_class(frames, VirtualClock())
+    return replay(make_bot(interface), interface, tick_seconds=600, **kwargs)
+
+
+def multi_pair(interface):
+    return MultiPairTradingBot(interface, SYMBOLS, 3, 1, 2)
+
+
+def single(interface):
+    return TradingBot(interface, 'A/USDT', 1, 1, 2)
+
+
+def test_replay_is_repeatable_and_quiet(frames, capsys):
+    histograms = len(get_metrics().snapshot())
+    first = run(frames, multi_pair)
+    second = run(frames, multi_pair)
+
+    assert first['closed_trades'] > 0
+    assert first['digest'] == second['digest']
+    assert capsys.readouterr().out == ''
+    assert len(get_metrics().snapshot()) == histograms
+    assert first['latency']['run_once']['count'] == first['ticks']
+
+
+def test_replay_restores_the_bots_collaborators(frames):
+    interface = ReplayInterface(frames, VirtualClock())
+    bot = single(interface)
+    replay(bot, interface, tick_seconds=600, max_ticks=50)
+
+    assert bot.clock is time and bot.log is print
+    assert bot.journal_trade is bot_core.journal_trade and bot.publish is bot_core.publish
+    assert bot.metrics is get_metrics()
+
+
+def test_globals_and_other_bots_are_untouched_while_replaying(frames):
+    stdout = sys.stdout
+    live = single(ReplayInterface(frames, VirtualClock()))
+    seen = []
+
+    class Watching(ReplayInterface):
+        def fetch_ohlcv_batch(self, symbols, timeframe='1h', limit=100):
+            seen.append((sys.stdout is stdout, bot_core.time is time, live.clock is time, live.log is print))
+            return super().fetch_ohlcv_batch(symbols, timeframe, limit)
+
+    run(frames, multi_pair, interface_class=Watching, max_ticks=50)
+    assert seen and all(all(flags) for flags in seen)
+
+
+def test_concurrent_replays_match_sequential_ones(frames):
+    expected = {name: run(frames, make)['digest'] for name, make in (('single', single), ('multi', multi_pair))}
+    results = {}
+
+    def worker(name, make):
+        results[name] = run(frames, make)['digest']
+
+    threads = [threading.Thread(target=worker, args=item) for item in (('single', single), ('multi', multi_pair))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == expected
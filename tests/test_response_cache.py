@@ -0,0 +1,118 @@
+"""
+ResponseCache: one loader call per key however many callers miss at once,
+entries live for their TTL, failures reach every waiter and are not cached.
+"""
+import threading
+import time
+
+import pytest
+
+from backend import response_cache
+from backend.response_cache import ResponseCache, ttl_for_timeframe
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, 'monotonic', clock)
+    return clock
+
+
+def run_concurrently(cache, key, loader, callers=8):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(cache.get_or_load(key, 10, loader))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def wait_for_waiters(cache, count):
+    deadline = time.time() + 5
+    while cache.stats()['coalesced'] < count and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return {'rows': 42}
+
+    threads, results, errors = run_concurrently(cache, 'k', loader)
+    wait_for_waiters(cache, 7)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1] and errors == []
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert cache.stats()['misses'] == 1 and cache.stats()['coalesced'] == 7
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    cache = ResponseCache()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError('exchange down')
+
+    threads, results, errors = run_concurrently(cache, 'k', failing, callers=4)
+    wait_for_waiters(cache, 3)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == [] and len(errors) == 4
+    assert all(str(e) == 'exchange down' for e in errors)
+    assert cache.stats()['errors'] == 1
+    assert cache.get_or_load('k', 10, lambda: 'recovered') == 'recovered'
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResponseCache()
+    values = iter(['first', 'second'])
+    load = lambda: next(values)
+
+    assert cache.get_or_load('k', 5, load) == 'first'
+    clock.now += 4.9
+    assert cache.get_or_load('k', 5, load) == 'first'
+    clock.now += 0.2
+    assert cache.get_or_load('k', 5, load) == 'second'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_keys_are_independent_and_least_recent_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.get_or_load('a', 60, lambda: 'A')
+    cache.get_or_load('b', 60, lambda: 'B')
+    cache.get_or_load('a', 60, lambda: 'unused')  # touch a, so b is the oldest
+    cache.get_or_load('c', 60, lambda: 'C')
+
+    assert cache.stats()['size'] == 2
+    assert cache.get_or_load('a', 60, lambda: 'reloaded') == 'A'
+    assert cache.get_or_load('b', 60, lambda: 'reloaded') == 'reloaded'
+
+
+@pytest.mark.parametrize('timeframe, ttl', [('1m', 3.0), ('5m', 15.0), ('1h', 60.0), ('1s', 1.0), ('bogus', 1.0)])
+def test_ttl_follows_the_candle_interval(timeframe, ttl):
+    assert ttl_for_timeframe(timeframe) == ttl
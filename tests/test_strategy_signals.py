@@ -0,0 +1,41 @@
+"""
+generate_signals / generate_fast_signals compute every bar of a frame in one
+vectorized pass; entry i must equal the per-bar dispatcher run on df[:i+1].
+"""
+import pytest
+
+from backend.strategy import generate_fast_signals, generate_signals, get_fast_strategy_signal, get_strategy_signal
+
+STRATEGIES = ['default_ma', 'custom', 'momentum', 'aggressive_ema', 'breakout']
+# breakout compares the close with a high/low window that includes its own
+# candle, so it never fires on well-formed candles; only its holds can be compared
+NEVER_FIRES = {'breakout'}
+
+
+@pytest.mark.parametrize('strategy_type', STRATEGIES)
+@pytest.mark.parametrize('volatility_filter', [True, False])
+def test_generate_signals_matches_each_prefix(strategy_type, volatility_filter, make_candles):
+    # Volatile enough that the 0.5%-5% volatility filter lets signals through
+    df = make_candles(240, seed=3, volatility=0.012)
+    vectorized = generate_signals(df, strategy_type, enable_volatility_filter=volatility_filter).tolist()
+    per_bar = [get_strategy_signal(df.iloc[:i + 1], strategy_type, enable_volatility_filter=volatility_filter)
+               for i in range(len(df))]
+    assert vectorized == per_bar
+    if strategy_type not in NEVER_FIRES:
+        assert set(per_bar) - {'hold'}, "no bar produced a signal; the comparison would be vacuous"
+
+
+@pytest.mark.parametrize('strategy_type', ['aggressive_ema', 'breakout'])
+def test_generate_fast_signals_matches_each_prefix(strategy_type, make_candles):
+    df = make_candles(240, seed=5, volatility=0.012)
+    vectorized = generate_fast_signals(df, strategy_type).tolist()
+    per_bar = [get_fast_strategy_signal(df.iloc[:i + 1], strategy_type) for i in range(len(df))]
+    assert vectorized == per_bar
+    if strategy_type not in NEVER_FIRES:
+        assert set(per_bar) - {'hold'}
+
+
+def test_custom_periods_are_honoured(make_candles):
+    df = make_candles(200, seed=9, volatility=0.012)
+    vectorized = generate_signals(df, 'default_ma', short=5, long=30).tolist()
+    assert vectorized == [get_strategy_signal(df.iloc[:i + 1], 'default_ma', short=5, long=30) for i in range(len(df))]
@@ -0,0 +1,93 @@
+"""
+TradeJournal applies operations in submission order, in batches, and flush()
+returns only once everything submitted before it is committed.
+"""
+import datetime
+import threading
+
+import pytest
+
+from backend.db import TradeJournal, query_trades
+
+
+def trade(symbol, side='buy', status='OPEN'):
+    return dict(symbol=symbol, side=side, size=1.0, price=100.0, stop_loss=95.0, take_profit=110.0,
+                status=status, pnl=0, timestamp=datetime.datetime(2024, 1, 1), trading_mode='spot',
+                leverage=1, usd_amount=100.0)
+
+
+@pytest.fixture
+def journal():
+    journal = TradeJournal(batch_size=4, flush_interval=0.01)
+    yield journal
+    journal.close()
+
+
+def rows(db_mode):
+    return sorted(query_trades(db_mode)['trades'], key=lambda t: t['id'])
+
+
+def test_inserts_keep_submission_order_across_batches(trade_db, journal):
+    symbols = [f"S{i}/USDT" for i in range(10)]
+    for symbol in symbols:
+        journal.submit_trade(trade_db, **trade(symbol))
+
+    assert journal.flush(timeout=5)
+    assert [t['symbol'] for t in rows(trade_db)] == symbols
+    assert journal.written == 10
+
+
+def test_update_lands_after_the_insert_it_follows(trade_db, journal):
+    journal.submit_trade(trade_db, **trade('BTC/USDT'))
+    journal.submit_pnl_update(trade_db, 1, 105.0, 5.0, 'CLOSED_TP')
+    journal.submit_trade(trade_db, **trade('ETH/USDT'))
+    journal.submit_pnl_update(trade_db, 2, 98.0, -2.0, 'CLOSED_SL')
+    journal.submit_pnl_update(trade_db, 1, 106.0, 6.0, 'CLOSED_MANUAL')
+
+    assert journal.flush(timeout=5)
+    first, second = rows(trade_db)
+    assert (first['exit_price'], first['pnl'], first['status']) == (106.0, 6.0, 'CLOSED_MANUAL')
+    assert (second['exit_price'], second['pnl'], second['status']) == (98.0, -2.0, 'CLOSED_SL')
+
+
+def test_flush_waits_for_the_batch_in_progress(trade_db, journal, monkeypatch):
+    gate = threading.Event()
+    write_ops = journal._write_ops
+
+    def slow_write(db_mode, ops):
+        gate.wait(5)
+        write_ops(db_mode, ops)
+
+    monkeypatch.setattr(journal, '_write_ops', slow_write)
+    journal.submit_trade(trade_db, **trade('BTC/USDT'))
+
+    assert journal.flush(timeout=0.05) is False
+    gate.set()
+    assert journal.flush(timeout=5) is True
+    assert len(rows(trade_db)) == 1
+
+
+def test_flush_without_writes_returns_at_once():
+    assert TradeJournal().flush(timeout=0) is True
+
+
+def test_a_bad_operation_does_not_sink_its_batch(trade_db, journal):
+    journal.submit_trade(trade_db, **trade('BTC/USDT'))
+    journal.submit_pnl_update(trade_db, 1, 105.0, 5.0, 'CLOSED_TP')
+    journal._submit(('update', trade_db, {'id': 1, 'no_such_column': 1}))
+    journal.submit_trade(trade_db, **trade('ETH/USDT'))
+
+    assert journal.flush(timeout=5)
+    assert [t['symbol'] for t in rows(trade_db)] == ['BTC/USDT', 'ETH/USDT']
+    assert rows(trade_db)[0]['status'] == 'CLOSED_TP'
+    assert (journal.written, journal.failed) == (3, 1)
+
+
+def test_close_flushes_and_later_writes_apply_synchronously(trade_db):
+    journal = TradeJournal(flush_interval=0.01)
+    journal.submit_trade(trade_db, **trade('BTC/USDT'))
+    journal.close()
+    assert len(rows(trade_db)) == 1
+
+    journal.submit_trade(trade_db, **trade('ETH/USDT'))
+    assert [t['symbol'] for t in rows(trade_db)] == ['BTC/USDT', 'ETH/USDT']
@@ -0,0 +1,102 @@
+"""
+TriggerIndex.crossed must report exactly the positions whose stop or target a
+price reached - inclusive, for longs and shorts - like checking each one.
+"""
+import random
+
+import pytest
+
+from backend.triggers import TriggerIndex, exit_levels
+
+
+def reference(entries, symbol, price):
+    """The per-position check crossed() replaces"""
+    hits = {}
+    for key, (sym, side, stop, take) in entries.items():
+        if sym != symbol:
+            continue
+        if side == "buy":
+            if price <= stop:
+                hits[key] = "stop_loss"
+            elif price >= take:
+                hits[key] = "take_profit"
+        else:
+            if price >= stop:
+                hits[key] = "stop_loss"
+            elif price <= take:
+                hits[key] = "take_profit"
+    return hits
+
+
+@pytest.fixture
+def index():
+    index = TriggerIndex()
+    index.add('long', 'BTC/USDT', 'buy', *exit_levels(100.0, 'buy', 2, 4))     # stop 98, take 104
+    index.add('short', 'BTC/USDT', 'sell', *exit_levels(100.0, 'sell', 2, 4))  # stop 102, take 96
+    return index
+
+
+@pytest.mark.parametrize('price, expected', [
+    (100.0, {}),
+    (98.0, {'long': 'stop_loss'}),
+    (97.5, {'long': 'stop_loss'}),
+    (96.0, {'long': 'stop_loss', 'short': 'take_profit'}),
+    (102.0, {'short': 'stop_loss'}),
+    (104.0, {'short': 'stop_loss', 'long': 'take_profit'}),
+    (110.0, {'short': 'stop_loss', 'long': 'take_profit'}),
+])
+def test_both_directions_inclusive(index, price, expected):
+    assert dict(index.crossed('BTC/USDT', price)) == expected
+
+
+def test_stops_come_before_targets(index):
+    assert index.crossed('BTC/USDT', 95.0) == [('long', 'stop_loss'), ('short', 'take_profit')]
+    assert index.crossed('BTC/USDT', 105.0) == [('short', 'stop_loss'), ('long', 'take_profit')]
+
+
+def test_entries_stay_until_removed_and_re_adding_moves_them(index):
+    assert index.crossed('BTC/USDT', 97.0) == [('long', 'stop_loss')]
+    assert index.crossed('BTC/USDT', 97.0) == [('long', 'stop_loss')]
+
+    index.add('long', 'BTC/USDT', 'buy', 90.0, 110.0)
+    assert index.crossed('BTC/USDT', 97.0) == []
+    assert len(index) == 2
+
+    assert index.remove('long') and not index.remove('long')
+    assert 'long' not in index
+    assert dict(index.crossed('BTC/USDT', 80.0)) == {'short': 'take_profit'}
+
+
+def test_symbols_are_independent(index):
+    index.add('eth', 'ETH/USDT', 'buy', 1900.0, 2100.0)
+    assert index.crossed('ETH/USDT', 98.0) == [('eth', 'stop_loss')]
+    assert index.crossed('SOL/USDT', 98.0) == []
+
+    index.remove('eth')
+    assert index.symbols() == ['BTC/USDT']
+
+
+def test_equal_levels_all_fire():
+    index = TriggerIndex()
+    for key in range(5):
+        index.add(key, 'BTC/USDT', 'buy', 98.0, 104.0)
+    assert sorted(index.crossed('BTC/USDT', 98.0)) == [(key, 'stop_loss') for key in range(5)]
+
+
+def test_matches_checking_every_position():
+    rng = random.Random(3)
+    index, entries = TriggerIndex(), {}
+    for key in range(300):
+        symbol = rng.choice(['BTC/USDT', 'ETH/USDT'])
+        side = rng.choice(['buy', 'sell'])
+        levels = exit_levels(round(rng.uniform(90, 110), 1), side, rng.choice([0.5, 1, 2]), rng.choice([1, 2, 4]))
+        index.add(key, symbol, side, *levels)
+        entries[key] = (symbol, side, *levels)
+    for key in rng.sample(sorted(entries), 100):
+        index.remove(key)
+        del entries[key]
+
+    for _ in range(500):
+        symbol = rng.choice(['BTC/USDT', 'ETH/USDT'])
+        price = round(rng.uniform(80, 120), 1)
+        assert dict(index.crossed(symbol, price)) == reference(entries, symbol, price)